@@ -0,0 +1,163 @@
+# File: bench_suite.py
+
+"""
+Description:
+Throughput and latency benchmark of every scanner on synthetic corpora (corpus.py). For each
+language, size and vulnerability density, a deterministic corpus is generated and scanned
+repeatedly by two targets:
+
+- scanner: the language's shared scanner (check), i.e. the rule engine alone;
+- scan_code: the public entry point, including input normalization and guidance findings.
+
+Each case runs at least --min-runs times and until --min-time seconds have been spent (at
+most --max-runs). Reported per case: MB/s at the median, p50 and p99 latency (nearest rank;
+with few runs p99 is the slowest run).
+
+Results can be saved as a baseline (--save-baseline) and later compared against it
+(--compare): a case whose p50 is more than --threshold slower than in the baseline is a
+regression, and the run exits with status 1. Baselines are machine-specific; keep one per
+CI runner type.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_suite [--languages python,html] [--sizes 1KB,64KB,2MB]
+        [--densities 0.05,0.3] [--save-baseline benchmarks/baseline.json]
+        [--compare benchmarks/baseline.json] [--threshold 0.25] [--json results.json]
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+
+from benchmarks.corpus import format_size, generate, parse_size
+from src.nuvai.scanner import SUPPORTED_LANGUAGES, get_scanner, scan_code, stripped_origin
+
+LANGUAGES = sorted({language for language, _ in SUPPORTED_LANGUAGES.values()})
+DEFAULT_SIZES = "1KB,16KB,256KB,2MB"
+DEFAULT_DENSITIES = "0.05,0.3"
+TARGETS = ("scanner", "scan_code")
+
+
+def scanner_target(language):
+    scanner = get_scanner(language)
+
+    def run(code):
+        return scanner.check(code.strip(), stripped_origin(code))
+
+    return run
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def measure(func, code, min_runs, min_time, max_runs):
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_runs and (len(samples) < min_runs or time.perf_counter() - started < min_time):
+        begin = time.perf_counter()
+        func(code)
+        samples.append(time.perf_counter() - begin)
+    return samples
+
+
+def case_key(target, language, size, density):
+    return f"{target}/{language}/{format_size(size)}/{density:g}"
+
+
+def run_suite(languages, sizes, densities, seed=0, min_runs=5, min_time=1.0, max_runs=1000, progress=None):
+    results = {}
+    for language in languages:
+        targets = {"scanner": scanner_target(language), "scan_code": lambda code, lang=language: scan_code(code, lang)}
+        for size in sizes:
+            for density in densities:
+                code = generate(language, size, density, seed)
+                for target in TARGETS:
+                    samples = measure(targets[target], code, min_runs, min_time, max_runs)
+                    p50 = percentile(samples, 0.5)
+                    result = {
+                        "target": target,
+                        "language": language,
+                        "size": len(code),
+                        "density": density,
+                        "runs": len(samples),
+                        "p50_ms": round(p50 * 1e3, 4),
+                        "p99_ms": round(percentile(samples, 0.99) * 1e3, 4),
+                        "mb_per_second": round(len(code) / p50 / 1e6, 3),
+                    }
+                    results[case_key(target, language, size, density)] = result
+                    if progress:
+                        progress(case_key(target, language, size, density), result)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """(key, baseline p50, current p50, ratio) for every case present in both runs."""
+    rows = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous:
+            rows.append((key, previous["p50_ms"], result["p50_ms"], result["p50_ms"] / previous["p50_ms"]))
+    regressions = [row for row in rows if row[3] > 1 + threshold]
+    return rows, regressions
+
+
+def print_result(key, result):
+    print(f"{key:<36}{result['runs']:>6}{result['mb_per_second']:>10.2f}{result['p50_ms']:>12.3f}{result['p99_ms']:>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scanners on synthetic corpora")
+    parser.add_argument("--languages", default=",".join(LANGUAGES), help="Comma-separated languages")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated corpus sizes (e.g. 1KB,2MB)")
+    parser.add_argument("--densities", default=DEFAULT_DENSITIES, help="Comma-separated vulnerability densities (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-runs", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=1.0, help="Minimum seconds spent per case")
+    parser.add_argument("--max-runs", type=int, default=1000)
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Store the results as the new baseline")
+    parser.add_argument("--compare", metavar="PATH", help="Compare p50 latency against a stored baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed p50 slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    languages = [language.strip() for language in args.languages.split(",") if language.strip()]
+    unknown = set(languages) - set(LANGUAGES)
+    if unknown:
+        parser.error(f"Unknown language(s): {', '.join(sorted(unknown))}")
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    densities = [float(density) for density in args.densities.split(",")]
+
+    print(f"{'case':<36}{'runs':>6}{'MB/s':>10}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    results = run_suite(languages, sizes, densities, args.seed, args.min_runs, args.min_time, args.max_runs,
+                        progress=print_result)
+
+    document = {"created_at": time.time(), "python": sys.version.split()[0], "results": results}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        rows, regressions = compare(results, baseline, args.threshold)
+        print(f"\n{'case':<36}{'baseline p50':>14}{'p50':>12}{'change':>10}")
+        for key, before, after, ratio in rows:
+            flag = "  REGRESSION" if ratio > 1 + args.threshold else ""
+            print(f"{key:<36}{before:>14.3f}{after:>12.3f}{ratio - 1:>+10.0%}{flag}")
+        if not rows:
+            print("No cases in common with the baseline.")
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
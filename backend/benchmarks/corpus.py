@@ -0,0 +1,285 @@
+# File: corpus.py
+
+"""
+Description:
+Synthetic source corpora for the scanner benchmarks, seeded from examples/vulnerable_app.*.
+
+Each example is split into self-contained units: top-level statements for Python (imports
+go to a prologue, so every generated file still parses and resolves names), bracket-balanced
+line groups for the C-like languages and element-balanced line groups inside <body> for HTML.
+A unit is "vulnerable" when a finding of the real scanner points into it, "clean" otherwise.
+Clean units are topped up with a few benign templates per language, which are classified the
+same way, so low densities do not simply repeat the same few example lines.
+
+generate(language, size, density, seed) concatenates units between the prologue and the
+epilogue until `size` characters are reached; each unit is vulnerable with probability
+`density`. Output is deterministic for a given (language, size, density, seed).
+
+Usage (from the backend directory):
+    python -m benchmarks.corpus python 64KB --density 0.2 > /tmp/sample.py
+"""
+
+import argparse
+import ast
+import os
+import random
+import re
+from functools import lru_cache
+
+from src.nuvai.scanner import SUPPORTED_LANGUAGES, scan_code
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "examples")
+C_LIKE = ("javascript", "jsx", "typescript", "php", "cpp")
+SIZE_UNITS = {"KB": 1024, "MB": 1024 * 1024, "B": 1}
+HTML_TAG = re.compile(r"<(/?)([a-zA-Z][\w-]*)[^>]*?(/?)>")
+HTML_VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# Benign code in the style of the examples; "{n}" is replaced by a running number.
+CLEAN_TEMPLATES = {
+    "python": [
+        "def total_{n}(values):\n    total = 0\n    for value in values:\n        total += value * {n}\n    return total\n",
+        "class Appointment{n}:\n    def __init__(self, day, slot):\n        self.day = day\n        self.slot = slot\n\n"
+        "    def label(self):\n        return f\"{self.day} #{self.slot}\"\n",
+        "WEEKDAYS_{n} = [\"mon\", \"tue\", \"wed\", \"thu\", \"fri\"]\n",
+    ],
+    "javascript": [
+        "function formatDate{n}(date) {\n  const day = String(date.getDate()).padStart(2, \"0\");\n"
+        "  const month = String(date.getMonth() + 1).padStart(2, \"0\");\n  return day + \"/\" + month;\n}\n",
+        "const slots{n} = [9, 10, 11, 14, 15].map((hour) => ({ hour, free: true }));\n",
+    ],
+    "jsx": [
+        "function Badge{n}({ label }) {\n  return (\n    <span className=\"badge\">{label}</span>\n  );\n}\n",
+        "const items{n} = [1, 2, 3].map((value) => value * {n});\n",
+    ],
+    "typescript": [
+        "interface Slot{n} {\n  day: string;\n  hour: number;\n}\n",
+        "function sum{n}(values: number[]): number {\n  return values.reduce((a, b) => a + b, 0);\n}\n",
+    ],
+    "php": [
+        "function format_slot_{n}($day, $hour) {\n    return sprintf('%s at %02d:00', $day, $hour);\n}\n",
+        "$weekdays_{n} = array('mon', 'tue', 'wed', 'thu', 'fri');\n",
+    ],
+    "cpp": [
+        "int sum_{n}(const std::vector<int>& values) {\n    int total = 0;\n    for (int value : values) {\n"
+        "        total += value;\n    }\n    return total;\n}\n",
+        "struct Slot{n} {\n    int day;\n    int hour;\n};\n",
+    ],
+    "html": [
+        "<section class=\"info-{n}\">\n  <h2>Opening hours</h2>\n  <p>Monday to Friday, 9:00 to 17:00.</p>\n</section>\n",
+        "<ul class=\"list-{n}\">\n  <li>Bring an ID</li>\n  <li>Arrive early</li>\n</ul>\n",
+    ],
+}
+
+
+class SeedCorpus:
+    def __init__(self, language, prologue, epilogue, vulnerable, clean):
+        self.language = language
+        self.prologue = prologue
+        self.epilogue = epilogue
+        self.vulnerable = vulnerable
+        self.clean = clean
+
+
+def parse_size(text):
+    """'2MB' / '64KB' / '1000' -> number of characters."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*(KB|MB|B)?\s*", text.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {text}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2) or "B"])
+
+
+def format_size(size):
+    for unit in ("MB", "KB"):
+        if size >= SIZE_UNITS[unit] and size % SIZE_UNITS[unit] == 0:
+            return f"{size // SIZE_UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+def example_path(language):
+    for name in sorted(os.listdir(EXAMPLES_DIR)):
+        ext = os.path.splitext(name)[1].lower()
+        if SUPPORTED_LANGUAGES.get(ext, (None,))[0] == language:
+            return os.path.join(EXAMPLES_DIR, name)
+    raise ValueError(f"No example file for language '{language}'")
+
+
+# Splitting (units are lists of lines, without line breaks)
+
+def _split_python(lines):
+    tree = ast.parse("\n".join(lines))
+    prologue, units = [], []
+    for node in tree.body:
+        block = lines[node.lineno - 1:node.end_lineno]
+        (prologue if isinstance(node, (ast.Import, ast.ImportFrom)) else units).append(block)
+    return [line for block in prologue for line in block], units, []
+
+
+def _bracket_delta(line, state):
+    # Bracket depth change of one line, skipping strings and comments. `state` carries an
+    # open block comment or template literal over to the next line.
+    delta, i, quote = 0, 0, None
+    while i < len(line):
+        char = line[i]
+        if state.get("comment"):
+            end = line.find("*/", i)
+            if end == -1:
+                return delta
+            state["comment"], i = False, end + 2
+            continue
+        if quote:
+            if char == "\\":
+                i += 2
+                continue
+            if char == quote:
+                quote = None
+                state["template"] = False
+        elif state.get("template"):
+            quote = "`"
+            continue
+        elif line.startswith("//", i) or char == "#" and i == 0:
+            return delta
+        elif line.startswith("/*", i):
+            state["comment"], i = True, i + 2
+            continue
+        elif char in "'\"`":
+            quote = char
+        elif char in "{([":
+            delta += 1
+        elif char in "})]":
+            delta -= 1
+        i += 1
+    if quote == "`":
+        state["template"] = True
+    return delta
+
+
+def _split_c_like(language, lines):
+    prologue = []
+    start = 0
+    if language == "php" and lines and lines[0].lstrip().startswith("<?php"):
+        prologue, start = [lines[0]], 1
+    units, current, depth, state = [], [], 0, {}
+    for line in lines[start:]:
+        if not current and not line.strip():
+            continue
+        current.append(line)
+        depth += _bracket_delta(line, state)
+        if depth <= 0 and not state.get("comment") and not state.get("template"):
+            units.append(current)
+            current, depth = [], 0
+    if current:
+        units.append(current)
+    return prologue, units, []
+
+
+def _split_html(lines):
+    body = next(i for i, line in enumerate(lines) if re.search(r"<body\b", line, re.IGNORECASE))
+    end = max(i for i, line in enumerate(lines) if re.search(r"</body\s*>", line, re.IGNORECASE))
+    units, current, depth = [], [], 0
+    for line in lines[body + 1:end]:
+        if not current and not line.strip():
+            continue
+        current.append(line)
+        for closing, tag, self_closing in HTML_TAG.findall(line):
+            if tag.lower() in HTML_VOID or self_closing:
+                continue
+            depth += -1 if closing else 1
+        if depth <= 0:
+            units.append(current)
+            current, depth = [], 0
+    if current:
+        units.append(current)
+    return lines[:body + 1], units, lines[end:]
+
+
+def split_units(language, code):
+    """(prologue lines, [unit lines], epilogue lines) of a source file."""
+    lines = code.split("\n")
+    if language == "python":
+        return _split_python(lines)
+    if language == "html":
+        return _split_html(lines)
+    if language in C_LIKE:
+        return _split_c_like(language, lines)
+    raise ValueError(f"Unsupported language: {language}")
+
+
+# Classification
+
+def _finding_lines(code, language):
+    lines = set()
+    for finding in scan_code(code, language):
+        for occurrence in finding.get("occurrences", ()):
+            lines.add(occurrence["line"])
+    return lines
+
+
+def classify(language, prologue, units, epilogue):
+    """For each unit, whether a finding of the scanner points into it (in document context)."""
+    document = prologue + [line for unit in units for line in unit] + epilogue
+    hit_lines = _finding_lines("\n".join(document), language)
+    flags, line = [], len(prologue) + 1
+    for unit in units:
+        flags.append(any(n in hit_lines for n in range(line, line + len(unit))))
+        line += len(unit)
+    return flags
+
+
+@lru_cache(maxsize=None)
+def seed_corpus(language):
+    with open(example_path(language), "r", encoding="utf-8") as f:
+        code = f.read()
+    prologue, units, epilogue = split_units(language, code)
+    templates = [template.rstrip("\n").split("\n") for template in CLEAN_TEMPLATES.get(language, ())]
+    samples = [[line.replace("{n}", "0") for line in template] for template in templates]
+    flags = classify(language, prologue, units + samples, epilogue)
+
+    vulnerable = ["\n".join(unit) for unit, flag in zip(units, flags) if flag]
+    clean = ["\n".join(unit) for unit, flag in zip(units, flags) if not flag]
+    # Templates are only used when benign; "{n}" stays in place for generate().
+    clean += ["\n".join(template) for template, flag in zip(templates, flags[len(units):]) if not flag]
+    if not vulnerable or not clean:
+        raise ValueError(f"Cannot build a corpus for '{language}': needs vulnerable and clean units")
+    return SeedCorpus(language, "\n".join(prologue), "\n".join(epilogue), vulnerable, clean)
+
+
+def _render(unit, n):
+    return unit.replace("{n}", str(n)) if "{n}" in unit else unit
+
+
+def generate(language, size, density=0.2, seed=0):
+    """
+    A synthetic `language` source of about `size` characters (never less, at most one unit
+    more) in which a `density` fraction of the units is vulnerable.
+    """
+    if not 0.0 <= density <= 1.0:
+        raise ValueError("density must be between 0 and 1")
+    corpus = seed_corpus(language)
+    rng = random.Random(f"{language}:{size}:{density}:{seed}")
+    parts = [corpus.prologue] if corpus.prologue else []
+    length = len(corpus.prologue) + len(corpus.epilogue) + 1
+    n = 0
+    while length < size:
+        n += 1
+        pool = corpus.vulnerable if rng.random() < density else corpus.clean
+        unit = _render(rng.choice(pool), n)
+        parts.append(unit)
+        length += len(unit) + 1
+    if corpus.epilogue:
+        parts.append(corpus.epilogue)
+    return "\n".join(parts) + "\n"
+
+
+def main():
+    languages = sorted({language for language, _ in SUPPORTED_LANGUAGES.values()})
+    parser = argparse.ArgumentParser(description="Generate a synthetic source file for benchmarking")
+    parser.add_argument("language", choices=languages)
+    parser.add_argument("size", type=parse_size, help="Target size, e.g. 1KB, 64KB, 2MB")
+    parser.add_argument("--density", type=float, default=0.2, help="Fraction of vulnerable units (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(generate(args.language, args.size, args.density, args.seed), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,16 @@ def get_config():
         "ENABLE_ANALYTICS": os.getenv("NUVAI_ANALYTICS", "False") == "True",
         "ALLOW_EXTERNAL_API": os.getenv("NUVAI_ALLOW_API", "False") == "True",
         "PROFILE": os.getenv("NUVAI_PROFILE", "default"),
+        "SCAN_CACHE_ENABLED": os.getenv("NUVAI_SCAN_CACHE", "True") == "True",
+        "SCAN_CACHE_MAX_ENTRIES": int(os.getenv("NUVAI_SCAN_CACHE_MAX_ENTRIES", "10000")),
+        "SCAN_WORKERS": int(os.getenv("NUVAI_SCAN_WORKERS", "4")),
+        "SCAN_REQUEST_WORKERS": int(os.getenv("NUVAI_SCAN_REQUEST_WORKERS", "8")),
+        "SCAN_QUEUE_SIZE": int(os.getenv("NUVAI_SCAN_QUEUE_SIZE", "100")),
+        "SCAN_JOB_TTL": int(os.getenv("NUVAI_SCAN_JOB_TTL", "3600")),
+        "SCAN_PROFILING": os.getenv("NUVAI_SCAN_PROFILING", "False") == "True",
+        "AI_CACHE_ENABLED": os.getenv("NUVAI_AI_CACHE", "True") == "True",
+        "AI_CACHE_TTL": int(os.getenv("NUVAI_AI_CACHE_TTL", "86400")),
+        "AI_BATCH_MAX_FILES": int(os.getenv("NUVAI_AI_BATCH_MAX_FILES", "8")),
         "ALLOWED_ORIGINS": os.getenv("ALLOWED_ORIGINS", "http://localhost:3000").split(","),
         "SMTP": {
             "SERVER": os.getenv("SMTP_SERVER", "smtp.luai.io"),
@@ -4,23 +4,31 @@ import sys
 import os
 from dotenv import load_dotenv
 load_dotenv()
-import uuid
+import json
+import re
+import time
 from src.nuvai.core.db import Base, engine
 from src.nuvai.models import user
 from src.nuvai.models import early_access
 import logging 
 from functools import wraps
-from flask import Flask, request, jsonify, send_from_directory, abort
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, g, request, jsonify, send_from_directory, abort, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
-from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity
+from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity, verify_jwt_in_request
 from src.nuvai.routes.auth_routes import auth_blueprint, oauth
 from redis import Redis
 from src.nuvai.routes.reset_password_secure import reset_blueprint
 from src.nuvai.routes.early_access_routes import early_access_blueprint
 from config import get_config, validate_config
 from src.nuvai import scan_code
+from src.nuvai.scan_cache import RedisScanCache, scan_cache_key, is_cacheable
+from src.nuvai.scan_jobs import QueueFullError, ScanJobQueue, create_job_store
+from src.nuvai.scan_profiler import enable_profiling
+from src.nuvai import metrics
 from src.nuvai.utils.get_language import get_language
+from src.nuvai.utils.upload_reader import read_upload_text
 from src.nuvai.utils.logger import get_logger
 from src.nuvai.core.db import init_db
 from src.nuvai.models.user import User
@@ -39,10 +47,21 @@ logging.getLogger("flask_jwt_extended").setLevel(log_level)
 logging.getLogger("authlib").setLevel(log_level)
 logging.getLogger("luai-server").setLevel(log_level)
 logger = logging.getLogger("luai-server")
+metrics.instrument_engine(engine)
 validate_config()
 config = get_config()
 API_PORT = int(os.getenv("API_PORT", 5000))
 MAX_FILE_SIZE = config["MAX_UPLOAD_SIZE_MB"] * 1024 * 1024
+SCAN_CACHE_ENABLED = config["SCAN_CACHE_ENABLED"]
+SCAN_CACHE_MAX_ENTRIES = config["SCAN_CACHE_MAX_ENTRIES"]
+SCAN_WORKERS = config["SCAN_WORKERS"]
+SCAN_REQUEST_WORKERS = config["SCAN_REQUEST_WORKERS"]
+SCAN_QUEUE_SIZE = config["SCAN_QUEUE_SIZE"]
+SCAN_JOB_TTL = config["SCAN_JOB_TTL"]
+SCAN_PROFILING = config["SCAN_PROFILING"]
+AI_CACHE_ENABLED = config["AI_CACHE_ENABLED"]
+AI_CACHE_TTL = config["AI_CACHE_TTL"]
+AI_BATCH_MAX_FILES = config["AI_BATCH_MAX_FILES"]
 UPLOAD_FOLDER = os.path.join(os.getcwd(), "backend", "tmp")
 ALLOWED_ORIGINS = [origin.strip() for origin in os.getenv("ALLOWED_ORIGINS", "").split(",") if origin.strip()]
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -87,7 +106,11 @@ def create_app():
     app.config["JWT_COOKIE_CSRF_PROTECT"] = False
     app.config["JWT_DECODE_AUDIENCE"] = "luai-client"
     app.config["JWT_ENCODE_ISSUER"] = "luai-auth"
-    app.config['REDIS_CLIENT'] = Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    app.config['REDIS_CLIENT'] = metrics.instrument_redis(Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    app.config['SCAN_CACHE'] = RedisScanCache(app.config['REDIS_CLIENT'], max_entries=SCAN_CACHE_MAX_ENTRIES) if SCAN_CACHE_ENABLED else None
+    app.config['SCAN_POOL'] = ThreadPoolExecutor(max_workers=SCAN_REQUEST_WORKERS, thread_name_prefix="scan-file")
+    app.config['SCAN_JOBS'] = ScanJobQueue(create_job_store(app.config['REDIS_CLIENT'], SCAN_JOB_TTL), max_workers=SCAN_WORKERS, max_pending=SCAN_QUEUE_SIZE)
+    app.config['SCAN_PROFILER'] = enable_profiling() if SCAN_PROFILING else None
     logger.debug(f"ALLOWED_ORIGINS = {ALLOWED_ORIGINS}")
     oauth.init_app(app)
     CORS(app,
@@ -136,12 +159,34 @@ def create_app():
             "service": "Luai-scanner"
         }), 200
 
+    @app.route("/metrics", methods=["GET"])
+    def scan_metrics():
+        # Prometheus text format; ?format=json returns the per-rule scan profile, which is
+        # only available when NUVAI_SCAN_PROFILING is enabled.
+        profiler = app.config.get('SCAN_PROFILER')
+        if request.args.get("format") == "json":
+            if profiler is None:
+                return jsonify({"error": "Scan profiling is disabled"}), 404
+            return jsonify(profiler.report()), 200
+        collectors = [metrics.profiler_collector(profiler)] if profiler is not None else []
+        return Response(metrics.REGISTRY.render(collectors), mimetype=metrics.CONTENT_TYPE)
+
     @app.before_request
     def log_request_info():
+        g.request_started = time.perf_counter()
         logger.info(f"Incoming request: {request.method} {request.path} from IP: {request.remote_addr}")
 
+    def record_request_metrics(response):
+        # Routes are labelled by their URL rule (e.g. /scan/<job_id>), not the raw path.
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        metrics.HTTP_REQUESTS.inc((request.method, route, str(response.status_code)))
+        started = g.get("request_started")
+        if started is not None:
+            metrics.HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, (request.method, route))
+
     @app.after_request
     def set_cors_and_security_headers(response):
+        record_request_metrics(response)
         origin = request.headers.get("Origin")
         if origin and any(origin.strip().lower() == allowed.lower() for allowed in ALLOWED_ORIGINS):
             response.headers["Access-Control-Allow-Origin"] = origin
@@ -174,61 +219,236 @@ def create_app():
         if not request.files:
             return jsonify({"error": "No file(s) uploaded"}), 400
         file_items = list(request.files.items())
+        if request.args.get("async") in ("1", "true"):
+            return enqueue_scan([read_upload(file) for _, file in file_items], request_owner())
+        if request.args.get("stream") in ("1", "true"):
+            uploads = [read_upload(file) for _, file in file_items]
+            response = Response(stream_with_context(stream_uploads(uploads)), mimetype="application/x-ndjson")
+            response.headers["Cache-Control"] = "no-cache"
+            response.headers["X-Accel-Buffering"] = "no"
+            return response
         if len(file_items) == 1:
             _, file = file_items[0]
             return jsonify(scan_and_return(file))
-        results = [scan_and_return(file) for _, file in file_items]
-        return jsonify(results)
+        return jsonify(scan_uploads_concurrently([read_upload(file) for _, file in file_items]))
+
+    @app.route("/scan/<job_id>", methods=["GET"])
+    def scan_job_status(job_id):
+        if rate_limit_check():
+            return jsonify({"error": "Too many requests"}), 429
+        if not re.fullmatch(r"[0-9a-f]{32}", job_id):
+            return jsonify({"error": "Invalid job id"}), 400
+        job = app.config['SCAN_JOBS'].get(job_id)
+        # Someone else's job is reported as missing: the job id alone does not grant access.
+        if job is None or job.pop("owner", None) != request_owner():
+            return jsonify({"error": "Job not found or expired"}), 404
+        return jsonify(job), 200 if job["status"] in ("done", "failed") else 202
+
+    def request_owner():
+        # Identity of the signed-in user, or None for anonymous requests.
+        try:
+            verify_jwt_in_request(optional=True)
+            return get_jwt_identity()
+        except Exception:
+            return None
+
+    def enqueue_scan(uploads, owner=None):
+        try:
+            job_id = app.config['SCAN_JOBS'].submit(scan_uploads, uploads, owner=owner)
+        except QueueFullError:
+            return jsonify({"error": "Scan queue is full, please retry later"}), 503
+        return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/scan/{job_id}"}), 202
+
+    def scan_uploads(uploads):
+        # Job body: same response shape as the synchronous endpoint.
+        results = scan_uploads_concurrently(uploads)
+        return results[0] if len(results) == 1 else results
+
+    def scan_uploads_concurrently(uploads):
+        # Scans of all files run in parallel on the shared bounded pool, then the files that
+        # need an AI analysis are analyzed together (cached, deduplicated and batched, see
+        # analyze_many), also on the pool. Results keep the upload order. Unreadable uploads
+        # never occupy a worker.
+        futures = [None if error else app.config['SCAN_POOL'].submit(prepare_source, filename, code)
+                   for filename, code, error in uploads]
+        prepared = [error if future is None else future.result()
+                    for (_, _, error), future in zip(uploads, futures)]
+        pending = [item for item in prepared if "scan" in item]
+        summaries = run_analyses_later([item["scan"] for item in pending])
+        for item, ai_summary in zip(pending, summaries):
+            item["result"] = finish_source(item["scan"], ai_summary)
+        return [item.get("result", item) for item in prepared]
+
+    def stream_uploads(uploads):
+        # One JSON object per line; see stream_source for the event sequence of each file.
+        for filename, code, error in uploads:
+            events = [{"event": "error", **error}] if error else stream_source(filename, code)
+            for event in events:
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    def run_scan(code, language):
+        started = time.perf_counter()
+        findings = scan_code(code, language)
+        label = (language or "unknown",)
+        metrics.SCAN_DURATION.observe(time.perf_counter() - started, ("scan",) + label)
+        metrics.SCANNED_FILES.inc(label)
+        metrics.SCANNED_BYTES.inc(label, len(code))
+        metrics.record_findings(findings)
+        return findings
+
+    def get_ai_cache():
+        # Created on first use, since ai_analyzer is only imported once an analysis is needed.
+        # Analyses contain neither code nor file names, so the cache is shared by all users.
+        if 'AI_CACHE' not in app.config:
+            from src.nuvai.utils.ai_analyzer import RedisAnalysisCache
+            app.config['AI_CACHE'] = RedisAnalysisCache(app.config['REDIS_CLIENT'], ttl=AI_CACHE_TTL) if AI_CACHE_ENABLED else None
+        return app.config['AI_CACHE']
 
     def run_analysis_later(data):
+        started = time.perf_counter()
         try:
             from src.nuvai.utils.ai_analyzer import analyze_scan_results
-            return analyze_scan_results(data)
+            return analyze_scan_results(data, cache=get_ai_cache())
         except Exception as e:
             logger.warning(f"[AI Analyzer] Skipped due to missing key or error: {e}")
             return {"ai_analysis": "AI analysis not available.", "model_used": "None"}
+        finally:
+            metrics.SCAN_DURATION.observe(time.perf_counter() - started, ("ai", data.get("language") or "unknown"))
 
-    def scan_and_return(file):
+    def stream_analysis_later(data):
+        started = time.perf_counter()
+        try:
+            from src.nuvai.utils.ai_analyzer import analyze_scan_results
+            yield from analyze_scan_results(data, stream=True, cache=get_ai_cache())
+        except Exception as e:
+            logger.warning(f"[AI Analyzer] Skipped due to missing key or error: {e}")
+            yield {"type": "done", "ai_analysis": "AI analysis not available.", "model_used": "None"}
+        finally:
+            metrics.SCAN_DURATION.observe(time.perf_counter() - started, ("ai", data.get("language") or "unknown"))
+
+    def run_analyses_later(scans):
+        if not scans:
+            return []
+        started = time.perf_counter()
+        try:
+            from src.nuvai.utils.ai_analyzer import analyze_many
+            return analyze_many(scans, cache=get_ai_cache(), executor=app.config['SCAN_POOL'], max_batch_files=AI_BATCH_MAX_FILES)
+        except Exception as e:
+            logger.warning(f"[AI Analyzer] Skipped due to missing key or error: {e}")
+            return [{"ai_analysis": "AI analysis not available.", "model_used": "None"} for _ in scans]
+        finally:
+            # One observation per file, as for single analyses: the batch's time spread over its files.
+            elapsed = (time.perf_counter() - started) / len(scans)
+            for data in scans:
+                metrics.SCAN_DURATION.observe(elapsed, ("ai", data.get("language") or "unknown"))
+
+    def normalize_findings(findings):
+        return [{
+            "severity": f.get("severity") or f.get("level", "info").lower(),
+            "title": f.get("title") or f.get("type", "Untitled Finding"),
+            "description": f.get("description") or f.get("message", "No description provided."),
+            "recommendation": f.get("recommendation", "No recommendation available."),
+            **{key: f[key] for key in ("line", "column", "snippet", "occurrences") if key in f}
+        } for f in findings]
+
+    def scan_findings(code, language):
+        # Only findings are cached: they depend on the code alone, so entries are shared by
+        # everyone. The AI analysis is looked up in the per-user AI cache (get_ai_cache).
+        scan_cache = app.config.get('SCAN_CACHE')
+        if not scan_cache:
+            return run_scan(code, language)
+        cache_key = scan_cache_key(code, language)
+        findings = scan_cache.get(cache_key)
+        metrics.SCAN_CACHE_LOOKUPS.inc(("miss" if findings is None else "hit",))
+        if findings is None:
+            findings = run_scan(code, language)
+            if is_cacheable(findings):
+                scan_cache.put(cache_key, findings)
+        return findings
+
+    def read_upload(file):
+        """
+        Returns (original_filename, code, error_result); error_result is None on success.
+        """
         original_filename = secure_filename(file.filename)
         if not original_filename.lower().endswith((".py", ".js", ".html", ".java")):
             logger.warning(f"Disallowed file type: {original_filename}")
-            return {"filename": original_filename, "error": "Unsupported file type"}
-        file_id = uuid.uuid4().hex
-        filename = f"{file_id}_{original_filename}"
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
+            return original_filename, None, {"filename": original_filename, "error": "Unsupported file type"}
+        try:
+            # Decoded straight from the upload stream, without a copy on disk.
+            return original_filename, read_upload_text(file.stream), None
+        except UnicodeDecodeError:
+            return original_filename, None, {"filename": original_filename, "error": "Unable to decode file. Please ensure UTF-8 encoding."}
+        except Exception as e:
+            logger.exception(f"Failed to read uploaded file {original_filename}")
+            return original_filename, None, {"filename": original_filename, "error": str(e)}
+
+    def prepare_source(original_filename, code):
+        """
+        Scan step of scan_source: {"result": ...} for a failed scan, otherwise
+        {"scan": <analyzer input>} for finish_source().
+        """
         try:
-            file.save(file_path)
-            with open(file_path, "r", encoding="utf-8") as f:
-                code = f.read()
             language = get_language(original_filename, code)
-            findings = scan_code(code, language)
-            ai_summary = run_analysis_later({
-                "filename": original_filename,
-                "language": language,
-                "vulnerabilities": findings
-            })
-            normalized = [{
-                "severity": f.get("severity") or f.get("level", "info").lower(),
-                "title": f.get("title") or f.get("type", "Untitled Finding"),
-                "description": f.get("description") or f.get("message", "No description provided."),
-                "recommendation": f.get("recommendation", "No recommendation available.")
-            } for f in findings]
+            findings = scan_findings(code, language)
+            return {"scan": {"filename": original_filename, "language": language, "vulnerabilities": findings}}
+        except Exception as e:
+            logger.exception(f"Scan failed for file {original_filename}")
+            return {"result": {"filename": original_filename, "error": str(e)}}
+
+    def finish_source(scan, ai_summary):
+        try:
             return {
-                "filename": original_filename,
-                "language": language,
-                "vulnerabilities": normalized,
+                "filename": scan["filename"],
+                "language": scan["language"],
+                "vulnerabilities": normalize_findings(scan["vulnerabilities"]),
                 "ai_analysis": ai_summary.get("ai_analysis", ""),
                 "model_used": ai_summary.get("model_used", "")
             }
-        except UnicodeDecodeError:
-            return {"filename": original_filename, "error": "Unable to decode file. Please ensure UTF-8 encoding."}
+        except Exception as e:
+            logger.exception(f"Scan failed for file {scan['filename']}")
+            return {"filename": scan["filename"], "error": str(e)}
+
+    def scan_source(original_filename, code):
+        prepared = prepare_source(original_filename, code)
+        if "result" in prepared:
+            return prepared["result"]
+        return finish_source(prepared["scan"], run_analysis_later(prepared["scan"]))
+
+    def stream_source(original_filename, code):
+        """
+        Events for one file: "findings" as soon as the regex scan is done, then "ai_delta"
+        chunks while the AI analysis is generated, then "ai_done" (or "ai_error") carrying the
+        full analysis text. A scan failure yields a single "error" event.
+        """
+        try:
+            language = get_language(original_filename, code)
+            findings = scan_findings(code, language)
+            normalized = normalize_findings(findings)
         except Exception as e:
             logger.exception(f"Scan failed for file {original_filename}")
-            return {"filename": original_filename, "error": str(e)}
-        finally:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                logger.debug(f"Temporary file '{file_path}' deleted")
+            yield {"event": "error", "filename": original_filename, "error": str(e)}
+            return
+        yield {"event": "findings", "filename": original_filename, "language": language, "vulnerabilities": normalized}
+
+        ai_summary = {}
+        for event in stream_analysis_later({"filename": original_filename, "language": language, "vulnerabilities": findings}):
+            if event["type"] == "delta":
+                yield {"event": "ai_delta", "filename": original_filename, "text": event["text"]}
+            else:
+                ai_summary = event
+        yield {
+            "event": "ai_error" if ai_summary.get("error") else "ai_done",
+            "filename": original_filename,
+            "ai_analysis": ai_summary.get("ai_analysis", ""),
+            "model_used": ai_summary.get("model_used", "")
+        }
+
+    def scan_and_return(file):
+        original_filename, code, error = read_upload(file)
+        if error:
+            return error
+        return scan_source(original_filename, code)
     return app
 
 if __name__ == "__main__":
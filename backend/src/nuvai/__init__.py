@@ -1,12 +1,57 @@
+"""
+Only the scanner dispatch (scanner.py) is imported with the package. Everything the package
+used to star-import from its submodules (scanner classes, rules, report_saver, scan_cache)
+is still available as an attribute, but its module is imported on first access (PEP 562),
+so `from src.nuvai import scan_code` does not load every scanner, the report writers or
+their dependencies. Scanner modules themselves are loaded by scan_code() per language.
+"""
+
+import importlib
+
 from .scanner import *
-from .javascript_scanner import *
-from .typescript_scanner import *
-from .php_scanner import *
-from .python_scanner import *
-from .report_saver import *
-from .html_scanner import *
-from .cpp_scanner import *
-from .jsx_scanner import *
+
+# Submodules in their former star-import order; for names defined in several of them, the
+# last one wins, as it did with the star imports.
+_SUBMODULES = (
+    "scanner",
+    "javascript_scanner",
+    "typescript_scanner",
+    "php_scanner",
+    "python_scanner",
+    "report_saver",
+    "html_scanner",
+    "cpp_scanner",
+    "jsx_scanner",
+    "rules",
+    "scan_cache",
+)
+
+_EXPORTS = {
+    "JavaScriptScanner": "javascript_scanner",
+    "TypeScriptScanner": "typescript_scanner",
+    "PHPScanner": "php_scanner",
+    "PythonScanner": "python_scanner",
+    "PythonRegexScanner": "python_scanner",
+    "HTMLScanner": "html_scanner",
+    "HTMLRegexScanner": "html_scanner",
+    "CppScanner": "cpp_scanner",
+    "JSXScanner": "jsx_scanner",
+    "save_report": "report_saver",
+    "describe_location": "report_saver",
+    "ensure_report_directory": "report_saver",
+    "generate_filename": "report_saver",
+    "Rule": "rules",
+    "RuleSet": "rules",
+    "RuleScanner": "rules",
+    "register_rules": "rules",
+    "get_rules": "rules",
+    "registered_languages": "rules",
+    "cached_scan_code": "scan_cache",
+    "scan_cache_key": "scan_cache",
+    "FileScanCache": "scan_cache",
+    "RedisScanCache": "scan_cache",
+    "get_file_cache": "scan_cache",
+}
 
 __all__ = [
     "scanner",
@@ -17,5 +62,22 @@ __all__ = [
     "report_saver",
     "html_scanner",
     "cpp_scanner",
-    "jsx_scanner"
-]
\ No newline at end of file
+    "jsx_scanner",
+    "rules",
+    "scan_cache"
+]
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    if name.startswith("_"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    candidates = (_EXPORTS[name],) if name in _EXPORTS else reversed(_SUBMODULES)
+    for module_name in candidates:
+        module = importlib.import_module(f".{module_name}", __name__)
+        if hasattr(module, name):
+            value = getattr(module, name)
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
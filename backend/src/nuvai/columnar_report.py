@@ -0,0 +1,386 @@
+"""
+File: columnar_report.py
+
+Description:
+Compact columnar binary format (.nvr) for storing scan reports long term, e.g. every nightly
+scan for trend analysis, with a reader that memory-maps the file and answers severity, rule
+and file filters from the columns without decoding the findings it skips.
+
+Layout (little-endian):
+- header: magic "NVRC", format version;
+- text heap: UTF-8 snippets (and the JSON of any non-standard finding keys), written as the
+  findings arrive; a snippet equal to the previous one (a finding's first occurrence repeats
+  its primary location) is stored once;
+- columns, 8-byte aligned, one array per field: rule index, severity code, file, line, column,
+  snippet, occurrence range and extras per finding; line, column and snippet per occurrence;
+  the offsets of the text heap;
+- footer: JSON with the interned strings (types, levels, messages, recommendations and file
+  paths, each stored once), the rule table (type, level, message, recommendation as string
+  ids) and the offset, type code and length of every column;
+- trailer: footer offset and length, magic.
+
+Severity codes order the levels (SEVERITY_LEVELS, 1 = TIP ... 6 = CRITICAL; 0 = any other
+level such as ERROR), so "HIGH and above" is a scan of a one-byte column.
+
+ColumnarReportWriter is a ReportWriter (report_saver.py, format "nvr"): only the interned
+strings and the integer columns are kept in memory while writing.
+
+Usage (from the backend directory):
+    python -m src.nuvai.columnar_report from-json report.json report.nvr
+    python -m src.nuvai.columnar_report to-json report.nvr report.json
+    python -m src.nuvai.columnar_report query report.nvr --min-level HIGH [--type "Hardcoded Secrets"]
+"""
+
+import argparse
+import json
+import mmap
+import re
+import struct
+import sys
+from array import array
+from collections import Counter
+
+from .report_saver import ReportWriter, open_report
+
+MAGIC = b"NVRC"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sH2x")
+TRAILER = struct.Struct("<QQ4s")
+SEVERITY_LEVELS = ("TIP", "INFO", "WARNING", "MEDIUM", "HIGH", "CRITICAL")
+SEVERITY_CODES = {level: code for code, level in enumerate(SEVERITY_LEVELS, start=1)}
+STANDARD_KEYS = ("level", "type", "message", "recommendation", "line", "column", "snippet", "occurrences", "file")
+OCCURRENCE_KEYS = {"line", "column", "snippet"}
+FINDING_COLUMNS = (
+    ("rule", "I"),
+    ("severity", "B"),
+    ("file", "i"),
+    ("line", "i"),
+    ("column", "i"),
+    ("snippet", "i"),
+    ("occurrence_start", "I"),
+    ("occurrence_count", "i"),
+    ("extra", "i"),
+)
+OCCURRENCE_COLUMNS = (
+    ("occurrence_line", "i"),
+    ("occurrence_column", "i"),
+    ("occurrence_snippet", "i"),
+)
+# Text ids: -1 = key absent, -2 = key present with a null value.
+ABSENT = -1
+NULL = -2
+
+
+class ColumnarReportError(ValueError):
+    pass
+
+
+def severity_code(level):
+    return SEVERITY_CODES.get(str(level).upper(), 0)
+
+
+def is_plain_occurrence(occurrence):
+    # Occurrences that fit the occurrence columns; others are kept in the finding's extras.
+    return (isinstance(occurrence, dict) and set(occurrence) == OCCURRENCE_KEYS
+            and isinstance(occurrence["line"], int) and isinstance(occurrence["column"], int)
+            and (occurrence["snippet"] is None or isinstance(occurrence["snippet"], str)))
+
+
+class ColumnarReportWriter(ReportWriter):
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION))
+        self._strings = {}
+        self._rules = {}
+        self._columns = {name: array(code) for name, code in FINDING_COLUMNS + OCCURRENCE_COLUMNS}
+        self._text_offsets = array("Q", [HEADER.size])
+        self._last_text = None
+
+    def _intern(self, value):
+        return self._strings.setdefault(value, len(self._strings))
+
+    def _text(self, value):
+        if value is None:
+            return NULL
+        if value != self._last_text:
+            self._file.write(value.encode("utf-8", "surrogatepass"))
+            self._text_offsets.append(self._file.tell())
+            self._last_text = value
+        return len(self._text_offsets) - 2
+
+    def write_finding(self, fnd, file_path):
+        columns = self._columns
+        key = tuple(self._intern(str(fnd[name])) for name in ("type", "level", "message", "recommendation"))
+        columns["rule"].append(self._rules.setdefault(key, len(self._rules)))
+        columns["severity"].append(severity_code(fnd["level"]))
+        file_path = file_path if file_path is not None else fnd.get("file")
+        columns["file"].append(self._intern(file_path) if file_path is not None else ABSENT)
+        extra = {name: value for name, value in fnd.items() if name not in STANDARD_KEYS}
+        for name in ("line", "column"):
+            value = fnd.get(name, ABSENT)
+            if value is not None and not isinstance(value, int):
+                extra[name], value = value, ABSENT
+            columns[name].append(NULL if value is None else value)
+        snippet = fnd.get("snippet", ABSENT)
+        if snippet is not ABSENT and snippet is not None and not isinstance(snippet, str):
+            extra["snippet"], snippet = snippet, ABSENT
+        columns["snippet"].append(ABSENT if snippet is ABSENT else self._text(snippet))
+
+        occurrences = fnd.get("occurrences")
+        columns["occurrence_start"].append(len(columns["occurrence_line"]))
+        if occurrences is None:
+            columns["occurrence_count"].append(ABSENT)
+        elif all(is_plain_occurrence(occurrence) for occurrence in occurrences):
+            columns["occurrence_count"].append(len(occurrences))
+            for occurrence in occurrences:
+                columns["occurrence_line"].append(occurrence["line"])
+                columns["occurrence_column"].append(occurrence["column"])
+                columns["occurrence_snippet"].append(self._text(occurrence["snippet"]))
+        else:
+            columns["occurrence_count"].append(ABSENT)
+            extra["occurrences"] = occurrences
+        columns["extra"].append(self._text(json.dumps(extra, ensure_ascii=False)) if extra else ABSENT)
+
+    def end(self):
+        f = self._file
+        layout = {}
+        for name, column in (*self._columns.items(), ("text_offsets", self._text_offsets)):
+            f.write(b"\0" * (-f.tell() % 8))
+            layout[name] = [f.tell(), column.typecode, len(column)]
+            if sys.byteorder != "little":
+                column = array(column.typecode, column)
+                column.byteswap()
+            column.tofile(f)
+        footer = json.dumps({
+            "version": FORMAT_VERSION,
+            "count": self.count,
+            "strings": list(self._strings),
+            "rules": list(self._rules),
+            "columns": layout,
+        }, ensure_ascii=False).encode("utf-8", "surrogatepass")
+        offset = f.tell()
+        f.write(footer)
+        f.write(TRAILER.pack(offset, len(footer), MAGIC))
+
+
+class ColumnarReport:
+    """
+    Read-only view of an .nvr file. Columns are memoryviews over the mapped file; findings
+    are decoded on access (finding(i), iteration, select()).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ColumnarReportError(f"{path} is empty")
+        self._views = []
+        try:
+            self._load()
+        except Exception:
+            self.close()
+            raise
+
+    def _load(self):
+        size = len(self._mmap)
+        if size < HEADER.size + TRAILER.size:
+            raise ColumnarReportError(f"{self.path} is not a columnar report")
+        magic, version = HEADER.unpack_from(self._mmap, 0)
+        footer_offset, footer_length, end_magic = TRAILER.unpack_from(self._mmap, size - TRAILER.size)
+        if magic != MAGIC or end_magic != MAGIC:
+            raise ColumnarReportError(f"{self.path} is not a columnar report")
+        if version != FORMAT_VERSION:
+            raise ColumnarReportError(f"Unsupported columnar report version {version}")
+        footer = json.loads(self._mmap[footer_offset:footer_offset + footer_length].decode("utf-8", "surrogatepass"))
+        self.count = footer["count"]
+        self.strings = footer["strings"]
+        self.rules = [tuple(self.strings[i] for i in rule) for rule in footer["rules"]]
+        self.columns = {name: self._column(*spec) for name, spec in footer["columns"].items()}
+
+    def _column(self, offset, typecode, length):
+        itemsize = array(typecode).itemsize
+        view = memoryview(self._mmap)[offset:offset + length * itemsize]
+        self._views.append(view)
+        if sys.byteorder != "little":
+            column = array(typecode, view.tobytes())
+            column.byteswap()
+            return column
+        column = view.cast(typecode)
+        self._views.append(column)
+        return column
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self.columns = {}
+        if getattr(self, "_mmap", None) is not None and not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.finding(index)
+
+    def text(self, text_id):
+        if text_id == NULL:
+            return None
+        offsets = self.columns["text_offsets"]
+        return self._mmap[offsets[text_id]:offsets[text_id + 1]].decode("utf-8", "surrogatepass")
+
+    def finding(self, index):
+        columns = self.columns
+        rule_type, level, message, recommendation = self.rules[columns["rule"][index]]
+        fnd = {"level": level, "type": rule_type, "message": message, "recommendation": recommendation}
+        for name in ("line", "column"):
+            value = columns[name][index]
+            if value != ABSENT:
+                fnd[name] = None if value == NULL else value
+        if columns["snippet"][index] != ABSENT:
+            fnd["snippet"] = self.text(columns["snippet"][index])
+        count = columns["occurrence_count"][index]
+        if count != ABSENT:
+            start = columns["occurrence_start"][index]
+            fnd["occurrences"] = [{
+                "line": columns["occurrence_line"][i],
+                "column": columns["occurrence_column"][i],
+                "snippet": self.text(columns["occurrence_snippet"][i]),
+            } for i in range(start, start + count)]
+        if columns["extra"][index] != ABSENT:
+            fnd.update(json.loads(self.text(columns["extra"][index])))
+        if columns["file"][index] != ABSENT:
+            fnd["file"] = self.strings[columns["file"][index]]
+        return fnd
+
+    def indices(self, levels=None, min_level=None, types=None, files=None):
+        """Indices of the findings matching every given filter, read from the columns only."""
+        codes = None
+        if levels is not None:
+            codes = {severity_code(level) for level in levels}
+        if min_level is not None:
+            minimum = {code for code in SEVERITY_CODES.values() if code >= severity_code(min_level)}
+            codes = minimum if codes is None else codes & minimum
+        if codes:
+            # The severity column is one byte per finding: let the regex engine scan it.
+            pattern = re.compile(b"[" + b"".join(re.escape(bytes([code])) for code in sorted(codes)) + b"]")
+            candidates = (match.start() for match in pattern.finditer(self.columns["severity"]))
+        elif codes is not None:
+            candidates = ()
+        else:
+            candidates = range(self.count)
+
+        rule_ids = None
+        if types is not None:
+            types = set(types)
+            rule_ids = {i for i, rule in enumerate(self.rules) if rule[0] in types}
+        file_ids = None
+        if files is not None:
+            files = set(files)
+            file_ids = {i for i, value in enumerate(self.strings) if value in files}
+        rule_column, file_column = self.columns["rule"], self.columns["file"]
+        for index in candidates:
+            if rule_ids is not None and rule_column[index] not in rule_ids:
+                continue
+            if file_ids is not None and file_column[index] not in file_ids:
+                continue
+            yield index
+
+    def select(self, **filters):
+        for index in self.indices(**filters):
+            yield self.finding(index)
+
+    def level_counts(self):
+        counts = Counter()
+        for rule_index, count in Counter(self.columns["rule"]).items():
+            counts[self.rules[rule_index][1]] += count
+        return dict(counts)
+
+
+def iter_json_findings(path):
+    """(finding, file path or None) from a json or jsonl report, or a baseline report."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line), None
+            return
+        data = json.load(f)
+    if isinstance(data, dict) and isinstance(data.get("files"), dict):
+        for file_path, findings in data["files"].items():
+            for fnd in findings:
+                yield fnd, file_path
+    elif isinstance(data, list):
+        for fnd in data:
+            yield fnd, None
+    else:
+        raise ColumnarReportError(f"{path} is not a json report")
+
+
+def json_to_columnar(json_path, columnar_path):
+    with ColumnarReportWriter(columnar_path) as writer:
+        for fnd, file_path in iter_json_findings(json_path):
+            writer.write(fnd, file_path)
+    return writer.count
+
+
+def columnar_to_json(columnar_path, json_path, extension="json"):
+    with ColumnarReport(columnar_path) as report:
+        with open_report(extension, json_path) as writer:
+            writer.write_all(report)
+    return writer.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert and query columnar (.nvr) scan reports")
+    commands = parser.add_subparsers(dest="command", required=True)
+    from_json = commands.add_parser("from-json", help="Convert a json/jsonl or baseline report to .nvr")
+    from_json.add_argument("source")
+    from_json.add_argument("target")
+    to_json = commands.add_parser("to-json", help="Convert a .nvr report to json (or jsonl with a .jsonl target)")
+    to_json.add_argument("source")
+    to_json.add_argument("target")
+    query = commands.add_parser("query", help="Print the matching findings as json lines")
+    query.add_argument("source")
+    query.add_argument("--level", action="append", help="Exact level (repeatable)")
+    query.add_argument("--min-level", choices=SEVERITY_LEVELS)
+    query.add_argument("--type", action="append", help="Finding type (repeatable)")
+    query.add_argument("--file", action="append", help="File path (repeatable)")
+    query.add_argument("--count", action="store_true", help="Only print the number of matches")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "from-json":
+            print(f"{json_to_columnar(args.source, args.target)} finding(s) written to {args.target}")
+        elif args.command == "to-json":
+            extension = "jsonl" if args.target.endswith(".jsonl") else "json"
+            print(f"{columnar_to_json(args.source, args.target, extension)} finding(s) written to {args.target}")
+        else:
+            with ColumnarReport(args.source) as report:
+                matches = report.indices(levels=args.level, min_level=args.min_level, types=args.type, files=args.file)
+                if args.count:
+                    print(sum(1 for _ in matches))
+                else:
+                    for index in matches:
+                        print(json.dumps(report.finding(index), ensure_ascii=False))
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
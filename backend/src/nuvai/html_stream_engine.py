@@ -0,0 +1,376 @@
+"""
+File: html_stream_engine.py
+
+Description:
+Event-based evaluation of the HTML rules (HTML_RULES in html_scanner.py), built on
+html.parser.HTMLParser. The document is tokenized once into start tags, end tags, text and
+comments, and every rule is checked against the events it cares about – attribute rules
+against the attributes of one tag, text rules against text nodes, comments and attribute
+values. Nothing runs over the whole document, so there is no regex backtracking across
+tags on large minified pages.
+
+Input may be fed in chunks (HtmlStreamScanner.feed); only the not-yet-parsed tail of the
+stream and the text node being read are kept in memory. HTMLParser reports text up to the
+end of each chunk, so consecutive pieces are joined before the text rules see them. Findings point at the exact tag (or text) that triggered them.
+
+Compared with the regex rules, per-tag checks are scoped to their own element: a password
+field is reported unless *its* autocomplete is off, and a form is reported as missing a CSRF
+token unless a field (or text, e.g. a template tag) inside *that* form mentions one, instead
+of whenever the word appears anywhere in the file. Attribute names and values are matched
+case-insensitively, as browsers do.
+
+Text rules are searched with the matcher's bounded search and time budget; rules abandoned
+for exceeding it are reported in one "Partial Scan" finding (rules.py). Positions of
+successive matches are tracked from the previous one and snippets are cut to a window
+around the match, so a long text node costs O(length) per rule, not per match. Markup left
+unterminated at the end of the input is scanned once as text instead of being re-parsed.
+"""
+
+import re
+import time
+from html import unescape
+from html.parser import HTMLParser, attrfind_tolerant, tagfind_tolerant
+
+from .line_index import MAX_SNIPPET_LENGTH, snippet_window
+from .matcher import MatchBudget, bounded_finditer, extract_literals
+from .scan_profiler import active_profiler
+
+HTML_ENGINE_VERSION = "html-stream/5"
+
+EVENT_HANDLERS = {"onclick", "onload", "onerror", "oninput", "onsubmit"}
+SUSPICIOUS_COMMENT = re.compile(r'TODO|FIXME|DEBUG|password', re.IGNORECASE)
+SENSITIVE_INPUT = re.compile(r'credit|card|email|address', re.IGNORECASE)
+CSRF = re.compile(r'csrf', re.IGNORECASE)
+FORM_METHODS = {"post", "get"}
+CSP = "content-security-policy"
+HIDDEN_VALUE_MIN_LENGTH = 20
+DISCLOSURE_PREFIX = "html.sensitive_disclosures."
+
+
+def _snippet(text):
+    # Whitespace is only collapsed in the part of `text` that can end up in the snippet.
+    cut = len(text) > 2 * MAX_SNIPPET_LENGTH
+    text = " ".join(text[:2 * MAX_SNIPPET_LENGTH].split())
+    if cut or len(text) > MAX_SNIPPET_LENGTH:
+        text = text[:MAX_SNIPPET_LENGTH - 3] + "..."
+    return text
+
+
+class _Positions:
+    """
+    (line, column) of offsets into `text`, which starts at (line, column). Offsets are
+    expected in increasing order; each lookup only scans the text since the previous one.
+    """
+
+    def __init__(self, text, line, column):
+        self.text = text
+        self.origin = (line, column)
+        self.reset()
+
+    def reset(self):
+        self.line, self.column = self.origin
+        self.offset = 0
+        # Offset of the current line's start, None while still on the first line.
+        self.line_start = None
+
+    def at(self, offset):
+        if offset < self.offset:
+            self.reset()
+        newlines = self.text.count("\n", self.offset, offset)
+        if newlines:
+            self.line += newlines
+            self.line_start = self.text.rfind("\n", self.offset, offset) + 1
+        self.offset = offset
+        if self.line_start is None:
+            return self.line, self.column + offset
+        return self.line, offset - self.line_start
+
+    def snippet(self, offset):
+        # Snippet of the line containing the last looked-up `offset`.
+        start = self.line_start or 0
+        end = self.text.find("\n", offset, offset + MAX_SNIPPET_LENGTH)
+        if end == -1:
+            end = min(len(self.text), offset + MAX_SNIPPET_LENGTH)
+        return " ".join(snippet_window(self.text, start, end, offset).split())
+
+
+def _any_of(regexes):
+    # One pattern matching wherever any of `regexes` matches, or None if they cannot be combined.
+    parts = []
+    for regex in regexes:
+        flags = "".join(letter for flag, letter in ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"), (re.VERBOSE, "x"))
+                        if regex.flags & flag)
+        parts.append(f"(?{flags}:{regex.pattern})" if flags else f"(?:{regex.pattern})")
+    try:
+        return re.compile("|".join(parts)) if parts else None
+    except re.error:
+        return None
+
+
+def _raw_attribute_values(source):
+    """
+    (offset, raw value) of every attribute value in a start tag's source text, tokenized as
+    HTMLParser.parse_starttag does; offsets exclude the quotes.
+    """
+    match = tagfind_tolerant.match(source, 1)
+    position = match.end() if match else len(source)
+    while position < len(source):
+        match = attrfind_tolerant.match(source, position)
+        if not match:
+            break
+        value = match.group(3)
+        if value:
+            start = match.start(3)
+            if value[:1] == value[-1:] and value[:1] in ("'", '"') and len(value) > 1:
+                start, value = start + 1, value[1:-1]
+            yield start, value
+        position = match.end()
+
+
+class HtmlStreamScanner(HTMLParser):
+    """
+    Feed HTML with feed(chunk) (any number of times), then call close() to get the findings,
+    in rule order and with the same shape (including locations) as RuleSet.evaluate().
+    """
+
+    def __init__(self, ruleset, origin=(1, 1)):
+        super().__init__(convert_charrefs=True)
+        self.ruleset = ruleset
+        self.origin = origin
+        self.hits = {}
+        self.has_csp = False
+        # Open <form> elements: [location, mentions csrf].
+        self.forms = []
+        # Start tag of the open inline <script>, and whether it has any content.
+        self.inline_script = None
+        self.script_text = False
+        # Pieces of the text node being read, and the position of the first one.
+        self.text_parts = []
+        self.text_position = None
+        # Text rules, with the literal prefilter of the regex matcher (matcher.py) for
+        # case-sensitive patterns.
+        self.disclosures = [
+            (rule.id, rule.regex, () if rule.flags & re.IGNORECASE else rule.literals or extract_literals(rule.regex) or ())
+            for rule in ruleset if rule.id.startswith(DISCLOSURE_PREFIX) and rule.regex is not None
+        ]
+        self.budgets = {rule_id: MatchBudget() for rule_id, _, _ in self.disclosures}
+        # Start tags none of the text rules match anywhere in are not split into attributes.
+        self.tag_prefilter = _any_of([regex for _, regex, _ in self.disclosures])
+        # Input size and parse time, kept for the scan profiler.
+        self.profiler = active_profiler()
+        self.size = 0
+        self.elapsed = 0.0
+
+    def feed(self, data):
+        if self.profiler is None:
+            return super().feed(data)
+        started = time.perf_counter()
+        super().feed(data)
+        self.size += len(data)
+        self.elapsed += time.perf_counter() - started
+
+    # Locations
+
+    def location(self, line, column, snippet):
+        base_line, base_column = self.origin
+        if line == 1:
+            column += base_column - 1
+        return {"line": line + base_line - 1, "column": column + 1, "snippet": snippet}
+
+    def here(self, snippet):
+        line, column = self.getpos()
+        return self.location(line, column, _snippet(snippet))
+
+    def report(self, rule_id, location):
+        self.hits.setdefault(rule_id, []).append(location)
+
+    def scan_text(self, text, line, column):
+        # Disclosure rules on a text node / comment / attribute value starting at (line, column).
+        positions = None
+        for rule_id, regex, literals in self.disclosures:
+            budget = self.budgets[rule_id]
+            if budget.exceeded or literals and not any(literal in text for literal in literals):
+                continue
+            for match in bounded_finditer(regex, text, 0, budget):
+                if positions is None:
+                    positions = _Positions(text, line, column)
+                start = match.start()
+                match_line, match_column = positions.at(start)
+                self.report(rule_id, self.location(match_line, match_column, positions.snippet(start)))
+
+    # Events
+
+    def handle_starttag(self, tag, attrs):
+        self.flush_text()
+        attributes = {}
+        for name, value in attrs:
+            attributes.setdefault(name, "" if value is None else value)
+        source = self.get_starttag_text() or f"<{tag}>"
+        location = self.here(source)
+        line, column = self.getpos()
+
+        if EVENT_HANDLERS & attributes.keys():
+            self.report("html.event_handlers", location)
+        # Values are searched as written in the tag (like the regex rules), at their own
+        # position inside it.
+        if self.disclosures and (self.tag_prefilter is None or self.tag_prefilter.search(source)):
+            positions = _Positions(source, line, column)
+            for offset, value in _raw_attribute_values(source):
+                self.scan_text(value, *positions.at(offset))
+
+        check = getattr(self, f"tag_{tag}", None)
+        if check is not None:
+            check(attributes, location)
+        if self.forms and any(CSRF.search(name) or CSRF.search(value) for name, value in attributes.items()):
+            self.forms[-1][1] = True
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag == "form":
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self.flush_text()
+        if tag == "script":
+            if self.inline_script is not None and self.script_text:
+                self.report("html.inline_scripts", self.inline_script)
+            self.inline_script = None
+        elif tag == "form" and self.forms:
+            location, has_token = self.forms.pop()
+            if not has_token:
+                self.report("html.csrf_token", location)
+
+    def handle_data(self, data):
+        if not self.text_parts:
+            self.text_position = self.getpos()
+        self.text_parts.append(data)
+
+    def flush_text(self):
+        if not self.text_parts:
+            return
+        data = "".join(self.text_parts)
+        self.text_parts = []
+        self.scan_text(data, *self.text_position)
+        if self.forms and CSRF.search(data):
+            self.forms[-1][1] = True
+        if self.inline_script is not None and data.strip():
+            self.script_text = True
+
+    def handle_comment(self, data):
+        self.flush_text()
+        line, column = self.getpos()
+        if SUSPICIOUS_COMMENT.search(data):
+            self.report("html.suspicious_comments", self.here(f"<!--{data}-->"))
+        # Text inside the comment starts after "<!--".
+        self.scan_text(data, line, column + 4)
+
+    def handle_decl(self, decl):
+        self.flush_text()
+
+    def handle_pi(self, data):
+        self.flush_text()
+
+    def unknown_decl(self, data):
+        self.flush_text()
+
+    # Tag rules
+
+    def tag_script(self, attributes, location):
+        src = attributes.get("src")
+        if src is None:
+            self.inline_script = location
+            self.script_text = False
+        elif src.lower().startswith("http:"):
+            self.report("html.external_js", location)
+
+    def tag_form(self, attributes, location):
+        self.forms.append([location, False])
+        action = attributes.get("action", "").strip().lower()
+        if action.startswith("http:"):
+            self.report("html.insecure_form_actions.http", location)
+        if action.startswith(("http://", "https://")) and "yourdomain.com" not in action:
+            self.report("html.insecure_form_actions.external", location)
+        if attributes.get("method", "").strip().lower() not in FORM_METHODS:
+            self.report("html.form_method", location)
+        if "enctype" not in attributes:
+            self.report("html.form_encoding", location)
+
+    def tag_input(self, attributes, location):
+        input_type = attributes.get("type", "").strip().lower()
+        autocomplete_off = attributes.get("autocomplete", "").strip().lower() == "off"
+        if input_type == "password" and not autocomplete_off:
+            self.report("html.password_autocomplete", location)
+        if input_type == "hidden" and len(attributes.get("value", "")) >= HIDDEN_VALUE_MIN_LENGTH:
+            self.report("html.hidden_inputs", location)
+        if not autocomplete_off and any(SENSITIVE_INPUT.search(value) for name, value in attributes.items()
+                                        if name not in ("type", "autocomplete")):
+            self.report("html.autocomplete_on_inputs", location)
+
+    def tag_a(self, attributes, location):
+        if attributes.get("target", "").strip().lower() == "_blank":
+            if "noopener" not in attributes.get("rel", "").lower().split():
+                self.report("html.blank_target_links", location)
+
+    def tag_iframe(self, attributes, location):
+        if not {"sandbox", "referrerpolicy", "allow"} & attributes.keys():
+            self.report("html.iframe_security", location)
+
+    def tag_meta(self, attributes, location):
+        if attributes.get("http-equiv", "").strip().lower() == CSP:
+            self.has_csp = True
+
+    # Results
+
+    def close(self):
+        started = time.perf_counter()
+        # HTMLParser.close() retries an unterminated construct (e.g. "<!--" without "-->")
+        # at every following "<", searching to the end of the input each time. Browsers let
+        # such a construct run to the end of the file, so the tail is scanned once as text.
+        tail = self.rawdata
+        if tail.startswith("<") and not self.cdata_elem:
+            self.rawdata = ""
+            self.handle_data(unescape(tail))
+        super().close()
+        self.flush_text()
+        for location, has_token in self.forms:
+            if not has_token:
+                self.report("html.csrf_token", location)
+        self.forms = []
+        if self.profiler is not None:
+            self.profiler.record_engine(self.ruleset.language, self.size, self.elapsed + time.perf_counter() - started)
+
+        findings = []
+        for rule in self.ruleset:
+            if rule.id == "html.missing_csp_meta":
+                if self.profiler is not None:
+                    self.profiler.record_rule(self.ruleset.language, rule.id, self.size, matches=0 if self.has_csp else 1)
+                if not self.has_csp:
+                    findings.append(rule.to_finding())
+                continue
+            if self.profiler is not None:
+                self.profiler.record_rule(self.ruleset.language, rule.id, self.size,
+                                          matches=len({(l["line"], l["column"]) for l in self.hits.get(rule.id, ())}))
+            locations = self.hits.get(rule.id)
+            if not locations:
+                continue
+            occurrences = sorted({(l["line"], l["column"]): l for l in locations}.values(),
+                                 key=lambda l: (l["line"], l["column"]))
+            finding = rule.to_finding()
+            finding.update(occurrences[0])
+            finding["occurrences"] = occurrences
+            findings.append(finding)
+        timed_out = [rule_id for rule_id, budget in self.budgets.items() if budget.exceeded]
+        if timed_out:
+            findings.append(self.ruleset.partial_scan_finding(timed_out))
+        return findings
+
+
+def scan_html_chunks(chunks, ruleset, origin=(1, 1)):
+    """
+    Findings for an HTML document given as an iterable of text chunks (e.g. a file read in
+    blocks), without joining them into one string.
+    """
+    scanner = HtmlStreamScanner(ruleset, origin)
+    for chunk in chunks:
+        scanner.feed(chunk)
+    return scanner.close()
@@ -0,0 +1,151 @@
+"""
+File: incremental.py
+
+Description:
+Git-aware incremental scanning support for the CLI (`run.py --since <git-ref>`).
+
+A full folder scan persists a baseline report holding the findings of every scanned file,
+keyed by its path relative to the scanned folder. An incremental scan asks the local git
+checkout which files changed since a ref (`git diff --name-only`, plus untracked files),
+rescans only those, and merges their findings into the baseline: changed files replace
+their previous entry and deleted files are dropped from it.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+
+from .report_saver import ensure_report_directory
+
+BASELINE_FORMAT_VERSION = 1
+
+
+def _git(folder, *args):
+    try:
+        result = subprocess.run(["git", "-C", folder, *args], capture_output=True, text=True, check=False)
+    except FileNotFoundError:
+        raise RuntimeError("git is not installed or not on PATH.")
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"git {args[0]} failed")
+    return result.stdout
+
+
+def changed_files(folder, ref, extensions):
+    """
+    Paths (relative to `folder`) of files under `folder` with one of `extensions` that
+    changed since `ref`, including uncommitted and untracked files. Deleted files are
+    included too, so callers can drop them from the baseline.
+    """
+    if not ref or ref.startswith("-"):
+        raise ValueError(f"Invalid git ref: {ref!r}")
+    folder = os.path.realpath(folder)
+    try:
+        _git(folder, "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}")
+    except RuntimeError:
+        raise ValueError(f"Unknown git ref '{ref}' (or '{folder}' is not inside a git checkout).")
+    top = _git(folder, "rev-parse", "--show-toplevel").strip()
+
+    names = _git(folder, "diff", "--name-only", "--no-renames", ref, "--").splitlines()
+    names += _git(folder, "ls-files", "--others", "--exclude-standard", "--full-name").splitlines()
+
+    changed = set()
+    for name in names:
+        full_path = os.path.realpath(os.path.join(top, name))
+        rel_path = os.path.relpath(full_path, folder)
+        if rel_path.startswith(os.pardir + os.sep):
+            continue
+        if os.path.splitext(name)[1].lower() in extensions:
+            changed.add(rel_path)
+    return sorted(changed)
+
+
+def current_commit(folder):
+    try:
+        return _git(folder, "rev-parse", "HEAD").strip()
+    except RuntimeError:
+        return None
+
+
+def default_baseline_path(folder):
+    digest = hashlib.sha1(os.path.abspath(folder).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(ensure_report_directory(), f"baseline_{digest}.json")
+
+
+def load_baseline(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return None
+    if baseline.get("version") != BASELINE_FORMAT_VERSION or not isinstance(baseline.get("files"), dict):
+        return None
+    return baseline
+
+
+class BaselineWriter:
+    """
+    Writes a baseline report one file entry at a time (add), so a full scan does not need to
+    keep the findings of every file in memory. The report replaces `path` atomically on
+    close(); as a context manager, a scan that fails leaves the previous baseline in place.
+    """
+
+    def __init__(self, path, folder):
+        self.path = path
+        self.count = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._tmp_path = f"{path}.tmp"
+        self._file = open(self._tmp_path, "w", encoding="utf-8")
+        header = json.dumps({
+            "version": BASELINE_FORMAT_VERSION,
+            "target": os.path.abspath(folder),
+            "commit": current_commit(folder),
+        }, indent=4, ensure_ascii=False)
+        self._file.write(header[:-2] + ',\n    "files": {')
+
+    def add(self, rel_path, findings):
+        entry = json.dumps({rel_path: findings}, indent=4, ensure_ascii=False)[2:-2].replace("\n", "\n    ")
+        self._file.write(f"{',' if self.count else ''}\n    {entry}")
+        self.count += 1
+
+    def close(self):
+        self._file.write("\n    }\n}" if self.count else "}\n}")
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def discard(self):
+        self._file.close()
+        os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def save_baseline(path, folder, files):
+    with BaselineWriter(path, folder) as writer:
+        for rel_path, findings in files.items():
+            writer.add(rel_path, findings)
+    return files
+
+
+def walk_order_key(rel_path):
+    # Same order as the CLI's sorted os.walk: a folder's files before its subfolders.
+    folder, name = os.path.split(rel_path)
+    return (folder.split(os.sep) if folder else [], name)
+
+
+def merge_baseline(files, changed, rescanned):
+    """
+    Merge per-file findings of `rescanned` files into the baseline `files` mapping.
+    Changed files that were not rescanned (deleted or unreadable) are dropped.
+    """
+    changed = set(changed)
+    merged = {path: findings for path, findings in files.items() if path not in changed}
+    merged.update(rescanned)
+    return {path: merged[path] for path in sorted(merged, key=walk_order_key)}
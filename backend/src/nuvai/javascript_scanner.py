@@ -19,73 +19,39 @@ Implemented Checks:
 - Insecure assignments to location.href or window.name
 - Missing validation on user-generated content
 
-Note: Regex-based detection. Future updates may incorporate AST-based analysis.
+Note: Regex-based detection driven by the shared rule registry (rules.py). Matches are checked
+against the shared JavaScript token stream (js_tokenizer.py), so patterns only fire in code,
+never in comments, string literals or JSX text.
 """
 
 import re
 
-class JavaScriptScanner:
-    def __init__(self, code):
-        self.code = code
-        self.findings = []
-
-    def run_all_checks(self):
-        self.check_dangerous_eval()
-        self.check_dom_xss()
-        self.check_insecure_storage()
-        self.check_hardcoded_secrets()
-        self.check_debug_statements()
-        self.check_insecure_http()
-        self.check_unsanitized_url_params()
-        self.check_xmlhttp_request()
-        self.check_unprotected_navigation()
-        self.check_unvalidated_user_content()
-        return self.findings
-
-    def add_finding(self, level, ftype, message, recommendation):
-        self.findings.append({
-            "level": level,
-            "type": ftype,
-            "message": message,
-            "recommendation": recommendation
-        })
-
-    def check_dangerous_eval(self):
-        if re.search(r'\b(eval|Function|setTimeout|setInterval)\s*\(', self.code):
-            self.add_finding("CRITICAL", "Dynamic Code Execution", "Use of eval or similar constructs detected.", "Avoid dynamic code execution. Use strict logic paths.")
-
-    def check_dom_xss(self):
-        if re.search(r'(innerHTML|outerHTML|document\.write)', self.code):
-            self.add_finding("HIGH", "DOM-based XSS", "Direct DOM manipulation using unsanitized data.", "Avoid setting HTML using user input. Sanitize all dynamic content.")
-
-    def check_insecure_storage(self):
-        if re.search(r'(localStorage|sessionStorage|document\.cookie)', self.code):
-            self.add_finding("WARNING", "Insecure Storage Usage", "Sensitive data accessed from browser storage.", "Avoid using local/session storage or cookies for secrets.")
-
-    def check_hardcoded_secrets(self):
-        if re.search(r'(api|token|secret|key|password)\s*[:=]\s*["\']\w{8,}["\']', self.code, re.IGNORECASE):
-            self.add_finding("HIGH", "Hardcoded Secret", "Sensitive key or token found in source code.", "Store secrets in secure backend or config files.")
-
-    def check_debug_statements(self):
-        if re.search(r'(console\.log|debugger)', self.code):
-            self.add_finding("INFO", "Debug Statement Detected", "Debugging code found.", "Remove console.log or debugger statements before production")
-
-    def check_insecure_http(self):
-        if re.search(r'fetch\("http:|axios\.get\("http:', self.code):
-            self.add_finding("HIGH", "Insecure HTTP Request", "HTTP connection used instead of HTTPS.", "Use secure HTTPS URLs for all network requests.")
-
-    def check_unsanitized_url_params(self):
-        if re.search(r'location\.search|URLSearchParams', self.code) and not re.search(r'sanitize|encode', self.code):
-            self.add_finding("HIGH", "Unsanitized URL Parameter", "Use of URL parameters without validation.", "Validate or sanitize user input from URLs.")
-
-    def check_xmlhttp_request(self):
-        if re.search(r'new\s+XMLHttpRequest\(\)', self.code):
-            self.add_finding("WARNING", "Unrestricted XMLHttpRequest", "Raw XHR usage found.", "Use fetch() with proper CORS and security headers.")
-
-    def check_unprotected_navigation(self):
-        if re.search(r'(location\.href|window\.name)\s*=\s*', self.code):
-            self.add_finding("MEDIUM", "Uncontrolled Redirect", "URL redirection logic found.", "Avoid assigning user input to location.href or window.name.")
-
-    def check_unvalidated_user_content(self):
-        if re.search(r'(userInput|userData|data)\s*[:=]', self.code) and re.search(r'(innerHTML|document\.write)', self.code):
-            self.add_finding("HIGH", "Unvalidated User Content", "Untrusted data written directly to DOM.", "Escape or sanitize all user-generated content.")
+from .js_tokenizer import javascript_tokens
+from .rules import Rule, RuleScanner, register_rules
+
+JAVASCRIPT_RULES = register_rules("javascript", [
+    Rule("javascript.dangerous_eval", "CRITICAL", "Dynamic Code Execution", "Use of eval or similar constructs detected.", "Avoid dynamic code execution. Use strict logic paths.",
+         r'\b(eval|Function|setTimeout|setInterval)\s*\('),
+    Rule("javascript.dom_xss", "HIGH", "DOM-based XSS", "Direct DOM manipulation using unsanitized data.", "Avoid setting HTML using user input. Sanitize all dynamic content.",
+         r'(innerHTML|outerHTML|document\.write)'),
+    Rule("javascript.insecure_storage", "WARNING", "Insecure Storage Usage", "Sensitive data accessed from browser storage.", "Avoid using local/session storage or cookies for secrets.",
+         r'(localStorage|sessionStorage|document\.cookie)'),
+    Rule("javascript.hardcoded_secrets", "HIGH", "Hardcoded Secret", "Sensitive key or token found in source code.", "Store secrets in secure backend or config files.",
+         r'(api|token|secret|key|password)\s*[:=]\s*["\']\w{8,}["\']', re.IGNORECASE),
+    Rule("javascript.debug_statements", "INFO", "Debug Statement Detected", "Debugging code found.", "Remove console.log or debugger statements before production",
+         r'(console\.log|debugger)'),
+    Rule("javascript.insecure_http", "HIGH", "Insecure HTTP Request", "HTTP connection used instead of HTTPS.", "Use secure HTTPS URLs for all network requests.",
+         r'fetch\("http:|axios\.get\("http:'),
+    Rule("javascript.unsanitized_url_params", "HIGH", "Unsanitized URL Parameter", "Use of URL parameters without validation.", "Validate or sanitize user input from URLs.",
+         r'location\.search|URLSearchParams', excludes=[r'sanitize|encode']),
+    Rule("javascript.xmlhttp_request", "WARNING", "Unrestricted XMLHttpRequest", "Raw XHR usage found.", "Use fetch() with proper CORS and security headers.",
+         r'new\s+XMLHttpRequest\(\)'),
+    Rule("javascript.unprotected_navigation", "MEDIUM", "Uncontrolled Redirect", "URL redirection logic found.", "Avoid assigning user input to location.href or window.name.",
+         r'(location\.href|window\.name)\s*=\s*'),
+    Rule("javascript.unvalidated_user_content", "HIGH", "Unvalidated User Content", "Untrusted data written directly to DOM.", "Escape or sanitize all user-generated content.",
+         r'(userInput|userData|data)\s*[:=]', requires=[r'(innerHTML|document\.write)']),
+], tokenizer=javascript_tokens)
+
+
+class JavaScriptScanner(RuleScanner):
+    language = "javascript"
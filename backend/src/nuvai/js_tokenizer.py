@@ -0,0 +1,255 @@
+"""
+File: js_tokenizer.py
+
+Description:
+Shared lexer for the JavaScript family (javascript, jsx, typescript). It splits a file into
+code and non-code tokens – comments, string and template literal text, regex literals and
+JSX text – so the rules of those languages only fire on matches that start in actual code
+(or, for rules that ask for it, in comments or strings).
+
+The lexer is incremental: tokens are produced on demand, only as far into the file as the
+furthest offset asked about so far. Files in which no rule pattern matches are never lexed,
+and one lexer instance per scan serves every rule of the set.
+
+Only non-code spans are recorded, as sorted (start, end, kind) triples; classifying an offset
+is a binary search over them. The lexer never fails: unterminated strings end at the line
+break, unterminated comments and templates at the end of the file.
+
+Ambiguities are resolved from the previous significant character, as JS engines do for
+regex literals: `/` starts a regex after an operator, `(`, `,`, `{`... or keywords such as
+`return`, and is a division otherwise. With JSX enabled, `<` followed by a tag name (or `>`)
+in the same positions starts an element, whose text children are recorded as "text".
+"""
+
+import re
+from bisect import bisect_right
+
+CODE = "code"
+COMMENT = "comment"
+STRING = "string"
+REGEX = "regex"
+TEXT = "text"
+
+CODE_SPECIAL = re.compile(r"[/'\"`{}]")
+CODE_SPECIAL_JSX = re.compile(r"[/'\"`{}<]")
+TAG_SPECIAL = re.compile(r"[\"'{>/]")
+CHILDREN_SPECIAL = re.compile(r"[<{]")
+STRINGS = {
+    "'": re.compile(r"'(?:[^'\\\n]|\\[\s\S])*'?"),
+    '"': re.compile(r'"(?:[^"\\\n]|\\[\s\S])*"?'),
+}
+TEMPLATE_TEXT = re.compile(r"(?:[^`\\$]|\\[\s\S]|\$(?!\{))*")
+REGEX_BODY = re.compile(r"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+TAG_START = re.compile(r"<[A-Za-z_$>]")
+
+EXPRESSION_START_CHARS = set("(,=:[!&|?{};+-*%<>~^")
+EXPRESSION_KEYWORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+                       "throw", "case", "do", "else", "yield", "await", "default"}
+
+
+class JsTokens:
+    """
+    Incremental classification of offsets of one file. `kind_at(offset)` returns "code",
+    "comment", "string", "regex" or "text".
+    """
+    version = "js-tokens/1"
+
+    def __init__(self, code, jsx=False):
+        self.code = code
+        self.jsx = jsx
+        self.pos = 0
+        self.starts = []
+        self.ends = []
+        self.kinds = []
+        # Mode stack: ["code", brace depth], ["template"], ["tag", closing], ["children"].
+        self.stack = [["code", 0]]
+
+    def kind_at(self, offset):
+        if offset >= self.pos:
+            self.advance_to(offset)
+        i = bisect_right(self.starts, offset) - 1
+        if i >= 0 and offset < self.ends[i]:
+            return self.kinds[i]
+        return CODE
+
+    def spans(self):
+        self.advance_to(len(self.code))
+        return list(zip(self.starts, self.ends, self.kinds))
+
+    def _add(self, start, end, kind):
+        if end > start:
+            self.starts.append(start)
+            self.ends.append(end)
+            self.kinds.append(kind)
+
+    def advance_to(self, offset):
+        length = len(self.code)
+        while self.pos <= offset and self.pos < length:
+            mode = self.stack[-1][0]
+            if mode == "code":
+                self._code_step()
+            elif mode == "template":
+                self._template_step()
+            elif mode == "tag":
+                self._tag_step()
+            else:
+                self._children_step()
+        if self.pos >= length:
+            self.pos = length + 1
+
+    # Modes
+
+    def _code_step(self):
+        code = self.code
+        special = CODE_SPECIAL_JSX if self.jsx else CODE_SPECIAL
+        match = special.search(code, self.pos)
+        if match is None:
+            self.pos = len(code)
+            return
+        pos = match.start()
+        char = code[pos]
+        frame = self.stack[-1]
+        if char in STRINGS:
+            end = STRINGS[char].match(code, pos).end()
+            self._add(pos, end, STRING)
+            self.pos = end
+        elif char == "`":
+            self.stack.append(["template"])
+            self._template_text(pos, pos + 1)
+        elif char == "{":
+            frame[1] += 1
+            self.pos = pos + 1
+        elif char == "}":
+            if frame[1] == 0 and len(self.stack) > 1:
+                self.stack.pop()  # end of ${...} or a JSX {expression}
+                if self.stack[-1][0] == "template":
+                    self._template_text(pos + 1, pos + 1)
+                    return
+            elif frame[1] > 0:
+                frame[1] -= 1
+            self.pos = pos + 1
+        elif char == "/":
+            self._slash(pos)
+        elif TAG_START.match(code, pos) and self._expression_expected(pos):
+            self.stack.append(["tag", False])
+            self.pos = pos + 1
+        else:
+            self.pos = pos + 1
+
+    def _slash(self, pos):
+        code = self.code
+        following = code[pos + 1:pos + 2]
+        if following == "/":
+            end = code.find("\n", pos)
+            end = len(code) if end == -1 else end
+            self._add(pos, end, COMMENT)
+            self.pos = end
+        elif following == "*":
+            end = code.find("*/", pos + 2)
+            end = len(code) if end == -1 else end + 2
+            self._add(pos, end, COMMENT)
+            self.pos = end
+        elif self._expression_expected(pos):
+            match = REGEX_BODY.match(code, pos)
+            if match:
+                self._add(pos, match.end(), REGEX)
+                self.pos = match.end()
+            else:
+                self.pos = pos + 1
+        else:
+            self.pos = pos + 1
+
+    def _template_text(self, start, text_start):
+        # Template text runs until the closing backtick or the next ${.
+        code = self.code
+        end = TEMPLATE_TEXT.match(code, text_start).end()
+        if code.startswith("${", end):
+            self._add(start, end, STRING)
+            self.stack.append(["code", 0])
+            self.pos = end + 2
+        else:
+            end = min(end + 1, len(code))
+            self._add(start, end, STRING)
+            self.stack.pop()
+            self.pos = end
+
+    def _template_step(self):
+        self._template_text(self.pos, self.pos)
+
+    def _tag_step(self):
+        code = self.code
+        match = TAG_SPECIAL.search(code, self.pos)
+        if match is None:
+            self.pos = len(code)
+            return
+        pos = match.start()
+        char = code[pos]
+        if char in STRINGS:
+            # JSX attribute strings have no escapes and may span lines.
+            end = code.find(char, pos + 1)
+            end = len(code) if end == -1 else end + 1
+            self._add(pos, end, STRING)
+            self.pos = end
+        elif char == "{":
+            self.stack.append(["code", 0])
+            self.pos = pos + 1
+        elif char == "/":
+            if self.pos == pos and code[pos - 1:pos] == "<":
+                self.stack[-1][1] = True  # </closing>
+                self.pos = pos + 1
+            elif code.startswith("/>", pos):
+                self.stack.pop()
+                self.pos = pos + 2
+            else:
+                self.pos = pos + 1
+        else:  # ">"
+            closing = self.stack.pop()[1]
+            if closing:
+                if self.stack[-1][0] == "children":
+                    self.stack.pop()
+            else:
+                self.stack.append(["children"])
+            self.pos = pos + 1
+
+    def _children_step(self):
+        code = self.code
+        match = CHILDREN_SPECIAL.search(code, self.pos)
+        end = match.start() if match else len(code)
+        self._add(self.pos, end, TEXT)
+        if match is None:
+            self.pos = end
+        elif code[end] == "{":
+            self.stack.append(["code", 0])
+            self.pos = end + 1
+        else:
+            self.stack.append(["tag", False])
+            self.pos = end + 1
+
+    def _expression_expected(self, pos):
+        code = self.code
+        i = pos - 1
+        while i >= 0 and code[i].isspace():
+            i -= 1
+        if i < 0:
+            return True
+        char = code[i]
+        if char in EXPRESSION_START_CHARS:
+            return True
+        if char.isalnum() or char in "_$":
+            start = i
+            while start > 0 and (code[start - 1].isalnum() or code[start - 1] in "_$"):
+                start -= 1
+            return code[start:i + 1] in EXPRESSION_KEYWORDS
+        return False
+
+
+def javascript_tokens(code):
+    return JsTokens(code, jsx=True)
+
+
+def typescript_tokens(code):
+    # `<T>value` is a type assertion in TypeScript, so JSX detection stays off.
+    return JsTokens(code, jsx=False)
+
+
+javascript_tokens.version = typescript_tokens.version = JsTokens.version
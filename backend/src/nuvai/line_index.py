@@ -0,0 +1,92 @@
+"""
+File: line_index.py
+
+Description:
+Maps character offsets in a source file to 1-based line and column numbers. The offsets of
+all line starts are collected once per file (one pass of str.find over the text), and each
+lookup is a binary search over them, so locating thousands of matches in a large file costs
+O(log lines) per match instead of rescanning the text.
+
+`origin` is the (line, column) of the text's first character in the original file, for
+callers that scan a slice of it (scan_code scans the stripped source).
+
+Snippets of long lines (e.g. minified files) are a window of about MAX_SNIPPET_LENGTH
+characters around the match, so their cost does not grow with the length of the line.
+"""
+
+from bisect import bisect_right
+
+MAX_SNIPPET_LENGTH = 200
+
+
+def snippet_window(text, start, end, offset):
+    """
+    Snippet for `offset` on the line text[start:end]: the stripped line if it fits in
+    MAX_SNIPPET_LENGTH, otherwise the part of the line around `offset`, with "..." where it
+    was cut. Only the window is copied.
+    """
+    if end - start <= MAX_SNIPPET_LENGTH:
+        return text[start:end].strip()
+    width = MAX_SNIPPET_LENGTH - 6
+    low = max(start, min(offset - width // 2, end - width))
+    high = min(end, low + width)
+    return ("..." if low > start else "") + text[low:high].strip() + ("..." if high < end else "")
+
+
+class LineIndex:
+    __slots__ = ("text", "starts", "origin", "ascii")
+
+    def __init__(self, text, origin=(1, 1)):
+        self.text = text
+        self.origin = origin
+        self.ascii = text.isascii()
+        starts = [0]
+        find = text.find
+        pos = find("\n")
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = find("\n", pos + 1)
+        self.starts = starts
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _line_number(self, offset):
+        return bisect_right(self.starts, offset)
+
+    def position(self, offset):
+        """
+        (line, column) of `offset`, both 1-based and relative to the original file.
+        """
+        line = self._line_number(offset)
+        column = offset - self.starts[line - 1] + 1
+        base_line, base_column = self.origin
+        if line == 1:
+            column += base_column - 1
+        return line + base_line - 1, column
+
+    def line_bounds(self, offset):
+        """
+        (start, end) offsets of the line containing `offset`, without its line terminator.
+        """
+        line = self._line_number(offset)
+        start = self.starts[line - 1]
+        end = self.starts[line] - 1 if line < len(self.starts) else len(self.text)
+        if end > start and self.text[end - 1] == "\r":
+            end -= 1
+        return start, end
+
+    def line_text(self, offset):
+        """
+        Text of the line containing `offset`, without its line terminator.
+        """
+        start, end = self.line_bounds(offset)
+        return self.text[start:end]
+
+    def snippet(self, offset):
+        start, end = self.line_bounds(offset)
+        return snippet_window(self.text, start, end, offset)
+
+    def locate(self, offset):
+        line, column = self.position(offset)
+        return {"line": line, "column": column, "snippet": self.snippet(offset)}
@@ -0,0 +1,369 @@
+"""
+File: matcher.py
+
+Description:
+Pattern-level matching engine used by the rule registry. A RuleSet registers every pattern
+its rules use (primary patterns and co-occurrence conditions) in one PatternTable, where
+identical patterns are merged. A scan then resolves each distinct pattern at most once per
+file, lazily and only when a rule actually needs it, and every rule decision (including
+conditions such as "requests.get AND input(") is answered from that per-file memo.
+
+Literal prefilter:
+Most patterns can only match where some literal token occurs (`pickle.`, `os.system`,
+`$_FILES`, `setcookie`...). Those literals are extracted from each pattern at import time
+(or declared on the rule) and checked with a plain substring test before the regex runs;
+when none of them occurs in the file, the pattern is known not to match and its regex is
+skipped entirely. Case-insensitive literals are checked against a lower-cased copy of the
+file, which is only used for pure-ASCII input where lower-casing is exact.
+
+Note: merging all patterns into a single alternation was measured to be 2-8x slower than
+separate searches with CPython's re module, which only accelerates literal prefixes for a
+single pattern. Each distinct pattern therefore keeps its own compiled search, which stops at
+the first hit.
+
+Token contexts:
+Patterns of tokenized languages (rules.py, js_tokenizer.py) are registered with the token
+kinds their matches may start in. A hit is only accepted after the file's token stream
+classifies its start offset; otherwise the search resumes after it. Since classification is
+only needed for offsets where the regex already matched, the lexer runs lazily and only as
+far as the last such offset.
+
+Time budget:
+Some rule patterns backtrack polynomially on crafted input. Each pattern is classified once by
+the static audit (regex_audit.py): patterns without a hazard are searched over the whole text
+as before, while flagged patterns are searched window by window (MATCH_WINDOWS: a window of
+characters plus an overlap of look-ahead), smaller for cubic than for quadratic shapes. That
+bounds the work of every start position to its window instead of the whole file. Time spent
+on each pattern is checked between windows; a pattern that exceeds RULE_TIME_BUDGET is
+abandoned and reported in `timed_out`, and the rule set adds a partial-scan finding for the
+rules that depend on it (rules.py). Matches longer than the overlap that start near a window
+edge may be missed.
+
+Every match found before the last window is re-matched on the full text from its start,
+so its extent (and the position the search resumes from) is the same as with finditer().
+
+Locations:
+The first match of each pattern is kept in the memo. Only for rules that actually fire are the
+remaining occurrences collected (finditer resumes at the first match) and mapped to line,
+column and snippet through a LineIndex built once per file.
+"""
+
+import os
+import re
+import time
+from functools import lru_cache
+
+from .line_index import LineIndex
+from .regex_audit import EXPONENTIAL, audit_pattern
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+MAX_LITERALS_PER_PATTERN = 64
+MAX_CLASS_EXPANSION = 8
+# (window, overlap) in characters by the polynomial degree of the pattern's backtracking.
+MATCH_WINDOWS = {2: (4096, 2048), 3: (1024, 1024)}
+RULE_TIME_BUDGET = float(os.getenv("NUVAI_RULE_TIME_BUDGET_MS", "500")) / 1000
+
+LITERAL = sre_constants.LITERAL
+SUBPATTERN = sre_constants.SUBPATTERN
+BRANCH = sre_constants.BRANCH
+IN = sre_constants.IN
+AT = sre_constants.AT
+
+
+def _class_literals(av):
+    chars = []
+    for op, value in av:
+        if op is not LITERAL:
+            return None
+        chars.append(chr(value))
+    return chars if len(chars) <= MAX_CLASS_EXPANSION else None
+
+
+def _sequence_prefixes(items):
+    """
+    Return (prefixes, complete) for a parsed sequence: the set of literal strings every
+    match of the sequence starts with, and whether the sequence is fully literal.
+    """
+    prefixes = {""}
+    for op, av in items:
+        if op is AT:
+            continue
+        if op is LITERAL:
+            parts, complete = [chr(av)], True
+        elif op is IN:
+            parts, complete = _class_literals(av), True
+            if parts is None:
+                return prefixes, False
+        elif op is SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            if add_flags or del_flags:
+                return prefixes, False
+            parts, complete = _sequence_prefixes(sub.data if hasattr(sub, "data") else sub)
+            parts = list(parts)
+        elif op is BRANCH:
+            parts, complete = [], True
+            for branch in av[1]:
+                branch_parts, branch_complete = _sequence_prefixes(branch.data if hasattr(branch, "data") else branch)
+                parts.extend(branch_parts)
+                complete = complete and branch_complete
+        else:
+            return prefixes, False
+
+        if "" in parts or len(prefixes) * len(parts) > MAX_LITERALS_PER_PATTERN:
+            return prefixes, False
+        prefixes = {p + part for p in prefixes for part in parts}
+        if not complete:
+            return prefixes, False
+    return prefixes, True
+
+
+def _mandatory_literals(items):
+    """
+    Candidate literal sets from the top-level items of a sequence: runs of plain literals
+    and groups/alternations whose every alternative starts with a literal.
+    """
+    candidates, run = [], ""
+    for op, av in items:
+        if op is LITERAL:
+            run += chr(av)
+            continue
+        if run:
+            candidates.append([run])
+        run = ""
+        if op in (SUBPATTERN, BRANCH):
+            prefixes, _ = _sequence_prefixes([(op, av)])
+            if prefixes and "" not in prefixes:
+                candidates.append(sorted(prefixes))
+    if run:
+        candidates.append([run])
+    return candidates
+
+
+def extract_literals(regex):
+    """
+    Return literal strings of which at least one occurs in every match of `regex`, or
+    None when no such literal could be derived. Candidates are the literal prefixes a match
+    must start with and the literal runs/alternations of the top-level sequence; the most
+    selective set (longest shortest literal) is returned.
+    """
+    if not isinstance(regex.pattern, str):
+        return None
+    try:
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+    except Exception:
+        return None
+    items = list(parsed.data if hasattr(parsed, "data") else parsed)
+
+    candidates = _mandatory_literals(items)
+    prefixes, _ = _sequence_prefixes(items)
+    if prefixes and "" not in prefixes:
+        candidates.append(sorted(prefixes))
+    if not candidates:
+        return None
+    return tuple(max(candidates, key=lambda literals: min(map(len, literals))))
+
+
+@lru_cache(maxsize=None)
+def _window(pattern, flags):
+    issue = audit_pattern(pattern, flags)
+    if issue is None:
+        return None
+    if issue.severity == EXPONENTIAL:
+        return MATCH_WINDOWS[max(MATCH_WINDOWS)]
+    return MATCH_WINDOWS[min(issue.degree, max(MATCH_WINDOWS))]
+
+
+def match_window(regex):
+    """
+    (window, overlap) to search `regex` with, or None when it can run over the whole text.
+    """
+    return _window(regex.pattern, regex.flags)
+
+
+class MatchBudget:
+    """Time (seconds) one pattern may spend on one text, and the time spent so far."""
+    __slots__ = ("limit", "spent")
+
+    def __init__(self, limit=RULE_TIME_BUDGET):
+        self.limit = limit
+        self.spent = 0.0
+
+    @property
+    def exceeded(self):
+        return bool(self.limit) and self.spent > self.limit
+
+
+def bounded_finditer(regex, code, start=0, budget=None):
+    """
+    Matches of `regex` in `code` from `start` on, like finditer(). Patterns flagged by the
+    audit are searched window by window on large texts, and iteration stops early once
+    `budget` (a MatchBudget) is exceeded.
+    """
+    window = match_window(regex)
+    length = len(code)
+    if window is None or length - start <= sum(window):
+        yield from regex.finditer(code, start)
+        return
+    size, overlap = window
+    clock = time.perf_counter
+    pos = window_start = start
+    while True:
+        started = clock()
+        window_end = window_start + size
+        endpos = min(length, window_end + overlap)
+        last = endpos == length
+        while True:
+            match = regex.search(code, pos, endpos)
+            if match is None or (match.start() >= window_end and not last):
+                break
+            if not last:
+                # Take the match's real extent (and assertions) from the full text.
+                full = regex.match(code, match.start())
+                if full is None:
+                    pos = match.start() + 1
+                    continue
+                match = full
+            pos = match.end() if match.end() > match.start() else match.start() + 1
+            if budget is not None:
+                budget.spent += clock() - started
+            yield match
+            started = clock()
+        if budget is not None:
+            budget.spent += clock() - started
+        if last or (budget is not None and budget.exceeded):
+            return
+        window_start = max(window_end, pos)
+        pos = window_start
+
+
+class PatternTable:
+    def __init__(self):
+        self.patterns = []
+        self.literals = []
+        self.contexts = []
+        self._index = {}
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def add(self, regex, literals=None, contexts=None):
+        key = (regex.pattern, regex.flags, contexts)
+        if key not in self._index:
+            if literals is None:
+                literals = extract_literals(regex)
+            if literals and regex.flags & re.IGNORECASE:
+                # Unicode case folding can map non-ASCII literals onto ASCII text
+                # (e.g. the long s), so only pure-ASCII literals are prefiltered.
+                if all(literal.isascii() for literal in literals):
+                    literals = tuple(literal.lower() for literal in literals)
+                else:
+                    literals = None
+            self._index[key] = len(self.patterns)
+            self.patterns.append(regex)
+            self.literals.append((tuple(literals or ()), bool(regex.flags & re.IGNORECASE)))
+            self.contexts.append(contexts)
+        return self._index[key]
+
+    def scan(self, code, origin=(1, 1), tokens=None, budget=None):
+        return PatternHits(self, code, origin, tokens, RULE_TIME_BUDGET if budget is None else budget)
+
+
+class PatternHits:
+    """
+    Lazy, memoized view of which patterns of a table occur in a given text.
+    `index in hits` runs the literal prefilter and, only if it passes, the pattern's
+    search the first time it is asked for. Patterns abandoned for exceeding the time budget
+    (seconds per pattern, 0 for none) count as not matching and are listed in `timed_out`.
+    """
+    __slots__ = ("_table", "_code", "_origin", "_tokens", "_budget", "_budgets", "_lines", "_lowered",
+                 "_memo", "_present", "regex_runs", "regex_skips", "timed_out")
+
+    def __init__(self, table, code, origin=(1, 1), tokens=None, budget=RULE_TIME_BUDGET):
+        self._table = table
+        self._code = code
+        self._origin = origin
+        self._tokens = tokens
+        self._budget = budget
+        self._budgets = {}
+        self._lines = None
+        self._lowered = None
+        self._memo = {}
+        self._present = {}
+        self.regex_runs = 0
+        self.regex_skips = 0
+        self.timed_out = set()
+
+    def _literal_present(self, literal, ignore_case):
+        key = (literal, ignore_case)
+        present = self._present.get(key)
+        if present is None:
+            if ignore_case:
+                if self._lowered is None:
+                    self._lowered = self._code.lower() if self._code.isascii() else False
+                present = True if self._lowered is False else literal in self._lowered
+            else:
+                present = literal in self._code
+            self._present[key] = present
+        return present
+
+    def __contains__(self, index):
+        hit = self._memo.get(index)
+        if hit is None:
+            literals, ignore_case = self._table.literals[index]
+            if literals and not any(self._literal_present(lit, ignore_case) for lit in literals):
+                self.regex_skips += 1
+                hit = False
+            else:
+                self.regex_runs += 1
+                hit = next(self._accepted(index, 0), False)
+            self._memo[index] = hit
+        return hit is not False
+
+    def _accepted(self, index, start):
+        if self._tokens is None or not self._table.contexts[index]:
+            return self._matches(index, start)
+        return self._in_context(index, start)
+
+    def _in_context(self, index, start):
+        contexts = self._table.contexts[index]
+        kind_at = self._tokens.kind_at
+        for match in self._matches(index, start):
+            if kind_at(match.start()) in contexts:
+                yield match
+
+    def _matches(self, index, start):
+        budget = self._budgets.get(index)
+        if budget is None:
+            budget = self._budgets[index] = MatchBudget(self._budget)
+        yield from bounded_finditer(self._table.patterns[index], self._code, start, budget)
+        if budget.exceeded:
+            self.timed_out.add(index)
+
+    @property
+    def size(self):
+        return len(self._code)
+
+    def evaluated(self):
+        return {index: hit is not False for index, hit in self._memo.items()}
+
+    @property
+    def lines(self):
+        if self._lines is None:
+            self._lines = LineIndex(self._code, self._origin)
+        return self._lines
+
+    def occurrences(self, index):
+        """
+        Line, column and snippet of every match of pattern `index`, in file order.
+        """
+        if index not in self:
+            return []
+        first = self._memo[index]
+        lines = self.lines
+        return [lines.locate(m.start()) for m in self._accepted(index, first.start())]
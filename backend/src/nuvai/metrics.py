@@ -0,0 +1,290 @@
+"""
+File: metrics.py
+
+Description:
+In-process metrics registry rendered in the Prometheus text exposition format (version 0.0.4)
+by the server's /metrics endpoint. Counters and histograms keep their values in plain dicts
+keyed by label values, behind one lock per metric, so recording on the request path is a
+dict update – no background threads, no client library.
+
+The metrics of the server are defined here as module constants and recorded from the
+request hooks and scan functions of server.py, from the Redis client (instrument_redis:
+one round trip per command or pipeline), from the SQLAlchemy engine (instrument_engine:
+cursor execution time) and from the AI gateway (utils/ai_gateway.py). Collectors add metrics
+computed at scrape time, such as the per-rule aggregates of the scan profiler
+(scan_profiler.py) when it is enabled, or the circuit state of the AI gateway.
+
+Label values are supplied positionally, in the order of the metric's label names:
+    HTTP_REQUESTS.inc(("GET", "/scan", "200"))
+    SCAN_DURATION.observe(0.012, ("scan", "python"))
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_VERBS = {"SELECT", "INSERT", "UPDATE", "DELETE", "BEGIN", "COMMIT", "ROLLBACK", "CREATE", "PRAGMA"}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def clear(self):
+        with self._lock:
+            self._values = {}
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self.header()
+        lines.extend(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                     for labels, value in items)
+        return lines
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, labels=()):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                # [count per bucket (last one is +Inf), sum]
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def count(self, labels=()):
+        entry = self._values.get(labels)
+        return sum(entry[0]) if entry else 0
+
+    def render(self):
+        with self._lock:
+            items = sorted((labels, (counts[:], total)) for labels, (counts, total) in self._values.items())
+        lines = self.header()
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{_format_value(float(bound))}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            formatted = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{formatted} {_format_value(total)}")
+            lines.append(f"{self.name}_count{formatted} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        """`collector()` returns rendered lines, evaluated at every scrape."""
+        self._collectors.append(collector)
+        return collector
+
+    def render(self, collectors=()):
+        """Exposition text of all metrics, registered collectors and extra `collectors`."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in (*self._collectors, *collectors):
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "nuvai_http_requests_total", "HTTP requests by method, route and status code.", ("method", "route", "status"))
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "nuvai_http_request_duration_seconds", "Time to produce the response (streamed bodies excluded).", ("method", "route"))
+SCAN_DURATION = REGISTRY.histogram(
+    "nuvai_scan_phase_duration_seconds", "Duration of the scan and AI analysis phases of one file.", ("phase", "language"),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+SCANNED_BYTES = REGISTRY.counter(
+    "nuvai_scanned_bytes_total", "Characters of source code scanned.", ("language",))
+SCANNED_FILES = REGISTRY.counter(
+    "nuvai_scanned_files_total", "Files scanned (cache hits excluded).", ("language",))
+FINDINGS = REGISTRY.counter(
+    "nuvai_findings_total", "Findings reported, by severity.", ("severity",))
+SCAN_CACHE_LOOKUPS = REGISTRY.counter(
+    "nuvai_scan_cache_lookups_total", "Scan result cache lookups.", ("result",))
+DB_QUERY_DURATION = REGISTRY.histogram(
+    "nuvai_db_query_duration_seconds", "Database statement execution time.", ("statement",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+REDIS_COMMANDS = REGISTRY.counter(
+    "nuvai_redis_round_trips_total", "Redis round trips (commands, or pipelines as one).", ("command", "status"))
+AI_ANALYSES = REGISTRY.counter(
+    "nuvai_ai_analyses_total", "File analyses by how they were served: single or batched request, cache, deduplicated.", ("source",))
+AI_REQUESTS = REGISTRY.counter(
+    "nuvai_ai_requests_total", "AI API calls through the gateway, by outcome (rejected: circuit open).", ("outcome",))
+AI_REQUEST_DURATION = REGISTRY.histogram(
+    "nuvai_ai_request_duration_seconds", "AI API call latency including waiting, retries and streaming.", ("outcome",),
+    buckets=(0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0))
+AI_RETRIES = REGISTRY.counter(
+    "nuvai_ai_retries_total", "AI API attempts retried after a transient error.")
+AI_CIRCUIT_TRANSITIONS = REGISTRY.counter(
+    "nuvai_ai_circuit_transitions_total", "AI circuit breaker state changes, by new state.", ("state",))
+
+
+def record_findings(findings):
+    for finding in findings:
+        FINDINGS.inc((str(finding.get("level", "unknown")).lower(),))
+
+
+def instrument_redis(client, counter=REDIS_COMMANDS):
+    """
+    Count the round trips of a redis-py client. Commands are wrapped on the instance, and
+    pipelines it creates count as one "PIPELINE" round trip when executed.
+    """
+    execute_command = client.execute_command
+    pipeline = client.pipeline
+
+    def counted_command(*args, **options):
+        status = "error"
+        try:
+            result = execute_command(*args, **options)
+            status = "ok"
+            return result
+        finally:
+            counter.inc((str(args[0]).upper() if args else "UNKNOWN", status))
+
+    def counted_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        def counted_execute(*exec_args, **exec_kwargs):
+            status = "error"
+            try:
+                result = execute(*exec_args, **exec_kwargs)
+                status = "ok"
+                return result
+            finally:
+                counter.inc(("PIPELINE", status))
+
+        pipe.execute = counted_execute
+        return pipe
+
+    client.execute_command = counted_command
+    client.pipeline = counted_pipeline
+    return client
+
+
+def instrument_engine(engine, histogram=DB_QUERY_DURATION):
+    """Record the execution time of every statement run through a SQLAlchemy engine."""
+    from sqlalchemy import event
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("nuvai_query_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["nuvai_query_started"].pop()
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+        histogram.observe(time.perf_counter() - started, (verb if verb in SQL_VERBS else "OTHER",))
+
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("nuvai_query_started"):
+            conn.info["nuvai_query_started"].pop()
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+    return engine
+
+
+def gateway_collector(gateway):
+    """Collector exposing the circuit state and requests in flight of an AIGateway."""
+    states = ("closed", "half_open", "open")
+
+    def collect():
+        lines = ["# HELP nuvai_ai_circuit_state Current AI circuit breaker state (1 for the active state).",
+                 "# TYPE nuvai_ai_circuit_state gauge"]
+        lines.extend(f"nuvai_ai_circuit_state{_format_labels(('state',), (state,))} {int(gateway.breaker.state == state)}"
+                     for state in states)
+        lines.extend(["# HELP nuvai_ai_requests_in_flight AI API calls holding a gateway slot.",
+                      "# TYPE nuvai_ai_requests_in_flight gauge",
+                      f"nuvai_ai_requests_in_flight {gateway.in_flight}"])
+        return lines
+
+    return collect
+
+
+def profiler_collector(profiler):
+    """Collector exposing the per-rule aggregates of a ScanProfiler (scan_profiler.py)."""
+    families = (
+        ("nuvai_rule_evaluations_total", "Files on which the rule was evaluated.", "files"),
+        ("nuvai_rule_hits_total", "Files in which the rule fired.", "hits"),
+        ("nuvai_rule_matches_total", "Matches reported by the rule.", "matches"),
+        ("nuvai_rule_seconds_total", "Time spent evaluating the rule.", "seconds"),
+    )
+
+    def collect():
+        rules = profiler.report()["rules"]
+        lines = []
+        for name, documentation, key in families:
+            lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} counter"])
+            lines.extend(f"{name}{_format_labels(('language', 'rule'), (entry['language'], entry['rule']))} "
+                         f"{_format_value(entry[key])}" for entry in rules)
+        return lines
+
+    return collect
@@ -0,0 +1,355 @@
+"""
+File: python_ast_engine.py
+
+Description:
+AST-based evaluation of the Python rules (PYTHON_RULES in python_scanner.py). The source is
+parsed once with `ast`, and every rule that has an AST check runs as a handler of a single
+tree walk: each node is visited once and dispatched by type to the handlers interested in it.
+
+Compared with the regex rules, AST checks only look at code (never at comments or unrelated
+text) and relate facts structurally: imports are resolved, so `from os import system as run` is seen.
+Dataflow rules (SSRF and the python.taint.* rules) are reported by the taint analysis in
+python_taint.py, which runs on the same tree after the walk, using the walker's aliases.
+
+Rules without an AST check (comments are not part of the AST, and rules added later) are
+still evaluated by the regex matcher, restricted to those rule ids. Source that does not
+parse (syntax errors, Python 2 code, template fragments), or on which the taint analysis
+runs out of its budget, falls back to the regex rules.
+"""
+
+import ast
+import re
+import time
+
+from .line_index import LineIndex
+from .python_taint import TAINT_RULE_IDS, TaintAnalyzer, TaintBudgetExceeded
+from .rules import PARTIAL_SCAN_TYPE
+from .scan_profiler import active_profiler
+
+AST_ENGINE_VERSION = "python-ast/3"
+
+SECRET_NAME = re.compile(r'api|token|secret|key|password', re.IGNORECASE)
+SECRET_VALUE = re.compile(r'\w{6,}')
+SENSITIVE_WORDS = re.compile(r'password|token|secret', re.IGNORECASE)
+XSS_TEXT = re.compile(r'<script>|document\.write\s*\(')
+INTERNAL_PATH = re.compile(r'/etc/|/home/|credentials\.json|\.env\b|\b[A-Za-z]:\\')
+
+EVAL_CALLS = {"eval", "exec", "builtins.eval", "builtins.exec"}
+TEMPLATE_CALLS = {"render_template", "render_template_string", "flask.render_template", "flask.render_template_string"}
+PICKLE_CALLS = {"pickle.load", "pickle.loads", "cPickle.load", "cPickle.loads"}
+OPEN_CALLS = {"open", "builtins.open", "io.open"}
+WEAK_HASHES = {"md5", "sha1"}
+INPUT_CALLS = {"input", "builtins.input"}
+DEBUGGER_CALLS = {"print", "breakpoint", "pdb.set_trace", "ipdb.set_trace"}
+LOG_METHODS = {"debug", "info", "warning", "warn", "error", "exception", "critical", "log"}
+LOGGER_FACTORIES = {"logging.getLogger", "get_logger", "getLogger"}
+INSECURE_MODULES = {"telnetlib", "smtplib", "http.client"}
+REQUEST_OBJECTS = {"request", "flask.request"}
+
+LEAF_NODES = (ast.Name, ast.Constant, ast.expr_context, ast.operator, ast.unaryop, ast.cmpop, ast.boolop)
+_CHILD_FIELDS = {}
+
+# Rules evaluated by this engine; every other rule of the set is left to the regex matcher.
+AST_RULE_IDS = frozenset({
+    "python.eval_exec",
+    "python.command_injection",
+    "python.template_injection",
+    "python.xss",
+    "python.hardcoded_secrets",
+    "python.debug_mode",
+    "python.pickle_usage",
+    "python.path_traversal",
+    "python.weak_hashes",
+    "python.raw_input",
+    "python.insecure_jwt",
+    "python.sensitive_logging",
+    "python.exposed_internal_paths",
+    "python.wildcard_imports",
+    "python.debug_artifacts",
+    "python.insecure_modules",
+}) | TAINT_RULE_IDS
+
+
+def _children(node):
+    """
+    Child nodes of `node` in source order. Faster than ast.iter_child_nodes: fields that can
+    hold nodes are looked up once per node class, and names, constants, contexts and
+    operators are treated as leaves.
+    """
+    cls = type(node)
+    fields = _CHILD_FIELDS.get(cls)
+    if fields is None:
+        fields = _CHILD_FIELDS[cls] = () if issubclass(cls, LEAF_NODES) else tuple(f for f in cls._fields if f != "ctx")
+    children = []
+    for field in fields:
+        value = getattr(node, field, None)
+        if isinstance(value, list):
+            children.extend(item for item in value if isinstance(item, ast.AST))
+        elif isinstance(value, ast.AST):
+            children.append(value)
+    return children
+
+
+def _subtree(root):
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(_children(node))
+
+
+def _target_name(node):
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str):
+        return node.slice.value
+    return None
+
+
+def _is_true(node):
+    return isinstance(node, ast.Constant) and node.value is True
+
+
+def _is_false(node):
+    return isinstance(node, ast.Constant) and node.value is False
+
+
+def _is_secret_value(node):
+    return isinstance(node, ast.Constant) and isinstance(node.value, str) and SECRET_VALUE.fullmatch(node.value) is not None
+
+
+def _call_arguments(call):
+    return list(call.args) + [kw.value for kw in call.keywords]
+
+
+class PythonAstWalker:
+    def __init__(self):
+        self.hits = {}
+        self.aliases = {}
+        self.loggers = {"logging"}
+        self.dispatch = {
+            ast.Import: self.visit_import,
+            ast.ImportFrom: self.visit_import_from,
+            ast.Call: self.visit_call,
+            ast.Assign: self.visit_assign,
+            ast.AnnAssign: self.visit_assign,
+            ast.Dict: self.visit_dict,
+            ast.Constant: self.visit_constant,
+        }
+
+    def report(self, rule_id, node):
+        self.hits.setdefault(rule_id, []).append(node)
+
+    def walk(self, tree):
+        # Iterative pre-order walk, so handlers see nodes (and imports) in source order.
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            handler = self.dispatch.get(type(node))
+            if handler is not None:
+                handler(node)
+            children = _children(node)
+            children.reverse()
+            stack.extend(children)
+
+    def qualified(self, node):
+        if isinstance(node, ast.Name):
+            return self.aliases.get(node.id, node.id)
+        if isinstance(node, ast.Attribute):
+            base = self.qualified(node.value)
+            return f"{base}.{node.attr}" if base else None
+        return None
+
+    def references_request(self, nodes):
+        return any(isinstance(node, (ast.Name, ast.Attribute)) and self.qualified(node) in REQUEST_OBJECTS
+                   for root in nodes for node in _subtree(root))
+
+    def mentions_sensitive(self, nodes):
+        for root in nodes:
+            for node in _subtree(root):
+                text = None
+                if isinstance(node, ast.Name):
+                    text = node.id
+                elif isinstance(node, ast.Attribute):
+                    text = node.attr
+                elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+                    text = node.value
+                elif isinstance(node, ast.keyword):
+                    text = node.arg
+                if text and SENSITIVE_WORDS.search(text):
+                    return True
+        return False
+
+    def visit_import(self, node):
+        for alias in node.names:
+            if alias.asname:
+                self.aliases[alias.asname] = alias.name
+            if alias.name in INSECURE_MODULES:
+                self.report("python.insecure_modules", node)
+
+    def visit_import_from(self, node):
+        module = node.module or ""
+        for alias in node.names:
+            if alias.name == "*":
+                self.report("python.wildcard_imports", node)
+                continue
+            full_name = f"{module}.{alias.name}" if module and not node.level else alias.name
+            self.aliases[alias.asname or alias.name] = full_name
+            if module in INSECURE_MODULES or full_name in INSECURE_MODULES:
+                self.report("python.insecure_modules", node)
+
+    def visit_call(self, node):
+        for kw in node.keywords:
+            if kw.arg and kw.arg.lower() == "debug" and _is_true(kw.value):
+                self.report("python.debug_mode", kw.value)
+            if kw.arg and SECRET_NAME.search(kw.arg) and _is_secret_value(kw.value):
+                self.report("python.hardcoded_secrets", kw.value)
+
+        name = self.qualified(node.func)
+        if name is None:
+            return
+        short = name.rsplit(".", 1)[-1]
+        if name in EVAL_CALLS:
+            self.report("python.eval_exec", node)
+        elif name == "os.system":
+            self.report("python.command_injection", node)
+        elif name in TEMPLATE_CALLS:
+            if self.references_request(_call_arguments(node)):
+                self.report("python.template_injection", node)
+        elif name in PICKLE_CALLS:
+            self.report("python.pickle_usage", node)
+        elif name in OPEN_CALLS:
+            if node.args and any(isinstance(n, ast.Constant) and isinstance(n.value, str) and "../" in n.value
+                                 for n in _subtree(node.args[0])):
+                self.report("python.path_traversal", node)
+        elif short in WEAK_HASHES:
+            self.report("python.weak_hashes", node)
+        elif name == "hashlib.new":
+            if node.args and isinstance(node.args[0], ast.Constant) and str(node.args[0].value).lower() in WEAK_HASHES:
+                self.report("python.weak_hashes", node)
+        elif name in INPUT_CALLS:
+            self.report("python.raw_input", node)
+        elif name == "jwt.decode":
+            if self.verification_disabled(node):
+                self.report("python.insecure_jwt", node)
+        elif name in DEBUGGER_CALLS:
+            self.report("python.debug_artifacts", node)
+        elif short in LOG_METHODS and isinstance(node.func, ast.Attribute) and self.qualified(node.func.value) in self.loggers:
+            if self.mentions_sensitive(_call_arguments(node)):
+                self.report("python.sensitive_logging", node)
+
+    def verification_disabled(self, call):
+        for kw in call.keywords:
+            if kw.arg == "verify" and _is_false(kw.value):
+                return True
+            if kw.arg == "options" and isinstance(kw.value, ast.Dict):
+                for key, value in zip(kw.value.keys, kw.value.values):
+                    if isinstance(key, ast.Constant) and key.value == "verify_signature" and _is_false(value):
+                        return True
+        return False
+
+    def visit_assign(self, node):
+        value = node.value
+        if value is None:
+            return
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+
+        for target in targets:
+            target_name = _target_name(target)
+            if not target_name:
+                continue
+            if SECRET_NAME.search(target_name) and _is_secret_value(value):
+                self.report("python.hardcoded_secrets", value)
+            if target_name.upper().endswith("DEBUG") and _is_true(value):
+                self.report("python.debug_mode", value)
+
+        if isinstance(value, ast.Call) and self.qualified(value.func) in LOGGER_FACTORIES:
+            for target in targets:
+                logger_name = self.qualified(target)
+                if logger_name:
+                    self.loggers.add(logger_name)
+
+    def visit_dict(self, node):
+        for key, value in zip(node.keys, node.values):
+            if isinstance(key, ast.Constant) and isinstance(key.value, str) and SECRET_NAME.search(key.value) and _is_secret_value(value):
+                self.report("python.hardcoded_secrets", value)
+
+    def visit_constant(self, node):
+        if not isinstance(node.value, str):
+            return
+        if XSS_TEXT.search(node.value):
+            self.report("python.xss", node)
+        if INTERNAL_PATH.search(node.value):
+            self.report("python.exposed_internal_paths", node)
+
+
+def _node_offset(index, node):
+    # ast columns are UTF-8 byte offsets into the line; LineIndex works in characters.
+    line = min(node.lineno, len(index))
+    start = index.starts[line - 1]
+    column = node.col_offset
+    if not index.ascii:
+        # A column of n bytes spans at most n characters.
+        end = index.line_bounds(start)[1]
+        prefix = index.text[start:min(end, start + column)]
+        column = len(prefix.encode("utf-8")[:column].decode("utf-8", "ignore"))
+    return start + column
+
+
+def analyze_python(code, ruleset, origin=(1, 1)):
+    """
+    Findings for `code` from the rules of `ruleset`, or None when the code does not parse or
+    the taint analysis exceeds its budget (the caller then uses the regex rules).
+    Findings keep the rule order and shape (including locations) of RuleSet.evaluate().
+    """
+    profiler = active_profiler()
+    started = time.perf_counter() if profiler is not None else None
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return None
+    walker = PythonAstWalker()
+    try:
+        walker.walk(tree)
+    except RecursionError:
+        return None
+    try:
+        for rule_id, nodes in TaintAnalyzer(tree, walker.qualified).run().items():
+            walker.hits.setdefault(rule_id, []).extend(nodes)
+    except RecursionError:
+        pass  # pathologically nested code: structural findings only
+    except TaintBudgetExceeded:
+        return None
+
+    if profiler is not None:
+        profiler.record_engine(ruleset.language, len(code), time.perf_counter() - started)
+
+    regex_ids = {rule.id for rule in ruleset} - AST_RULE_IDS
+    regex_findings = {(f["type"], f["message"]): f for f in ruleset.evaluate(code, origin, rule_ids=regex_ids)} if regex_ids else {}
+    index = None
+    findings = []
+    for rule in ruleset:
+        if rule.id not in AST_RULE_IDS:
+            finding = regex_findings.get((rule.type, rule.message))
+            if finding is not None:
+                findings.append(finding)
+            continue
+        nodes = walker.hits.get(rule.id)
+        if not nodes:
+            if profiler is not None:
+                profiler.record_rule(ruleset.language, rule.id, len(code))
+            continue
+        if index is None:
+            index = LineIndex(code, origin)
+        offsets = sorted({_node_offset(index, node) for node in nodes})
+        occurrences = [index.locate(offset) for offset in offsets]
+        if profiler is not None:
+            profiler.record_rule(ruleset.language, rule.id, len(code), matches=len(occurrences))
+        finding = rule.to_finding()
+        finding.update(occurrences[0])
+        finding["occurrences"] = occurrences
+        findings.append(finding)
+    findings.extend(f for f in regex_findings.values() if f["type"] == PARTIAL_SCAN_TYPE)
+    return findings
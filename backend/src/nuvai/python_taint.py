@@ -0,0 +1,395 @@
+"""
+File: python_taint.py
+
+Description:
+Lightweight taint tracking over the Python AST, used by the AST engine (python_ast_engine.py).
+A finding is reported only when data from a source can actually reach a sink argument,
+instead of when a source and a sink merely co-occur in the same file.
+
+Sources: input(), sys.argv, request.args/form/json/values/data/files/cookies/headers
+         (and request.get_json())
+Sinks:   os.system/os.popen, eval/exec, requests.get (and other HTTP verbs), urlopen,
+         open, pickle.load/loads, and subprocess calls with shell=True
+Sanitizers (results are clean): int(), float(), shlex.quote(), os.path.basename(),
+         secure_filename(), html.escape()...
+
+Analysis:
+- Intra-procedural and flow-sensitive: each function body is interpreted once, statement by
+  statement, tracking which local names hold tainted values. Branches are merged (may-taint)
+  and loop bodies are re-interpreted until the state at the loop head stops changing, to
+  propagate loop-carried values. The exit state of a loop is memoized per entry state, so
+  the passes of an outer loop do not re-interpret its inner loops when nothing flowing into
+  them changed (nested loops would otherwise cost 2^depth).
+- Interpretation stops with TaintBudgetExceeded after STEP_BUDGET statements; the AST engine
+  then falls back to the regex rules for the file.
+- Every function gets a summary, computed once and memoized: which parameters (and sources)
+  flow into its return value, and which parameters reach which sinks. Calls to functions of
+  the same module use the callee's summary instead of re-analysing its body, so the cost is
+  linear in the size of the module.
+- Unknown calls propagate the taint of their arguments and receiver (x.strip(), f"{x}").
+"""
+
+import ast
+
+SOURCE = "<source>"
+
+SOURCE_CALLS = {"input", "builtins.input", "raw_input", "request.get_json", "flask.request.get_json"}
+SOURCE_ATTRIBUTES = {"sys.argv"} | {
+    f"{prefix}request.{field}"
+    for prefix in ("", "flask.")
+    for field in ("args", "form", "json", "values", "data", "files", "cookies", "headers")
+}
+
+SANITIZERS = {
+    "int", "float", "bool", "len", "shlex.quote", "pipes.quote", "os.path.basename",
+    "secure_filename", "werkzeug.utils.secure_filename", "html.escape", "markupsafe.escape",
+    "escape", "urllib.parse.quote",
+}
+
+HTTP_VERBS = ("get", "post", "put", "patch", "delete", "head", "request")
+SINKS = {
+    "os.system": "python.taint.command_injection",
+    "os.popen": "python.taint.command_injection",
+    "eval": "python.taint.code_execution",
+    "exec": "python.taint.code_execution",
+    "builtins.eval": "python.taint.code_execution",
+    "builtins.exec": "python.taint.code_execution",
+    "open": "python.taint.path_traversal",
+    "io.open": "python.taint.path_traversal",
+    "builtins.open": "python.taint.path_traversal",
+    "pickle.load": "python.taint.deserialization",
+    "pickle.loads": "python.taint.deserialization",
+    "cPickle.loads": "python.taint.deserialization",
+    "urllib.request.urlopen": "python.ssrf_patterns",
+    **{f"requests.{verb}": "python.ssrf_patterns" for verb in HTTP_VERBS},
+}
+SHELL_SINKS = {"subprocess.call", "subprocess.run", "subprocess.Popen", "subprocess.check_call", "subprocess.check_output"}
+
+TAINT_RULE_IDS = frozenset(SINKS.values())
+
+EMPTY = frozenset()
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+MATCH_CASE_NODES = (ast.match_case,) if hasattr(ast, "match_case") else ()
+# Statements interpreted per file (loop passes included) before the analysis gives up.
+STEP_BUDGET = 200_000
+
+
+class TaintBudgetExceeded(Exception):
+    pass
+
+
+class FunctionSummary:
+    __slots__ = ("params", "returns", "sinks")
+
+    def __init__(self, params):
+        self.params = params
+        # Labels (SOURCE or parameter names) that flow into the return value.
+        self.returns = set()
+        # (parameter name, rule id, sink node) for parameters that reach a sink.
+        self.sinks = []
+
+
+def _param_names(node):
+    args = node.args
+    names = [a.arg for a in args.posonlyargs + args.args]
+    if args.vararg:
+        names.append(args.vararg.arg)
+    names += [a.arg for a in args.kwonlyargs]
+    if args.kwarg:
+        names.append(args.kwarg.arg)
+    return names
+
+
+def _stored_names(target):
+    return [n.id for n in ast.walk(target) if isinstance(n, ast.Name)]
+
+
+class _FunctionAnalysis:
+    """Interprets one function body (or the module body) and fills in its summary."""
+
+    def __init__(self, engine, summary, class_name=None):
+        self.engine = engine
+        self.summary = summary
+        self.class_name = class_name
+        self.state = {name: frozenset([name]) for name in summary.params}
+
+    def run(self, body):
+        self.block(body)
+
+    # Statements
+
+    def block(self, statements):
+        for statement in statements:
+            self.engine.step()
+            self.statement(statement)
+
+    def branches(self, *bodies):
+        before = self.state
+        merged = {}
+        for body in bodies:
+            self.state = dict(before)
+            self.block(body)
+            for name, taint in self.state.items():
+                merged[name] = merged.get(name, EMPTY) | taint
+        self.state = merged
+
+    def loop(self, node, enter):
+        """
+        Interprets a loop until the state at its head is stable; `enter` runs at the start
+        of every pass (binds the target, evaluates the test). Returns with the exit state,
+        which may-merges the entry state (no pass at all) and every pass.
+        """
+        head = self.state
+        cached = self.engine.loop_exits.get(node)
+        if cached is not None and cached[0] == head:
+            self.state = dict(cached[1])
+            return
+        entry = head
+        while True:
+            self.state = dict(head)
+            enter()
+            before = self.state
+            self.block(node.body)
+            merged = {}
+            for state in (head, before, self.state):
+                for name, taint in state.items():
+                    merged[name] = merged.get(name, EMPTY) | taint
+            if merged == head:
+                break
+            head = merged
+        self.engine.loop_exits[node] = (entry, head)
+        self.state = dict(head)
+
+    def assign(self, target, taint):
+        if isinstance(target, ast.Name):
+            self.state[target.id] = taint
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            for element in target.elts:
+                self.assign(element, taint)
+        elif isinstance(target, ast.Starred):
+            self.assign(target.value, taint)
+        elif isinstance(target, (ast.Attribute, ast.Subscript)):
+            # obj.x = t / obj[k] = t taints obj (weak update).
+            self.expr(target)
+            for name in _stored_names(target.value):
+                self.state[name] = self.state.get(name, EMPTY) | taint
+
+    def statement(self, node):
+        if isinstance(node, FUNCTION_NODES + (ast.ClassDef,)):
+            return  # analysed separately, with their own summaries
+        if isinstance(node, ast.Assign):
+            taint = self.expr(node.value)
+            for target in node.targets:
+                self.assign(target, taint)
+        elif isinstance(node, ast.AnnAssign):
+            if node.value is not None:
+                self.assign(node.target, self.expr(node.value))
+        elif isinstance(node, ast.AugAssign):
+            taint = self.expr(node.value) | self.expr(node.target)
+            self.assign(node.target, taint)
+        elif isinstance(node, ast.Return):
+            if node.value is not None:
+                self.summary.returns.update(self.expr(node.value))
+        elif isinstance(node, ast.If):
+            self.expr(node.test)
+            self.branches(node.body, node.orelse)
+        elif isinstance(node, (ast.For, ast.AsyncFor)):
+            taint = self.expr(node.iter)
+            self.loop(node, lambda: self.assign(node.target, taint))
+            self.block(node.orelse)
+        elif isinstance(node, ast.While):
+            self.loop(node, lambda: self.expr(node.test))
+            self.block(node.orelse)
+        elif isinstance(node, (ast.With, ast.AsyncWith)):
+            for item in node.items:
+                taint = self.expr(item.context_expr)
+                if item.optional_vars is not None:
+                    self.assign(item.optional_vars, taint)
+            self.block(node.body)
+        elif isinstance(node, ast.Try) or type(node).__name__ == "TryStar":
+            self.branches(node.body, [])
+            self.branches([], *[handler.body for handler in node.handlers])
+            self.block(node.orelse)
+            self.block(node.finalbody)
+        else:
+            # Expression statements, raise, assert, delete, match...: evaluate every
+            # expression for sinks and interpret nested statement lists.
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, ast.expr):
+                    self.expr(child)
+                elif isinstance(child, ast.stmt):
+                    self.statement(child)
+                elif isinstance(child, MATCH_CASE_NODES):
+                    self.branches(child.body, [])
+
+    # Expressions
+
+    def qualified(self, node):
+        return self.engine.qualified(node)
+
+    def expr(self, node):
+        """Taint labels of the value of expression `node`; reports sinks along the way."""
+        if node is None or isinstance(node, ast.Constant):
+            return EMPTY
+        if isinstance(node, ast.Name):
+            return self.state.get(node.id, EMPTY)
+        if isinstance(node, ast.Call):
+            return self.call(node)
+        if isinstance(node, ast.Attribute):
+            if self.qualified(node) in SOURCE_ATTRIBUTES:
+                return frozenset([SOURCE])
+            return self.expr(node.value)
+        if isinstance(node, ast.Subscript):
+            return self.expr(node.value) | self.expr(node.slice)
+        if isinstance(node, ast.NamedExpr):
+            taint = self.expr(node.value)
+            self.assign(node.target, taint)
+            return taint
+        if isinstance(node, ast.Lambda):
+            return EMPTY
+        if isinstance(node, (ast.ListComp, ast.SetComp, ast.GeneratorExp, ast.DictComp)):
+            return self.comprehension(node)
+        if isinstance(node, ast.Compare):
+            for child in [node.left] + node.comparators:
+                self.expr(child)
+            return EMPTY
+        taint = EMPTY
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.expr):
+                taint = taint | self.expr(child)
+        return taint
+
+    def comprehension(self, node):
+        saved = self.state
+        self.state = dict(saved)
+        for generator in node.generators:
+            self.assign(generator.target, self.expr(generator.iter))
+            for condition in generator.ifs:
+                self.expr(condition)
+        if isinstance(node, ast.DictComp):
+            taint = self.expr(node.key) | self.expr(node.value)
+        else:
+            taint = self.expr(node.elt)
+        self.state = saved
+        return taint
+
+    def call(self, node):
+        arg_taints = [self.expr(arg) for arg in node.args]
+        keyword_taints = {kw.arg: self.expr(kw.value) for kw in node.keywords}
+        receiver = self.expr(node.func.value) if isinstance(node.func, ast.Attribute) else EMPTY
+        name = self.qualified(node.func)
+
+        if name in SOURCE_CALLS:
+            return frozenset([SOURCE])
+        if name in SANITIZERS:
+            return EMPTY
+
+        rule_id = SINKS.get(name)
+        if rule_id is None and name in SHELL_SINKS and any(
+                kw.arg == "shell" and isinstance(kw.value, ast.Constant) and kw.value.value is True for kw in node.keywords):
+            rule_id = "python.taint.command_injection"
+        if rule_id is not None:
+            # The first argument carries the command / code / URL / path / payload.
+            payload = arg_taints[0] if arg_taints else next(iter(keyword_taints.values()), EMPTY)
+            self.sink(rule_id, payload, node)
+
+        summary, offset = self.engine.callee_summary(node.func, self.class_name)
+        if summary is not None:
+            return self.apply_summary(summary, offset, arg_taints, keyword_taints)
+
+        taint = receiver
+        for arg_taint in arg_taints:
+            taint = taint | arg_taint
+        for keyword_taint in keyword_taints.values():
+            taint = taint | keyword_taint
+        return taint
+
+    def sink(self, rule_id, taint, node):
+        for label in taint:
+            if label == SOURCE:
+                self.engine.report(rule_id, node)
+            else:
+                self.summary.sinks.append((label, rule_id, node))
+
+    def apply_summary(self, summary, offset, arg_taints, keyword_taints):
+        bound = {}
+        for index, taint in enumerate(arg_taints):
+            if index + offset < len(summary.params):
+                bound[summary.params[index + offset]] = taint
+        for name, taint in keyword_taints.items():
+            if name in summary.params:
+                bound[name] = taint
+        for param, rule_id, sink_node in summary.sinks:
+            self.sink(rule_id, bound.get(param, EMPTY), sink_node)
+        taint = EMPTY
+        for label in summary.returns:
+            taint = taint | (frozenset([SOURCE]) if label == SOURCE else bound.get(label, EMPTY))
+        return taint
+
+
+class TaintAnalyzer:
+    def __init__(self, tree, qualified):
+        self.tree = tree
+        self.qualified = qualified
+        self.hits = {}
+        self._functions = {}
+        self._summaries = {}
+        self._in_progress = {}
+        # Loop node -> (entry state, exit state) of its last interpretation.
+        self.loop_exits = {}
+        self.steps = 0
+        self._collect(tree.body, None)
+
+    def step(self):
+        self.steps += 1
+        if self.steps > STEP_BUDGET:
+            raise TaintBudgetExceeded(f"taint analysis stopped after {STEP_BUDGET} statements")
+
+    def _collect(self, body, class_name):
+        for node in body:
+            if isinstance(node, FUNCTION_NODES):
+                key = f"{class_name}.{node.name}" if class_name else node.name
+                self._functions[key] = (node, class_name)
+            elif isinstance(node, ast.ClassDef) and class_name is None:
+                self._collect(node.body, node.name)
+
+    def report(self, rule_id, node):
+        nodes = self.hits.setdefault(rule_id, [])
+        if node not in nodes:
+            nodes.append(node)
+
+    def callee_summary(self, func, class_name):
+        """
+        (summary, parameter offset) of a call target defined in this module, or (None, 0).
+        self.method(...) inside a class resolves to that class's method, skipping `self`.
+        """
+        if isinstance(func, ast.Name) and func.id in self._functions:
+            return self.summary(func.id), 0
+        if (class_name and isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name)
+                and func.value.id in ("self", "cls") and f"{class_name}.{func.attr}" in self._functions):
+            return self.summary(f"{class_name}.{func.attr}"), 1
+        return None, 0
+
+    def summary(self, key):
+        summary = self._summaries.get(key)
+        if summary is not None:
+            return summary
+        if key in self._in_progress:
+            # Recursive call: use the partial summary computed so far.
+            return self._in_progress[key]
+        node, class_name = self._functions[key]
+        summary = self._in_progress[key] = FunctionSummary(_param_names(node))
+        _FunctionAnalysis(self, summary, class_name).run(node.body)
+        del self._in_progress[key]
+        self._summaries[key] = summary
+        return summary
+
+    def run(self):
+        for key in self._functions:
+            self.summary(key)
+        _FunctionAnalysis(self, FunctionSummary([])).run(self.tree.body)
+        for node in ast.walk(self.tree):
+            # Functions nested in functions (or in nested classes) get a standalone pass.
+            if isinstance(node, FUNCTION_NODES) and not any(node is f for f, _ in self._functions.values()):
+                _FunctionAnalysis(self, FunctionSummary(_param_names(node))).run(node.body)
+        return self.hits
@@ -0,0 +1,349 @@
+"""
+File: regex_audit.py
+
+Description:
+Static ReDoS audit of every scanner pattern: the primary and condition patterns of all
+registered rule sets and scanner_controller.BLOCKED_PATTERNS. Each pattern is parsed with
+the re module's own parser and its structure is checked for the two shapes that make a
+backtracking engine slow on crafted input:
+
+- exponential: an unbounded quantifier around another one that can match the same
+  characters – (a+)+, (\\w+\\s?)* – or around alternatives that can start with the same
+  character – (x\\w|\\wx)*. A short input can take longer than any request timeout.
+- polynomial: unbounded quantifiers that can consume each other's characters – .*x.* – or
+  a quantifier that can run over the next occurrence of the pattern's own start – <!--.*-->
+  on a line of repeated "<!--". Each start position rescans the rest of the line (or file),
+  so time grows quadratically with the input.
+
+Polynomial patterns are expected among simple line-oriented rules; at runtime the matcher
+bounds them with windowed matching sized by this audit (quadratic or cubic) and a per-rule
+time budget (matcher.py). Exponential patterns must not be shipped: the audit exits with
+status 1 when it finds one.
+
+Alternatives are checked after the parser's own simplifications, which already turn e.g.
+(a|ab)* into (a(?:|b))* and (\\w|\\d) into one character class.
+
+Characters sets are compared over a sample alphabet (printable ASCII, whitespace and a few
+non-ASCII characters), so the analysis is an approximation that errs towards reporting.
+
+Usage (from the backend directory):
+    python -m src.nuvai.regex_audit [--measure] [--json]
+"""
+
+import argparse
+import json
+import re
+import string
+import sys
+import time
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+EXPONENTIAL = "exponential"
+POLYNOMIAL = "polynomial"
+
+ALPHABET = frozenset(string.printable + "éßİſK ")
+REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) + (
+    (sre_constants.POSSESSIVE_REPEAT,) if hasattr(sre_constants, "POSSESSIVE_REPEAT") else ())
+UNBOUNDED = 16  # repeats allowing more than this many iterations count as unbounded
+MEASURE_SIZES = (2_000, 4_000)
+CATEGORY_TESTS = {
+    sre_constants.CATEGORY_DIGIT: str.isdigit,
+    sre_constants.CATEGORY_NOT_DIGIT: lambda c: not c.isdigit(),
+    sre_constants.CATEGORY_SPACE: str.isspace,
+    sre_constants.CATEGORY_NOT_SPACE: lambda c: not c.isspace(),
+    sre_constants.CATEGORY_WORD: lambda c: c.isalnum() or c == "_",
+    sre_constants.CATEGORY_NOT_WORD: lambda c: not (c.isalnum() or c == "_"),
+}
+
+
+class RegexIssue:
+    __slots__ = ("source", "pattern", "flags", "severity", "reason", "degree", "attack", "growth")
+
+    def __init__(self, source, pattern, flags, severity, reason, degree=None, attack=None):
+        self.source = source
+        self.pattern = pattern
+        self.flags = flags
+        self.severity = severity
+        self.reason = reason
+        # Expected growth of polynomial issues: 2 (quadratic) or 3 (cubic) and worse.
+        self.degree = degree
+        # Unit of text which, repeated, triggers the backtracking (polynomial issues).
+        self.attack = attack
+        self.growth = None
+
+    def to_dict(self):
+        return {"source": self.source, "pattern": self.pattern, "severity": self.severity,
+                "reason": self.reason, "growth": self.growth}
+
+
+class _Analyzer:
+    def __init__(self, flags):
+        self.ignore_case = bool(flags & re.IGNORECASE)
+        self.dotall = bool(flags & re.DOTALL)
+
+    # Character sets
+
+    def literal(self, code):
+        char = chr(code)
+        chars = {char}
+        if self.ignore_case:
+            chars |= {char.lower(), char.upper()}
+        return frozenset(chars)
+
+    def in_set(self, items):
+        chars = set()
+        negate = False
+        for op, value in items:
+            if op is sre_constants.NEGATE:
+                negate = True
+            elif op is sre_constants.LITERAL:
+                chars |= self.literal(value)
+            elif op is sre_constants.RANGE:
+                low, high = value
+                chars |= {c for c in ALPHABET if low <= ord(c) <= high}
+                if self.ignore_case:
+                    chars |= {c for c in ALPHABET if low <= ord(c.lower()) <= high or low <= ord(c.upper()) <= high}
+            elif op is sre_constants.CATEGORY:
+                test = CATEGORY_TESTS.get(value)
+                chars |= {c for c in ALPHABET if test is None or test(c)}
+        return frozenset(ALPHABET - chars) if negate else frozenset(chars)
+
+    def atom_chars(self, op, value):
+        if op is sre_constants.LITERAL:
+            return self.literal(value)
+        if op is sre_constants.NOT_LITERAL:
+            return ALPHABET - self.literal(value)
+        if op is sre_constants.ANY:
+            return ALPHABET if self.dotall else ALPHABET - {"\n"}
+        if op is sre_constants.IN:
+            return self.in_set(value)
+        return frozenset()
+
+    def chars(self, items):
+        """Every character a (sub)pattern can consume."""
+        chars = set()
+        for op, value in items:
+            if op in REPEATS:
+                chars |= self.chars(value[2])
+            elif op is sre_constants.SUBPATTERN:
+                chars |= self.chars(value[-1])
+            elif op is sre_constants.BRANCH:
+                for branch in value[1]:
+                    chars |= self.chars(branch)
+            elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+                continue
+            else:
+                chars |= self.atom_chars(op, value)
+        return frozenset(chars)
+
+    def first(self, items):
+        """Characters a (sub)pattern can start with."""
+        chars = set()
+        for op, value in items:
+            if op in REPEATS:
+                chars |= self.first(value[2])
+                if value[0] > 0:
+                    return frozenset(chars)
+            elif op is sre_constants.SUBPATTERN:
+                chars |= self.first(value[-1])
+                if not self.optional(value[-1]):
+                    return frozenset(chars)
+            elif op is sre_constants.BRANCH:
+                for branch in value[1]:
+                    chars |= self.first(branch)
+                if not any(self.optional(branch) for branch in value[1]):
+                    return frozenset(chars)
+            elif op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+                continue
+            else:
+                return frozenset(chars | self.atom_chars(op, value))
+        return frozenset(chars)
+
+    def optional(self, items):
+        for op, value in items:
+            if op in REPEATS:
+                if value[0] > 0:
+                    return False
+            elif op is sre_constants.SUBPATTERN:
+                if not self.optional(value[-1]):
+                    return False
+            elif op is sre_constants.BRANCH:
+                if not any(self.optional(branch) for branch in value[1]):
+                    return False
+            elif op not in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+                return False
+        return True
+
+    def witness(self, items):
+        """A short string matched by (sub)pattern `items`."""
+        out = []
+        for op, value in items:
+            if op in REPEATS:
+                out.append(self.witness(value[2]) * value[0])
+            elif op is sre_constants.SUBPATTERN:
+                out.append(self.witness(value[-1]))
+            elif op is sre_constants.BRANCH:
+                out.append(self.witness(value[1][0]))
+            elif op is sre_constants.LITERAL:
+                out.append(chr(value))
+            else:
+                chars = self.atom_chars(op, value)
+                if chars:
+                    out.append(min(chars, key=lambda c: (not c.isalnum(), c)))
+        return "".join(out)
+
+    # Checks
+
+    def unbounded_repeats(self, items):
+        for op, value in items:
+            if op in REPEATS:
+                if value[1] is sre_constants.MAXREPEAT or value[1] > UNBOUNDED:
+                    yield value
+                yield from self.unbounded_repeats(value[2])
+            elif op is sre_constants.SUBPATTERN:
+                yield from self.unbounded_repeats(value[-1])
+            elif op is sre_constants.BRANCH:
+                for branch in value[1]:
+                    yield from self.unbounded_repeats(branch)
+
+    def exponential(self, items):
+        for low, high, body in self.unbounded_repeats(items):
+            body = list(body)
+            body_first = self.first(body)
+            for inner in self.unbounded_repeats(body):
+                if self.chars(inner[2]) & body_first:
+                    return "nested quantifiers over overlapping characters"
+            for op, value in body:
+                if op is sre_constants.SUBPATTERN:
+                    op, value = value[-1][0] if len(value[-1]) == 1 else (None, None)
+                if op is sre_constants.BRANCH:
+                    firsts = [self.first(branch) for branch in value[1]]
+                    if any(a & b for i, a in enumerate(firsts) for b in firsts[i + 1:]):
+                        return "quantified alternatives that start with the same characters"
+        return None
+
+    def top_level(self, items):
+        # Top-level sequence, flattening plain groups.
+        for op, value in items:
+            if op is sre_constants.SUBPATTERN and len(value[-1]) == 1:
+                yield from self.top_level(value[-1])
+            else:
+                yield op, value
+
+    def polynomial(self, items):
+        sequence = list(self.top_level(items))
+        repeats = [i for i, (op, value) in enumerate(sequence)
+                   if op in REPEATS and (value[1] is sre_constants.MAXREPEAT or value[1] > UNBOUNDED)]
+        for n, i in enumerate(repeats):
+            span = self.chars(sequence[i][1][2])
+            for j in repeats[n + 1:]:
+                between = self.chars(sequence[i + 1:j])
+                if between <= span and span & self.chars(sequence[j][1][2]):
+                    attack = self.witness(sequence[:i]) + self.witness(sequence[i + 1:j]) or self.witness(sequence[i][1][2])
+                    return "adjacent unbounded quantifiers over overlapping characters", 3, attack
+        for i in repeats:
+            # Every start position inside the quantifier's run rescans the rest of the run
+            # when a match of whatever precedes the quantifier can itself occur inside that run.
+            span = self.chars(sequence[i][1][2])
+            prefix = sequence[:i]
+            if i + 1 < len(sequence) and set(self.witness(prefix)) <= span and self.first(items) & span \
+                    and not self.optional(sequence[i + 1:]):
+                attack = self.witness(prefix) or self.witness(sequence[i][1][2])
+                return "unbounded quantifier can run over the next start of the pattern", 2, attack
+        return None, None, None
+
+
+def audit_pattern(pattern, flags=0, source=""):
+    """
+    RegexIssue for `pattern`, or None when it has no backtracking hazard.
+    """
+    if isinstance(pattern, re.Pattern):
+        pattern, flags = pattern.pattern, pattern.flags
+    items = list(sre_parse.parse(pattern, flags))
+    analyzer = _Analyzer(flags)
+    reason = analyzer.exponential(items)
+    if reason:
+        return RegexIssue(source, pattern, flags, EXPONENTIAL, reason)
+    reason, degree, attack = analyzer.polynomial(items)
+    if reason:
+        return RegexIssue(source, pattern, flags, POLYNOMIAL, reason, degree, attack)
+    return None
+
+
+def scanner_patterns():
+    """
+    (source, compiled pattern) for every pattern shipped with the scanners.
+    """
+    from .rules import get_rules, registered_languages
+
+    for language in registered_languages():
+        for rule in get_rules(language):
+            if rule.regex is not None:
+                yield rule.id, rule.regex
+            for condition in rule.requires + rule.excludes:
+                yield f"{rule.id} (condition)", condition
+    try:
+        from scanner_controller import BLOCKED_PATTERNS
+    except ImportError:
+        return
+    for pattern in BLOCKED_PATTERNS:
+        yield "scanner_controller.BLOCKED_PATTERNS", re.compile(pattern, re.IGNORECASE)
+
+
+def audit_all():
+    issues = []
+    for source, regex in scanner_patterns():
+        issue = audit_pattern(regex, source=source)
+        if issue is not None:
+            issues.append(issue)
+    return issues
+
+
+def measure_growth(issue, sizes=MEASURE_SIZES):
+    """
+    Ratio of search times for the issue's attack unit repeated to each of `sizes` characters:
+    about 2 when linear, 4 when quadratic, 8 when cubic.
+    """
+    regex = re.compile(issue.pattern, issue.flags)
+    unit = issue.attack or "a"
+    timings = []
+    for size in sizes:
+        text = (unit * (size // len(unit) + 1))[:size]
+        start = time.perf_counter()
+        regex.search(text)
+        timings.append(max(time.perf_counter() - start, 1e-7))
+    return round(timings[-1] / timings[0], 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit scanner regexes for catastrophic backtracking")
+    parser.add_argument("--measure", action="store_true", help="Time each flagged pattern on a crafted input")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    issues = audit_all()
+    if args.measure:
+        for issue in issues:
+            # Exponential patterns are not timed: they may not finish at all.
+            if issue.severity == POLYNOMIAL:
+                issue.growth = measure_growth(issue)
+
+    if args.json:
+        print(json.dumps([issue.to_dict() for issue in issues], indent=2))
+    else:
+        for issue in issues:
+            growth = f" (x{issue.growth} time for x2 input)" if issue.growth is not None else ""
+            print(f"[{issue.severity.upper()}] {issue.source}: {issue.pattern!r}\n    {issue.reason}{growth}")
+        exponential = sum(issue.severity == EXPONENTIAL for issue in issues)
+        print(f"\n{len(issues)} pattern(s) flagged, {exponential} exponential.")
+    return 1 if any(issue.severity == EXPONENTIAL for issue in issues) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
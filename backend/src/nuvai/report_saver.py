@@ -1,7 +1,32 @@
 # File: report_saver.py
 
+"""
+Description:
+Report export in json, jsonl (one finding per line), txt, html, pdf, sarif and nvr (compact
+columnar binary for long-term storage, columnar_report.py). Each format
+has a ReportWriter that writes findings to the file as they are passed in, so callers can
+stream the findings of a scan while it runs (run.py writes each file's findings as soon as it
+has been scanned) instead of collecting them all first. save_report() writes any iterable of
+findings, including a generator, in one call. Findings may be written with the path of the
+file they belong to; the sarif writer uses it for result locations.
+
+The json writer produces the same indented array as json.dump(findings, indent=4) one element
+at a time. The pdf writer depends on the optional fpdf package, which keeps the rendered
+document in memory until it is written out on close().
+
+The sarif writer produces a SARIF 2.1.0 log (GitHub code scanning, IDE viewers). Finding
+metadata is stored once per distinct (type, level, recommendation) in tool.driver.rules and
+file paths once in run.artifacts; every result references them by index and only carries
+its message and locations, so the recommendation text and the per-file "Security Guidance"
+block are not repeated for every finding.
+"""
+
+import json
 import os
+import re
 from datetime import datetime
+from html import escape as html_escape
+from urllib.parse import quote
 
 
 def ensure_report_directory():
@@ -16,56 +41,286 @@ def generate_filename(extension: str):
     return f"scanner_{date_str}.{extension}"
 
 
-def save_report(findings, extension):
-    report_dir = ensure_report_directory()
-    filename = generate_filename(extension)
-    full_path = os.path.join(report_dir, filename)
-
-    if extension == "json":
-        import json
-        with open(full_path, "w", encoding="utf-8") as f:
-            json.dump(findings, f, indent=4, ensure_ascii=False)
-
-    elif extension == "txt":
-        with open(full_path, "w", encoding="utf-8") as f:
-            for fnd in findings:
-                f.write(f"[{fnd['level']}] {fnd['type']}\n")
-                f.write(f"- Description: {fnd['message']}\n")
-                f.write(f"- Recommendation: {fnd['recommendation']}\n\n")
-
-    elif extension == "html":
-        with open(full_path, "w", encoding="utf-8") as f:
-            f.write("<html><head><meta charset='UTF-8'><title>Scan Report</title>")
-            f.write("<style>body { font-family: sans-serif; padding: 20px; } h2 { color: #B30000; }</style>")
-            f.write("</head><body><h1>Nuvai Security Scan Report</h1>")
-            for fnd in findings:
-                f.write(f"<h2>[{fnd['level']}] {fnd['type']}</h2>")
-                f.write(f"<p><strong>Description:</strong> {fnd['message']}</p>")
-                f.write(f"<p><strong>Recommendation:</strong> {fnd['recommendation']}</p><hr>")
-            f.write("</body></html>")
-
-    elif extension == "pdf":
-        try:
-            from fpdf import FPDF
-        except ImportError:
-            print("⚠️ PDF export not available. To enable it, install fpdf using a virtual environment:")
-            print("💡 Example: python3 -m venv .venv && source .venv/bin/activate && pip install fpdf")
-            return None
-
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", size=12)
-        pdf.cell(200, 10, txt="Nuvai Security Scan Report", ln=True, align="C")
+def describe_location(fnd):
+    if fnd.get("line") is None:
+        return None
+    location = f"line {fnd['line']}, column {fnd['column']}"
+    extra = len(fnd.get("occurrences", [])) - 1
+    if extra > 0:
+        location += f" (+{extra} more occurrence{'s' if extra > 1 else ''})"
+    return location
+
+
+class ReportWriter:
+    """
+    Writes findings to `path` one at a time: write(finding, file_path) /
+    write_all(findings, file_path), then close(). As a context manager, the report is
+    closed (and completed) on exit.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = open(path, "w", encoding="utf-8")
+        self.begin()
+
+    def begin(self):
+        pass
+
+    def write_finding(self, fnd, file_path):
+        raise NotImplementedError
+
+    def end(self):
+        pass
+
+    def write(self, fnd, file_path=None):
+        self.write_finding(fnd, file_path)
+        self.count += 1
+
+    def write_all(self, findings, file_path=None):
         for fnd in findings:
-            pdf.set_font("Arial", "B", 12)
-            pdf.cell(200, 10, txt=f"[{fnd['level']}] {fnd['type']}", ln=True)
-            pdf.set_font("Arial", size=11)
-            pdf.multi_cell(0, 10, txt=f"Description: {fnd['message']}")
-            pdf.multi_cell(0, 10, txt=f"Recommendation: {fnd['recommendation']}")
-            pdf.ln()
-        pdf.output(full_path)
-
-    else:
+            self.write(fnd, file_path)
+
+    def close(self):
+        if self._file.closed:
+            return
+        try:
+            self.end()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JsonReportWriter(ReportWriter):
+    def begin(self):
+        self._file.write("[")
+
+    def write_finding(self, fnd, file_path):
+        text = json.dumps(fnd, indent=4, ensure_ascii=False).replace("\n", "\n    ")
+        self._file.write(f"{',' if self.count else ''}\n    {text}")
+
+    def end(self):
+        self._file.write("\n]" if self.count else "]")
+
+
+class JsonLinesReportWriter(ReportWriter):
+    def write_finding(self, fnd, file_path):
+        self._file.write(json.dumps(fnd, ensure_ascii=False) + "\n")
+
+
+class TextReportWriter(ReportWriter):
+    def write_finding(self, fnd, file_path):
+        f = self._file
+        f.write(f"[{fnd['level']}] {fnd['type']}\n")
+        f.write(f"- Description: {fnd['message']}\n")
+        location = describe_location(fnd)
+        if location:
+            f.write(f"- Location: {location}\n")
+            f.write(f"- Code: {fnd['snippet']}\n")
+        f.write(f"- Recommendation: {fnd['recommendation']}\n\n")
+
+
+class HtmlReportWriter(ReportWriter):
+    def begin(self):
+        f = self._file
+        f.write("<html><head><meta charset='UTF-8'><title>Scan Report</title>")
+        f.write("<style>body { font-family: sans-serif; padding: 20px; } h2 { color: #B30000; }</style>")
+        f.write("</head><body><h1>Nuvai Security Scan Report</h1>")
+
+    def write_finding(self, fnd, file_path):
+        f = self._file
+        f.write(f"<h2>[{fnd['level']}] {fnd['type']}</h2>")
+        f.write(f"<p><strong>Description:</strong> {fnd['message']}</p>")
+        location = describe_location(fnd)
+        if location:
+            f.write(f"<p><strong>Location:</strong> {location}</p>")
+            f.write(f"<pre><code>{html_escape(fnd['snippet'])}</code></pre>")
+        f.write(f"<p><strong>Recommendation:</strong> {fnd['recommendation']}</p><hr>")
+
+    def end(self):
+        self._file.write("</body></html>")
+
+
+class PdfReportWriter(ReportWriter):
+    def __init__(self, path):
+        from fpdf import FPDF
+
+        self.path = path
+        self.count = 0
+        self._closed = False
+        self._pdf = FPDF()
+        self._pdf.add_page()
+        self._pdf.set_font("Arial", size=12)
+        self._pdf.cell(200, 10, txt="Nuvai Security Scan Report", ln=True, align="C")
+
+    def write_finding(self, fnd, file_path):
+        pdf = self._pdf
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(200, 10, txt=f"[{fnd['level']}] {fnd['type']}", ln=True)
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 10, txt=f"Description: {fnd['message']}")
+        location = describe_location(fnd)
+        if location:
+            pdf.multi_cell(0, 10, txt=f"Location: {location}")
+        pdf.multi_cell(0, 10, txt=f"Recommendation: {fnd['recommendation']}")
+        pdf.ln()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._pdf.output(self.path)
+
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_LEVELS = {"CRITICAL": "error", "HIGH": "error", "ERROR": "error", "MEDIUM": "warning", "WARNING": "warning"}
+# security-severity (0-10) drives the severity shown by GitHub code scanning.
+SECURITY_SEVERITY = {"CRITICAL": "9.5", "HIGH": "7.5", "MEDIUM": "5.0", "WARNING": "4.0", "INFO": "1.0"}
+SARIF_KINDS = {"TIP": "informational", "No Issues Detected": "pass"}
+
+
+def sarif_uri(file_path):
+    if os.path.isabs(file_path):
+        return "file://" + quote(file_path.replace(os.sep, "/"))
+    return quote(os.path.normpath(file_path).replace(os.sep, "/"))
+
+
+def sarif_region(occurrence):
+    region = {"startLine": occurrence["line"], "startColumn": occurrence["column"]}
+    if occurrence.get("snippet") is not None:
+        region["snippet"] = {"text": occurrence["snippet"]}
+    return region
+
+
+class SarifReportWriter(ReportWriter):
+    """
+    Results are streamed into runs[0].results; the rule and artifact tables they index into
+    are only complete at the end, so they are written after the results (JSON objects are
+    unordered) and are the only state kept while writing. Message texts are stored once, in
+    their rule's messageStrings, and results refer to them by id.
+    """
+
+    def begin(self):
+        self._rules = {}
+        self._artifacts = {}
+        self._messages = {}
+        self._file.write(f'{{"$schema": "{SARIF_SCHEMA}", "version": "2.1.0", "runs": [{{"results": [')
+
+    def rule_index(self, fnd):
+        key = (fnd["type"], fnd["level"], fnd["recommendation"])
+        entry = self._rules.get(key)
+        if entry is None:
+            slug = re.sub(r"[^a-z0-9]+", "-", fnd["type"].lower()).strip("-") or "finding"
+            rule_id = f"nuvai/{slug}"
+            if any(rule["id"] == rule_id for _, rule in self._rules.values()):
+                rule_id = f"{rule_id}/{len(self._rules)}"
+            level = str(fnd["level"]).upper()
+            rule = {
+                "id": rule_id,
+                "name": fnd["type"],
+                "shortDescription": {"text": fnd["type"]},
+                "fullDescription": {"text": fnd["message"]},
+                "help": {"text": fnd["recommendation"]},
+                "defaultConfiguration": {"level": SARIF_LEVELS.get(level, "note")},
+                "properties": {"severity": fnd["level"]},
+            }
+            if level in SECURITY_SEVERITY:
+                rule["properties"]["security-severity"] = SECURITY_SEVERITY[level]
+            entry = self._rules[key] = (len(self._rules), rule)
+        return entry
+
+    def message_id(self, index, rule, text):
+        message_id = self._messages.get((index, text))
+        if message_id is None:
+            strings = rule.setdefault("messageStrings", {})
+            message_id = "default" if not strings else f"message{len(strings)}"
+            strings[message_id] = {"text": text}
+            self._messages[(index, text)] = message_id
+        return message_id
+
+    def artifact_location(self, file_path):
+        uri = sarif_uri(file_path)
+        index = self._artifacts.setdefault(uri, len(self._artifacts))
+        return {"uri": uri, "index": index}
+
+    def write_finding(self, fnd, file_path):
+        index, rule = self.rule_index(fnd)
+        result = {"ruleId": rule["id"], "ruleIndex": index}
+        kind = SARIF_KINDS.get(fnd["type"]) or SARIF_KINDS.get(str(fnd["level"]).upper())
+        if kind:
+            result["kind"] = kind
+        else:
+            result["level"] = rule["defaultConfiguration"]["level"]
+        result["message"] = {"id": self.message_id(index, rule, fnd["message"])}
+        if file_path is not None:
+            artifact = self.artifact_location(file_path)
+            occurrences = fnd.get("occurrences") or ([fnd] if fnd.get("line") is not None else [])
+            location = {"artifactLocation": artifact}
+            if occurrences:
+                location["region"] = sarif_region(occurrences[0])
+            result["locations"] = [{"physicalLocation": location}]
+            # Further occurrences reference the artifact by index only and carry no snippet.
+            by_index = {"index": artifact["index"]}
+            related = [
+                {"id": i, "physicalLocation": {"artifactLocation": by_index, "region": {
+                    "startLine": occurrence["line"], "startColumn": occurrence["column"]}}}
+                for i, occurrence in enumerate(occurrences[1:], start=1)
+            ]
+            if related:
+                result["relatedLocations"] = related
+        self._file.write(f"{',' if self.count else ''}\n{json.dumps(result, ensure_ascii=False)}")
+
+    def end(self):
+        rules = [rule for _, rule in sorted(self._rules.values(), key=lambda entry: entry[0])]
+        tool = {"driver": {"name": "Nuvai", "informationUri": "https://github.com/tinkerlev/Nuvai", "rules": rules}}
+        artifacts = [{"location": {"uri": uri}} for uri in self._artifacts]
+        self._file.write(f'\n], "tool": {json.dumps(tool, ensure_ascii=False)}, '
+                         f'"artifacts": {json.dumps(artifacts, ensure_ascii=False)}, '
+                         f'"columnKind": "unicodeCodePoints"}}]}}\n')
+
+
+def columnar_report_writer(path):
+    from .columnar_report import ColumnarReportWriter
+    return ColumnarReportWriter(path)
+
+
+REPORT_WRITERS = {
+    "json": JsonReportWriter,
+    "jsonl": JsonLinesReportWriter,
+    "txt": TextReportWriter,
+    "html": HtmlReportWriter,
+    "pdf": PdfReportWriter,
+    "sarif": SarifReportWriter,
+    "nvr": columnar_report_writer,
+}
+
+
+def open_report(extension, path=None):
+    """
+    A ReportWriter for `extension`, writing to `path` (default: a new file in the report
+    directory), or None if the format is unknown or unavailable.
+    """
+    writer_class = REPORT_WRITERS.get(extension)
+    if writer_class is None:
+        return None
+    if path is None:
+        path = os.path.join(ensure_report_directory(), generate_filename(extension))
+    try:
+        return writer_class(path)
+    except ImportError:
+        print("⚠️ PDF export not available. To enable it, install fpdf using a virtual environment:")
+        print("💡 Example: python3 -m venv .venv && source .venv/bin/activate && pip install fpdf")
         return None
 
-    return full_path
+
+def save_report(findings, extension):
+    writer = open_report(extension)
+    if writer is None:
+        return None
+    with writer:
+        writer.write_all(findings)
+    return writer.path
@@ -0,0 +1,259 @@
+"""
+File: rules.py
+
+Description:
+Declarative rule registry shared by every Nuvai language scanner. Each scanner module
+describes its checks as a list of Rule objects (data, not methods) and registers them
+here under its language name. Every pattern is compiled once when the rule is created,
+so a scan only pays for matching – never for pattern compilation or re's cache lookups.
+
+Findings of rules with a primary pattern carry the location of its first match (`line`,
+`column`, `snippet`) and an `occurrences` list with the location of every match. File-level
+rules (no primary pattern) have no location.
+
+A rule fires when:
+- its primary pattern matches somewhere in the code (or it has no primary pattern),
+- every pattern in `requires` also matches, and
+- no pattern in `excludes` matches.
+
+Rules may declare `literals`: substrings of which at least one must occur for the primary
+pattern to match. When omitted they are extracted automatically from the pattern, and the
+matcher skips the regex entirely when none of them is present in the file.
+
+Rules declared with ast_only=True have no regex form (e.g. dataflow findings of the Python
+taint engine); the regex matcher never fires them, including in the regex fallback.
+
+Rule sets of languages with a tokenizer (the JavaScript family, js_tokenizer.py) only accept
+matches that start in the token kinds listed in a rule's `contexts` – "code" by default, so
+comments, strings and regex literals never trigger a rule unless it asks for them (e.g.
+contexts=("comment",)). Conditions use the same contexts as their rule.
+
+Condition patterns may be given as plain strings or as pre-compiled patterns when they
+need their own flags (e.g. re.compile(r'csrf', re.IGNORECASE)).
+
+Every RuleSet carries a `version`: a digest of all its rule definitions (and of the engine
+evaluating them, if not the regex matcher, and of its tokenizer), which changes whenever a rule is added, removed
+or edited. Result caches key on it (scan_cache.py).
+
+Patterns that exceed the matcher's per-pattern time budget on a file are abandoned; the rules
+depending on them are listed in a single "Partial Scan" finding instead of hanging the scan.
+
+With profiling enabled (scan_profiler.py), the time, files and matches of every rule decision
+are recorded per rule.
+
+Each RuleSet registers the patterns of all its rules in a shared PatternTable (matcher.py), so a
+pattern used by several rules or conditions is searched at most once per file, and only when a
+rule decision actually depends on it.
+
+Scanner modules are imported lazily (scanner.py), so get_rules() loads the module of a language
+that has not registered its rules yet, and registered_languages() loads every known language.
+"""
+
+import hashlib
+import re
+import time
+
+from .matcher import PatternTable
+from .scan_profiler import active_profiler
+
+_REGISTRY = {}
+DEFAULT_CONTEXTS = ("code",)
+PARTIAL_SCAN_TYPE = "Partial Scan"
+
+
+class Rule:
+    __slots__ = ("id", "language", "level", "type", "message", "recommendation",
+                 "pattern", "flags", "regex", "literals", "requires", "excludes", "ast_only", "contexts")
+
+    def __init__(self, rule_id, level, ftype, message, recommendation, pattern=None,
+                 flags=0, requires=(), excludes=(), literals=None, ast_only=False, contexts=None):
+        self.id = rule_id
+        self.language = None
+        self.level = level
+        self.type = ftype
+        self.message = message
+        self.recommendation = recommendation
+        self.pattern = pattern
+        self.flags = flags
+        self.regex = re.compile(pattern, flags) if pattern is not None else None
+        self.literals = tuple(literals) if literals is not None else None
+        self.requires = tuple(re.compile(p) for p in requires)
+        self.excludes = tuple(re.compile(p) for p in excludes)
+        self.ast_only = ast_only
+        self.contexts = tuple(contexts) if contexts is not None else None
+
+    def __repr__(self):
+        return f"Rule({self.id!r}, {self.level!r}, {self.type!r})"
+
+    def signature(self):
+        return (self.id, self.level, self.type, self.message, self.recommendation,
+                self.pattern, self.flags, self.literals,
+                tuple((r.pattern, r.flags) for r in self.requires),
+                tuple((r.pattern, r.flags) for r in self.excludes), self.ast_only, self.contexts)
+
+    def matches(self, code):
+        if self.ast_only:
+            return False
+        if self.regex is not None and not self.regex.search(code):
+            return False
+        if not all(r.search(code) for r in self.requires):
+            return False
+        return not any(r.search(code) for r in self.excludes)
+
+    def to_finding(self):
+        return {
+            "level": self.level,
+            "type": self.type,
+            "message": self.message,
+            "recommendation": self.recommendation
+        }
+
+
+class RuleSet:
+    def __init__(self, language, rules, tokenizer=None):
+        self.language = language
+        self.rules = tuple(rules)
+        self.tokenizer = tokenizer
+        for rule in self.rules:
+            rule.language = language
+
+        self.patterns = PatternTable()
+        self._plan = []
+        for rule in self.rules:
+            contexts = (rule.contexts or DEFAULT_CONTEXTS) if tokenizer is not None else None
+            self._plan.append((
+                rule,
+                self.patterns.add(rule.regex, rule.literals, contexts) if rule.regex is not None else None,
+                tuple(self.patterns.add(r, contexts=contexts) for r in rule.requires),
+                tuple(self.patterns.add(r, contexts=contexts) for r in rule.excludes),
+            ))
+        self._rules_digest = repr([rule.signature() for rule in self.rules])
+        self._rules_digest += f"|{getattr(tokenizer, 'version', None)}"
+        self.engine = None
+
+    @property
+    def version(self):
+        # Engines that evaluate these rules differently (e.g. the Python AST engine) set
+        # `engine` to a name/version tag, which is folded into the version as well.
+        return hashlib.sha256(f"{self._rules_digest}|{self.engine}".encode("utf-8")).hexdigest()[:16]
+
+    def get(self, rule_id):
+        return next((rule for rule in self.rules if rule.id == rule_id), None)
+
+    def __iter__(self):
+        return iter(self.rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def evaluate(self, code, origin=(1, 1), rule_ids=None):
+        tokens = self.tokenizer(code) if self.tokenizer is not None else None
+        return self.evaluate_hits(self.patterns.scan(code, origin, tokens), rule_ids)
+
+    def evaluate_hits(self, hits, rule_ids=None):
+        profiler = active_profiler()
+        findings = []
+        for rule, primary, requires, excludes in self._plan:
+            if rule.ast_only or (rule_ids is not None and rule.id not in rule_ids):
+                continue
+            if profiler is None:
+                finding = self._evaluate_rule(hits, rule, primary, requires, excludes)
+            else:
+                started = time.perf_counter()
+                finding = self._evaluate_rule(hits, rule, primary, requires, excludes)
+                matches = len(finding.get("occurrences", (finding,))) if finding else 0
+                profiler.record_rule(self.language, rule.id, hits.size, time.perf_counter() - started, matches)
+            if finding is not None:
+                findings.append(finding)
+        if hits.timed_out:
+            findings.append(self.partial_scan_finding(
+                rule.id for rule, primary, requires, excludes in self._plan
+                if (rule_ids is None or rule.id in rule_ids)
+                and hits.timed_out.intersection((primary,) + requires + excludes)))
+        return findings
+
+    @staticmethod
+    def _evaluate_rule(hits, rule, primary, requires, excludes):
+        if primary is not None and primary not in hits:
+            return None
+        if not all(i in hits for i in requires):
+            return None
+        if any(i in hits for i in excludes):
+            return None
+        finding = rule.to_finding()
+        if primary is not None:
+            occurrences = hits.occurrences(primary)
+            finding.update(occurrences[0])
+            finding["occurrences"] = occurrences
+        return finding
+
+    @staticmethod
+    def partial_scan_finding(skipped):
+        return {
+            "level": "WARNING",
+            "type": PARTIAL_SCAN_TYPE,
+            "message": f"Scan time budget exceeded; these rules were not fully evaluated: {', '.join(skipped)}.",
+            "recommendation": "Review the affected code manually, or split the file and scan it again."
+        }
+
+
+def register_rules(language, rules, tokenizer=None):
+    ruleset = RuleSet(language, rules, tokenizer)
+    seen = set()
+    for rule in ruleset:
+        if rule.id in seen:
+            raise ValueError(f"Duplicate rule id '{rule.id}' for language '{language}'")
+        seen.add(rule.id)
+    _REGISTRY[language] = ruleset
+    return ruleset
+
+
+def get_rules(language):
+    ruleset = _REGISTRY.get(language)
+    if ruleset is None:
+        from .scanner import get_scanner
+        try:
+            get_scanner(language)
+        except ImportError:
+            return None
+        ruleset = _REGISTRY.get(language)
+    return ruleset
+
+
+def registered_languages():
+    from .scanner import SCANNERS
+    for language in SCANNERS.languages():
+        get_rules(language)
+    return list(_REGISTRY)
+
+
+class RuleScanner:
+    """
+    Thin driver over a registered RuleSet. Language scanners subclass this and set
+    `language`; the public interface (constructor, run_all_checks, findings) is unchanged.
+    `origin` is the (line, column) of code[0] in the original file, used for locations.
+
+    check(code, origin) scans without touching the instance, so scan_code() shares one
+    scanner per language (scanner.py) between calls and threads.
+    """
+    language = None
+
+    def __init__(self, code="", origin=(1, 1)):
+        self.code = code
+        self.origin = origin
+        self.findings = []
+
+    def check(self, code, origin=(1, 1)):
+        return get_rules(self.language).evaluate(code, origin)
+
+    def run_all_checks(self):
+        self.findings.extend(self.check(self.code, self.origin))
+        return self.findings
+
+    def add_finding(self, level, ftype, message, recommendation):
+        self.findings.append({
+            "level": level,
+            "type": ftype,
+            "message": message,
+            "recommendation": recommendation
+        })
@@ -0,0 +1,204 @@
+"""
+File: scan_cache.py
+
+Description:
+Content-addressed cache of scan findings, so unchanged files (CI reruns, users re-uploading
+the same file) are not scanned a second time. Only findings are stored, since they depend
+on the file content alone; the server caches AI analyses separately, per user
+(ai_analyzer.py).
+
+Keys are built from the SHA-256 of the file content, the language and the `version` of that
+language's RuleSet (rules.py). Editing, adding or removing any rule changes the version, so
+results produced by older rules are never read again and simply age out of the store.
+
+Stores:
+- FileScanCache: one JSON file per entry under ~/.nuvai_cache/scans (CLI). Reading an entry
+  refreshes its modification time, which is the LRU order used for eviction.
+- RedisScanCache: values plus a sorted set of access times in Redis (server.py).
+
+Both stores are bounded by a maximum number of entries and evict the least recently used
+entries first. Cache failures are logged and treated as misses; they never fail a scan.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+
+from .rules import PARTIAL_SCAN_TYPE, get_rules
+from .scanner import scan_code
+
+logger = logging.getLogger(__name__)
+
+# Bump when scan_code's output changes for reasons other than the rules themselves.
+CACHE_FORMAT_VERSION = "3"
+DEFAULT_MAX_ENTRIES = int(os.getenv("NUVAI_SCAN_CACHE_MAX_ENTRIES", "10000"))
+EVICTION_RATIO = 0.9
+
+
+def default_cache_directory():
+    default = os.path.join(os.path.expanduser("~"), ".nuvai_cache", "scans")
+    return os.getenv("NUVAI_SCAN_CACHE_DIR", default)
+
+
+def ruleset_version(language):
+    ruleset = get_rules(language)
+    return ruleset.version if ruleset is not None else "none"
+
+
+def scan_cache_key(code, language, namespace="scan"):
+    digest = hashlib.sha256(code.encode("utf-8", "surrogatepass")).hexdigest()
+    return f"{namespace}:{CACHE_FORMAT_VERSION}:{language}:{ruleset_version(language)}:{digest}"
+
+
+def is_cacheable(findings):
+    # Scanner errors may be transient (e.g. an import failure) and partial scans depend on
+    # timing, so neither is cached.
+    return not any(f.get("level") == "ERROR" or f.get("type") == PARTIAL_SCAN_TYPE for f in findings)
+
+
+def cached_scan_code(code, language, cache=None):
+    """
+    scan_code() with a result cache in front of it; `cache` may be None to disable caching.
+    """
+    if cache is None:
+        return scan_code(code, language)
+    key = scan_cache_key(code, language)
+    findings = cache.get(key)
+    if findings is not None:
+        return findings
+    findings = scan_code(code, language)
+    if is_cacheable(findings):
+        cache.put(key, findings)
+    return findings
+
+
+class FileScanCache:
+    def __init__(self, directory=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.directory = directory or default_cache_directory()
+        self.max_entries = max_entries
+        self._entries = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _entry_files(self):
+        try:
+            with os.scandir(self.directory) as it:
+                return [entry for entry in it if entry.name.endswith(".json")]
+        except FileNotFoundError:
+            return []
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"[scan_cache] Ignoring unreadable cache entry {path}: {e}")
+            return None
+        if entry.get("key") != key:
+            return None
+        return entry.get("value")
+
+    def put(self, key, value):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "value": value}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"[scan_cache] Failed to write cache entry {path}: {e}")
+            return
+        if self._entries is None:
+            self._entries = len(self._entry_files())
+        else:
+            self._entries += 1
+        if self._entries > self.max_entries:
+            self.evict()
+
+    def evict(self):
+        # Trim to a fraction of the limit so eviction does not run again on the next insert.
+        entries = []
+        for entry in self._entry_files():
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                continue
+        entries.sort()
+        keep = int(self.max_entries * EVICTION_RATIO)
+        for _, path in entries[:max(0, len(entries) - keep)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._entries = min(len(entries), keep)
+
+    def clear(self):
+        for entry in self._entry_files():
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+        self._entries = 0
+
+
+class RedisScanCache:
+    def __init__(self, client, max_entries=DEFAULT_MAX_ENTRIES, prefix="nuvai:scan_cache:"):
+        self.client = client
+        self.max_entries = max_entries
+        self.prefix = prefix
+        self.index_key = f"{prefix}lru"
+
+    def get(self, key):
+        try:
+            raw = self.client.get(self.prefix + key)
+            if raw is None:
+                return None
+            self.client.zadd(self.index_key, {key: time.time()})
+            return json.loads(raw)
+        except Exception as e:
+            logger.warning(f"[scan_cache] Redis lookup failed, scanning without cache: {e}")
+            return None
+
+    def put(self, key, value):
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(self.prefix + key, json.dumps(value, ensure_ascii=False))
+            pipe.zadd(self.index_key, {key: time.time()})
+            pipe.zcard(self.index_key)
+            size = pipe.execute()[-1]
+            if size > self.max_entries:
+                self.evict(size - int(self.max_entries * EVICTION_RATIO))
+        except Exception as e:
+            logger.warning(f"[scan_cache] Redis store failed: {e}")
+
+    def evict(self, count):
+        stale = self.client.zrange(self.index_key, 0, count - 1)
+        if not stale:
+            return
+        keys = [k.decode("utf-8") if isinstance(k, bytes) else k for k in stale]
+        pipe = self.client.pipeline()
+        pipe.delete(*[self.prefix + k for k in keys])
+        pipe.zrem(self.index_key, *keys)
+        pipe.execute()
+
+
+_FILE_CACHES = {}
+
+
+def get_file_cache(directory=None):
+    """
+    Per-process FileScanCache for `directory`, so worker processes keep their entry count.
+    """
+    directory = directory or default_cache_directory()
+    cache = _FILE_CACHES.get(directory)
+    if cache is None:
+        cache = _FILE_CACHES[directory] = FileScanCache(directory)
+    return cache
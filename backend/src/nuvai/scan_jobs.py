@@ -0,0 +1,153 @@
+"""
+File: scan_jobs.py
+
+Description:
+Background job queue for asynchronous scans (`POST /scan?async=1`). The request thread only
+reads the upload and enqueues a job; a bounded pool of worker threads runs the scan and the
+AI analysis, so a slow LLM call no longer pins a web worker. Clients poll
+`GET /scan/<job_id>` until the job is done. Each job records the identity of the user who
+submitted it (None for anonymous scans), and only that user may read it.
+
+Job records are kept in Redis when it is reachable, so any web worker can answer a poll, and
+in an in-process store otherwise. Records expire after a TTL either way.
+
+Job lifecycle: queued -> running -> done | failed
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_TTL = 3600
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+def new_job(job_id, owner=None):
+    return {
+        "job_id": job_id,
+        "owner": owner,
+        "status": "queued",
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+        "result": None,
+        "error": None
+    }
+
+
+class MemoryJobStore:
+    def __init__(self, ttl=DEFAULT_JOB_TTL):
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _prune(self, now):
+        expired = [job_id for job_id, job in self._jobs.items() if now - job["created_at"] > self.ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def save(self, job):
+        with self._lock:
+            self._prune(time.time())
+            self._jobs[job["job_id"]] = dict(job)
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+
+class RedisJobStore:
+    def __init__(self, client, ttl=DEFAULT_JOB_TTL, prefix="nuvai:scan_job:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def save(self, job):
+        self.client.setex(self.prefix + job["job_id"], self.ttl, json.dumps(job, ensure_ascii=False))
+
+    def update(self, job_id, **fields):
+        # Each job is only written by the worker running it, so read-modify-write is safe.
+        job = self.get(job_id)
+        if job is not None:
+            job.update(fields)
+            self.save(job)
+
+    def get(self, job_id):
+        raw = self.client.get(self.prefix + job_id)
+        return json.loads(raw) if raw is not None else None
+
+
+def create_job_store(redis_client, ttl=DEFAULT_JOB_TTL):
+    """
+    RedisJobStore when the Redis server answers, otherwise an in-process MemoryJobStore.
+    """
+    try:
+        redis_client.ping()
+        return RedisJobStore(redis_client, ttl)
+    except Exception as e:
+        logger.warning(f"[scan_jobs] Redis unavailable, keeping scan jobs in process memory: {e}")
+        return MemoryJobStore(ttl)
+
+
+class ScanJobQueue:
+    def __init__(self, store, max_workers=4, max_pending=100):
+        self.store = store
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scan-job")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, owner=None):
+        """
+        Enqueue func(*args) for `owner` and return the new job id. Raises QueueFullError when
+        `max_pending` jobs are already queued or running in this process.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError("Too many scan jobs in progress")
+            self._pending += 1
+        job_id = uuid.uuid4().hex
+        try:
+            self.store.save(new_job(job_id, owner))
+            self._executor.submit(self._run, job_id, func, args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return job_id
+
+    def _run(self, job_id, func, args):
+        try:
+            self.store.update(job_id, status="running", started_at=time.time())
+            result = func(*args)
+            self.store.update(job_id, status="done", result=result, finished_at=time.time())
+        except Exception as e:
+            logger.exception(f"[scan_jobs] Scan job {job_id} failed")
+            try:
+                self.store.update(job_id, status="failed", error=str(e), finished_at=time.time())
+            except Exception:
+                logger.exception(f"[scan_jobs] Could not record failure of scan job {job_id}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,180 @@
+"""
+File: scan_profiler.py
+
+Description:
+Optional per-rule and per-language profiling of scan_code(). While a ScanProfiler is enabled
+(enable_profiling), every scan records:
+
+- per language: files scanned, bytes, wall time of the scanner run;
+- per rule: files evaluated, files in which the rule fired (hit rate), number of matches and
+  wall time spent deciding the rule;
+- both broken down by file-size bucket (SIZE_BUCKETS).
+
+Rule time includes the pattern searches the decision triggered. Patterns shared by several
+rules are searched once per file (matcher.py), so their cost is charged to the first rule
+that needed them. Rules checked by a single-pass engine (the Python AST walk, the HTML event
+parser) run interleaved, so the engine's time is recorded once under ENGINE_ENTRY and those
+rules only record files, hits and matches.
+
+When profiling is disabled (the default), the instrumented code paths only test
+active_profiler() for None. Aggregates are thread-safe; report() returns them as a
+JSON-serializable dict, and snapshot()/merge() carry them across worker processes.
+
+Usage:
+    profiler = enable_profiling()
+    scan_code(code, "python")
+    print(profiler.report())
+"""
+
+import copy
+import json
+import threading
+import time
+
+SIZE_BUCKETS = (
+    (1024, "<1KB"),
+    (10 * 1024, "1KB-10KB"),
+    (100 * 1024, "10KB-100KB"),
+    (1024 * 1024, "100KB-1MB"),
+    (None, ">=1MB"),
+)
+ENGINE_ENTRY = "<engine>"
+
+_ACTIVE = None
+
+
+def size_bucket(size):
+    for limit, label in SIZE_BUCKETS:
+        if limit is None or size < limit:
+            return label
+
+
+def _bucket_order(label):
+    return [bucket for _, bucket in SIZE_BUCKETS].index(label)
+
+
+class ScanProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            # language -> [files, bytes, seconds, {bucket: [files, seconds]}]
+            self._languages = {}
+            # (language, rule_id) -> [files, hits, matches, seconds, {bucket: [files, seconds]}]
+            self._rules = {}
+
+    # Recording
+
+    def record_file(self, language, size, seconds):
+        bucket = size_bucket(size)
+        with self._lock:
+            entry = self._languages.setdefault(language, [0, 0, 0.0, {}])
+            entry[0] += 1
+            entry[1] += size
+            entry[2] += seconds
+            by_size = entry[3].setdefault(bucket, [0, 0.0])
+            by_size[0] += 1
+            by_size[1] += seconds
+
+    def record_rule(self, language, rule_id, size, seconds=0.0, matches=0):
+        bucket = size_bucket(size)
+        with self._lock:
+            entry = self._rules.setdefault((language, rule_id), [0, 0, 0, 0.0, {}])
+            entry[0] += 1
+            entry[1] += 1 if matches else 0
+            entry[2] += matches
+            entry[3] += seconds
+            by_size = entry[4].setdefault(bucket, [0, 0.0])
+            by_size[0] += 1
+            by_size[1] += seconds
+
+    def record_engine(self, language, size, seconds):
+        self.record_rule(language, ENGINE_ENTRY, size, seconds)
+
+    # Transfer between processes
+
+    def snapshot(self, reset=False):
+        """Raw aggregates (picklable); with reset=True they are cleared atomically."""
+        with self._lock:
+            raw = {"languages": self._languages, "rules": self._rules}
+            if not reset:
+                return copy.deepcopy(raw)
+            self._languages, self._rules = {}, {}
+        return raw
+
+    def merge(self, raw):
+        with self._lock:
+            for table, incoming in ((self._languages, raw["languages"]), (self._rules, raw["rules"])):
+                for key, values in incoming.items():
+                    entry = table.setdefault(key, [0] * (len(values) - 1) + [{}])
+                    for i, value in enumerate(values[:-1]):
+                        entry[i] += value
+                    for bucket, (files, seconds) in values[-1].items():
+                        by_size = entry[-1].setdefault(bucket, [0, 0.0])
+                        by_size[0] += files
+                        by_size[1] += seconds
+
+    # Reporting
+
+    def report(self):
+        raw = self.snapshot()
+
+        def buckets(by_size):
+            return {bucket: {"files": files, "seconds": round(seconds, 6)}
+                    for bucket, (files, seconds) in sorted(by_size.items(), key=lambda item: _bucket_order(item[0]))}
+
+        languages = {
+            language: {
+                "files": files,
+                "bytes": size,
+                "seconds": round(seconds, 6),
+                "mb_per_second": round(size / seconds / 1e6, 3) if seconds else None,
+                "by_size": buckets(by_size),
+            }
+            for language, (files, size, seconds, by_size) in sorted(raw["languages"].items())
+        }
+        rules = [
+            {
+                "language": language,
+                "rule": rule_id,
+                "files": files,
+                "hits": hits,
+                "hit_rate": round(hits / files, 4) if files else 0.0,
+                "matches": matches,
+                "seconds": round(seconds, 6),
+                "mean_us": round(seconds / files * 1e6, 1) if files else 0.0,
+                "by_size": buckets(by_size),
+            }
+            for (language, rule_id), (files, hits, matches, seconds, by_size) in raw["rules"].items()
+        ]
+        rules.sort(key=lambda entry: (-entry["seconds"], entry["language"], entry["rule"]))
+        return {
+            "started_at": self.started_at,
+            "elapsed_seconds": round(time.time() - self.started_at, 3),
+            "languages": languages,
+            "rules": rules,
+        }
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+
+def enable_profiling(profiler=None):
+    """Install (and return) the profiler that scans record into from now on."""
+    global _ACTIVE
+    _ACTIVE = profiler or _ACTIVE or ScanProfiler()
+    return _ACTIVE
+
+
+def disable_profiling():
+    global _ACTIVE
+    _ACTIVE = None
+
+
+def active_profiler():
+    return _ACTIVE
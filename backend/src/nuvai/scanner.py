@@ -1,11 +1,18 @@
 # File: scanner.py
 
 import os
+import importlib
 import logging
 import re
+import threading
+import time
+
+from .scan_profiler import active_profiler
 
 logger = logging.getLogger(__name__)
 
+PLUGIN_ENTRY_POINT_GROUP = "nuvai.scanners"
+
 SUPPORTED_LANGUAGES = {
     ".py": ("python", "PythonScanner"),
     ".js": ("javascript", "JavaScriptScanner"),
@@ -26,6 +33,90 @@ CONTENT_SIGNATURES = {
     "typescript": [r"interface ", r"import .* from \".*\""],
 }
 
+class ScannerRegistry:
+    """
+    Maps language names to scanner factories: classes, callables or "module:attribute"
+    strings, imported on first use. A factory is called once, without arguments, and the
+    scanner it returns serves every scan of its language, so scanners must be stateless:
+    check(code, origin) returns the findings of one scan (see RuleScanner in rules.py).
+
+    Other packages add languages through the "nuvai.scanners" entry point group
+    (name = language, value = "module:factory"); the group is read the first time a
+    language without a registered factory is requested. Entry points never replace a
+    built-in scanner.
+    """
+
+    def __init__(self, entry_point_group=PLUGIN_ENTRY_POINT_GROUP):
+        self._lock = threading.RLock()
+        self._factories = {}
+        self._scanners = {}
+        self._entry_point_group = entry_point_group
+        self._plugins_loaded = entry_point_group is None
+
+    def register(self, language, factory):
+        with self._lock:
+            self._factories[language] = factory
+            self._scanners.pop(language, None)
+        return factory
+
+    def languages(self):
+        self._load_plugins()
+        return list(self._factories)
+
+    def get(self, language):
+        """The shared scanner of `language`, or None when the language is unknown."""
+        scanner = self._scanners.get(language)
+        if scanner is not None:
+            return scanner
+        if language not in self._factories:
+            self._load_plugins()
+        with self._lock:
+            scanner = self._scanners.get(language)
+            if scanner is None:
+                factory = self._factories.get(language)
+                if factory is None:
+                    return None
+                scanner = self._scanners[language] = resolve_factory(factory)()
+        return scanner
+
+    def _load_plugins(self):
+        if self._plugins_loaded:
+            return
+        with self._lock:
+            if self._plugins_loaded:
+                return
+            self._plugins_loaded = True
+            try:
+                from importlib.metadata import entry_points
+                plugins = entry_points(group=self._entry_point_group)
+            except Exception:
+                logger.exception("[scanner.py] Failed to read scanner plugins")
+                return
+            for plugin in plugins:
+                if plugin.name in self._factories:
+                    logger.warning(f"[scanner.py] Ignoring plugin {plugin.value}: '{plugin.name}' is already registered")
+                    continue
+                self._factories[plugin.name] = plugin.value
+
+def resolve_factory(factory):
+    if not isinstance(factory, str):
+        return factory
+    module_name, _, attribute = factory.partition(":")
+    target = importlib.import_module(module_name.strip(), __package__)
+    for name in attribute.split("[")[0].strip().split("."):
+        target = getattr(target, name)
+    return target
+
+SCANNERS = ScannerRegistry()
+for _language, _class_name in SUPPORTED_LANGUAGES.values():
+    SCANNERS.register(_language, f".{_language}_scanner:{_class_name}")
+
+def register_scanner(language, factory):
+    return SCANNERS.register(language, factory)
+
+def get_scanner(language):
+    return SCANNERS.get(language)
+
 def get_language(file_path, code=None):
     ext = os.path.splitext(file_path)[1].lower()
     language = SUPPORTED_LANGUAGES.get(ext, (None, None))[0]
@@ -37,9 +128,15 @@ def get_language(file_path, code=None):
                     return lang
     return language
 
+def stripped_origin(code):
+    # (line, column) at which code.strip() starts, so findings point into the original file.
+    prefix = code[:len(code) - len(code.lstrip())]
+    return prefix.count("\n") + 1, len(prefix) - (prefix.rfind("\n") + 1) + 1
+
 def scan_code(code, language):
     try:
         logger.info("[scanner.py] Starting scan_code()")
+        origin = stripped_origin(code)
         code = code.strip()
         logger.info(f"[scanner.py] Code length: {len(code)}")
         logger.info(f"[scanner.py] Detected language: {language}")
@@ -52,31 +149,8 @@ def scan_code(code, language):
                 "recommendation": "Please check the input and try again."
             }]
 
-        logger.info(f"[scanner.py] Importing scanner for {language}")
-
-        scanner = None
-        if language == "python":
-            from .python_scanner import PythonScanner
-            scanner = PythonScanner(code)
-        elif language == "javascript":
-            from .javascript_scanner import JavaScriptScanner
-            scanner = JavaScriptScanner(code)
-        elif language == "html":
-            from .html_scanner import HTMLScanner
-            scanner = HTMLScanner(code)
-        elif language == "jsx":
-            from .jsx_scanner import JSXScanner
-            scanner = JSXScanner(code)
-        elif language == "php":
-            from .php_scanner import PHPScanner
-            scanner = PHPScanner(code)
-        elif language == "cpp":
-            from .cpp_scanner import CppScanner
-            scanner = CppScanner(code)
-        elif language == "typescript":
-            from .typescript_scanner import TypeScriptScanner
-            scanner = TypeScriptScanner(code)
-        else:
+        scanner = get_scanner(language)
+        if scanner is None:
             logger.warning(f"[scanner.py] Unsupported language: {language}")
             return [{
                 "level": "ERROR",
@@ -86,7 +160,13 @@ def scan_code(code, language):
             }]
         logger.info(f"[scanner.py] Running checks with {scanner.__class__.__name__}")
 
-        findings = scanner.run_all_checks()
+        profiler = active_profiler()
+        if profiler is None:
+            findings = scanner.check(code, origin)
+        else:
+            started = time.perf_counter()
+            findings = scanner.check(code, origin)
+            profiler.record_file(language, len(code), time.perf_counter() - started)
         logger.info(f"[scanner.py] Scan complete – findings: {len(findings)}")
 
         if not findings:
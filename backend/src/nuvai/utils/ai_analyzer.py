@@ -1,56 +1,197 @@
+import hashlib
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
 import openai
 from openai import OpenAI
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional
 from dotenv import load_dotenv
+from src.nuvai import metrics
+from src.nuvai.utils.ai_gateway import AIGateway, AIUnavailableError, CircuitBreaker
 from src.nuvai.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 load_dotenv()
-client = OpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"),
+# All calls go through the gateway (concurrency limit, deadline, retries, circuit breaker),
+# so the client itself does not retry.
+client = AIGateway(
+    OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0),
+    max_concurrency=int(os.getenv("NUVAI_AI_MAX_CONCURRENCY", "4")),
+    timeout=float(os.getenv("NUVAI_AI_TIMEOUT", "30")),
+    max_retries=int(os.getenv("NUVAI_AI_MAX_RETRIES", "2")),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv("NUVAI_AI_BREAKER_THRESHOLD", "5")),
+        reset_timeout=float(os.getenv("NUVAI_AI_BREAKER_RESET", "30")),
+    ),
 )
+metrics.REGISTRY.register_collector(metrics.gateway_collector(client))
 
 DEFAULT_MODEL ="gpt-4o-2024-08-06"
 DEFAULT_TEMPERATURE = 0.7
 DEFAULT_MAX_TOKENS = 1000
 
-SYSTEM_PROMPT = """You are a cybersecurity expert. Analyze this scan result and provide:
+SYSTEM_PROMPT = """You are a cybersecurity expert. Analyze this scan result of one file (refer to it as "the file") and provide:
 1. A brief summary of findings
 2. Risk assessment
 3. Prioritized recommendations
 Be concise and focus on actionable insights."""
 
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+You will receive the scan results of several files, each introduced by "### File <id>".
+Analyze every file separately, referring to it as "the file", and answer with a JSON object
+{"files": [{"id": "<id>", "analysis": "<analysis of that file>"}]} listing each file once."""
+
+# Files whose findings fit in BATCH_FILE_MAX_CHARS are analyzed together, up to
+# BATCH_MAX_FILES per request; larger files get a request of their own.
+BATCH_MAX_FILES = 8
+BATCH_FILE_MAX_CHARS = 4000
+BATCH_MAX_TOKENS = 4000
+AI_CACHE_TTL = 86400
+AI_CACHE_MAX_ENTRIES = 1024
+AI_UNAVAILABLE = {"ai_analysis": "AI analysis not available.", "model_used": "None"}
+# Prompts and cached analyses never contain the file name; it is added to the analysis
+# text returned for each file.
+ANALYSIS_HEADER = "File: {filename}\n\n"
+
 demo_object = {
     "ai_analysis": "This is a demo response from the AI analysis.",
     "model_used": DEFAULT_MODEL
 }
 
-def analyze_scan_results(scan_result: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Analyze scan results using OpenAI API
-    """
-    try:
-        scan_text = f"""File: {scan_result['filename']}
-        Language: {scan_result['language']}
+def build_scan_text(scan_result: Dict[str, Any]) -> str:
+    return f"""Language: {scan_result['language']}
         Vulnerabilities Found: {len(scan_result['vulnerabilities'])}
         Detailed Findings:
         {format_vulnerabilities(scan_result['vulnerabilities'])}
         """
+
+def build_messages(scan_result: Dict[str, Any]) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_scan_text(scan_result)}
+    ]
+
+def analysis_fingerprint(scan_result: Dict[str, Any]) -> str:
+    """
+    Cache key of an analysis: the model settings, the system prompt, the language and the
+    normalized findings (prompt_findings), i.e. everything the prompt is built from. The
+    file name is not part of it, so files with the same findings share one analysis.
+    """
+    prompt = {
+        "model": DEFAULT_MODEL,
+        "temperature": DEFAULT_TEMPERATURE,
+        "max_tokens": DEFAULT_MAX_TOKENS,
+        "system": SYSTEM_PROMPT,
+        "language": scan_result["language"],
+        "findings": prompt_findings(scan_result["vulnerabilities"]),
+    }
+    digest = hashlib.sha256(json.dumps(prompt, sort_keys=True).encode("utf-8", "surrogatepass")).hexdigest()
+    return f"ai:{digest}"
+
+def for_file(summary: Dict[str, Any], filename: str) -> Dict[str, Any]:
+    """The analysis as returned for `filename`; errors and fallbacks are returned as they are."""
+    if summary.get("error") or summary.get("model_used") == AI_UNAVAILABLE["model_used"]:
+        return dict(summary)
+    return {**summary, "ai_analysis": ANALYSIS_HEADER.format(filename=filename) + summary["ai_analysis"]}
+
+class LocalAnalysisCache:
+    """In-process LRU of analyses with a time to live (seconds)."""
+
+    def __init__(self, max_entries: int = AI_CACHE_MAX_ENTRIES, ttl: float = AI_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class RedisAnalysisCache:
+    """
+    Analyses shared by all server processes; Redis expires them after `ttl` seconds.
+    Entries are shared by all users: an analysis is built only from rule findings (no code,
+    no file name), so it reveals nothing to a user who gets the same findings.
+    """
+
+    def __init__(self, client, ttl: int = AI_CACHE_TTL, prefix: str = "nuvai:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = self.client.get(self.prefix + key)
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning(f"AI analysis cache read failed: {e}")
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        try:
+            self.client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"AI analysis cache write failed: {e}")
+
+def remember_analysis(cache, key: str, summary: Dict[str, Any]) -> None:
+    # Errors and fallbacks are not cached, so the next request retries them.
+    if cache is not None and not summary.get("error") and summary.get("model_used") != AI_UNAVAILABLE["model_used"]:
+        cache.put(key, {"ai_analysis": summary["ai_analysis"], "model_used": summary["model_used"]})
+
+def cached_analysis(cache, key: str) -> Optional[Dict[str, Any]]:
+    cached = cache.get(key) if cache is not None else None
+    if cached is None:
+        return None
+    metrics.AI_ANALYSES.inc(("cache",))
+    return {"ai_analysis": cached["ai_analysis"], "model_used": cached["model_used"]}
+
+def analyze_scan_results(scan_result: Dict[str, Any], stream: bool = False, ai_client=None, cache=None):
+    """
+    Analyze scan results using OpenAI API.
+    With stream=True, returns a generator of events from stream_scan_results() instead.
+    With a `cache` (LocalAnalysisCache/RedisAnalysisCache), an analysis of the same findings
+    (in any file) is reused instead of requested again.
+    """
+    if stream:
+        return stream_scan_results(scan_result, ai_client, cache)
+    key = analysis_fingerprint(scan_result) if cache is not None else None
+    summary = cached_analysis(cache, key)
+    if summary is None:
+        summary = request_analysis(scan_result, ai_client)
+        remember_analysis(cache, key, summary)
+    return for_file(summary, scan_result["filename"])
+
+def request_analysis(scan_result: Dict[str, Any], ai_client=None) -> Dict[str, Any]:
+    metrics.AI_ANALYSES.inc(("single",))
+    try:
+        messages = build_messages(scan_result)
         # return demo_object
         model_to_use = DEFAULT_MODEL
         logger.debug(f"Attempting to use model: {model_to_use}")
 
         logger.debug(f"Making API call with model {model_to_use}")
-        response = client.chat.completions.create(
+        response = (ai_client or client).chat.completions.create(
             model=model_to_use,
             temperature=DEFAULT_TEMPERATURE,
             max_tokens=DEFAULT_MAX_TOKENS,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": scan_text}
-            ]
+            messages=messages
         )
   
         ai_analysis = response.choices[0].message.content
@@ -60,6 +201,9 @@ def analyze_scan_results(scan_result: Dict[str, Any]) -> Dict[str, Any]:
             "model_used": model_to_use
         }
 
+    except AIUnavailableError as e:
+        logger.warning(f"AI analysis skipped: {str(e)}")
+        return dict(AI_UNAVAILABLE)
     except Exception as e:
         logger.error(f"Fatal error in analyze_scan_results: {str(e)}")
         return {
@@ -67,16 +211,175 @@ def analyze_scan_results(scan_result: Dict[str, Any]) -> Dict[str, Any]:
             "error": True
         }
 
+def stream_scan_results(scan_result: Dict[str, Any], ai_client=None, cache=None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the analysis as it is generated. Yields {"type": "delta", "text": ...} events,
+    then one final event: {"type": "done", "ai_analysis": <full text>, "model_used": ...}
+    or {"type": "error", "ai_analysis": <message>, "error": True}.
+    The first delta starts with ANALYSIS_HEADER; a cached analysis is yielded as a single delta.
+    """
+    header = ANALYSIS_HEADER.format(filename=scan_result["filename"])
+    key = analysis_fingerprint(scan_result) if cache is not None else None
+    cached = cached_analysis(cache, key)
+    if cached is not None:
+        summary = for_file(cached, scan_result["filename"])
+        yield {"type": "delta", "text": summary["ai_analysis"]}
+        yield {"type": "done", **summary}
+        return
+    metrics.AI_ANALYSES.inc(("single",))
+    model_to_use = DEFAULT_MODEL
+    parts = []
+    stream = None
+    try:
+        logger.debug(f"Making streaming API call with model {model_to_use}")
+        stream = (ai_client or client).chat.completions.create(
+            model=model_to_use,
+            temperature=DEFAULT_TEMPERATURE,
+            max_tokens=DEFAULT_MAX_TOKENS,
+            messages=build_messages(scan_result),
+            stream=True
+        )
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                yield {"type": "delta", "text": text if parts else header + text}
+                parts.append(text)
+    except AIUnavailableError as e:
+        logger.warning(f"AI analysis skipped: {str(e)}")
+        yield {"type": "done", **AI_UNAVAILABLE}
+        return
+    except Exception as e:
+        logger.error(f"Fatal error in stream_scan_results: {str(e)}")
+        yield {"type": "error", "ai_analysis": f"Error performing AI analysis: {str(e)}", "error": True}
+        return
+    finally:
+        # Also when the consumer stops early (e.g. the client disconnected), so the
+        # gateway slot held by the stream is released at once.
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    logger.debug(f"Streamed AI analysis completed using {model_to_use}")
+    summary = {"ai_analysis": "".join(parts), "model_used": model_to_use}
+    remember_analysis(cache, key, summary)
+    yield {"type": "done", **for_file(summary, scan_result["filename"])}
+
+def prompt_findings(vulnerabilities: list) -> List[Dict[str, Any]]:
+    """
+    The fields of each finding the analysis is based on, normalized across finding shapes
+    """
+    return [{
+        "severity": v.get('severity', v.get('level', 'info')).upper(),
+        "finding": v.get('title', v.get('type', 'Unknown Finding')),
+        "description": v.get('description', v.get('message', 'No description provided.')),
+        "line": v.get('line') or None,
+        "recommendation": v.get('recommendation', 'No recommendation available.'),
+    } for v in vulnerabilities]
+
 def format_vulnerabilities(vulnerabilities: list) -> str:
     """
     Format vulnerabilities list for better AI processing
     """
     formatted = []
-    for v in vulnerabilities:
+    for v in prompt_findings(vulnerabilities):
         formatted.append(f"""
-        Severity: {v.get('severity', v.get('level', 'info')).upper()}
-        Finding: {v.get('title', v.get('type', 'Unknown Finding'))}
-        Description: {v.get('description', v.get('message', 'No description provided.'))}
-        Recommendation: {v.get('recommendation', 'No recommendation available.')}
+        Severity: {v['severity']}
+        Finding: {v['finding']}
+        Description: {v['description']}
+        Location: {f"line {v['line']}" if v['line'] else 'file-level'}
+        Recommendation: {v['recommendation']}
         """)
     return "\n".join(formatted)
+
+def plan_batches(scan_results: List[Dict[str, Any]], max_files: int = BATCH_MAX_FILES) -> List[List[int]]:
+    """Indices of `scan_results` grouped into requests: small files together, large ones alone."""
+    batches, current, size = [], [], 0
+    for index, scan_result in enumerate(scan_results):
+        length = len(build_scan_text(scan_result))
+        if length > BATCH_FILE_MAX_CHARS or max_files <= 1:
+            batches.append([index])
+            continue
+        if current and (len(current) >= max_files or size + length > BATCH_FILE_MAX_CHARS * max_files // 2):
+            batches.append(current)
+            current, size = [], 0
+        current.append(index)
+        size += length
+    if current:
+        batches.append(current)
+    return batches
+
+def request_batch_analysis(scan_results: List[Dict[str, Any]], ai_client=None) -> List[Optional[Dict[str, Any]]]:
+    """
+    One request for several files, answered as JSON with one analysis per file. Files the
+    answer leaves out (or all of them, if it is unusable) come back as None; all of them get
+    the AI_UNAVAILABLE fallback if the gateway rejects the request.
+    """
+    if len(scan_results) == 1:
+        return [request_analysis(scan_results[0], ai_client)]
+    metrics.AI_ANALYSES.inc(("batched",), len(scan_results))
+    model_to_use = DEFAULT_MODEL
+    analyses = {}
+    try:
+        content = "\n\n".join(f"### File {i}\n{build_scan_text(r)}" for i, r in enumerate(scan_results, start=1))
+        logger.debug(f"Making batched API call for {len(scan_results)} files with model {model_to_use}")
+        response = (ai_client or client).chat.completions.create(
+            model=model_to_use,
+            temperature=DEFAULT_TEMPERATURE,
+            max_tokens=min(BATCH_MAX_TOKENS, DEFAULT_MAX_TOKENS * len(scan_results)),
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": content}
+            ]
+        )
+        for entry in json.loads(response.choices[0].message.content).get("files", []):
+            if isinstance(entry, dict) and isinstance(entry.get("analysis"), str) and entry["analysis"].strip():
+                analyses[str(entry.get("id"))] = entry["analysis"]
+    except AIUnavailableError as e:
+        logger.warning(f"AI analysis skipped: {str(e)}")
+        return [dict(AI_UNAVAILABLE) for _ in scan_results]
+    except Exception as e:
+        logger.error(f"Batched AI analysis failed, analyzing files one by one: {str(e)}")
+    return [{"ai_analysis": analyses[str(i)], "model_used": model_to_use} if str(i) in analyses else None
+            for i in range(1, len(scan_results) + 1)]
+
+def analyze_many(scan_results: List[Dict[str, Any]], ai_client=None, cache=None, executor=None,
+                 max_batch_files: int = BATCH_MAX_FILES) -> List[Dict[str, Any]]:
+    """
+    Analyze several files with as few requests as possible: cached analyses are reused,
+    files with the same findings are analyzed once, and small files are batched into one
+    request (plan_batches); files a batched answer misses get a request of their own.
+    Requests run on `executor` when given. Returns one summary per scan result, in order,
+    shaped like analyze_scan_results().
+    """
+    summaries = [None] * len(scan_results)
+    groups = {}
+    for index, scan_result in enumerate(scan_results):
+        key = analysis_fingerprint(scan_result)
+        cached = cached_analysis(cache, key)
+        if cached is not None:
+            summaries[index] = for_file(cached, scan_result["filename"])
+        else:
+            groups.setdefault(key, []).append(index)
+
+    keys = list(groups)
+    unique = [scan_results[groups[key][0]] for key in keys]
+    results = [None] * len(unique)
+    run = executor.map if executor is not None else map
+    batches = plan_batches(unique, max_batch_files)
+    for batch, answers in zip(batches, run(lambda batch: request_batch_analysis([unique[i] for i in batch], ai_client), batches)):
+        for i, summary in zip(batch, answers):
+            results[i] = summary
+    missing = [i for i, summary in enumerate(results) if summary is None]
+    for i, summary in zip(missing, run(lambda i: request_analysis(unique[i], ai_client), missing)):
+        results[i] = summary
+
+    for i, summary in enumerate(results):
+        remember_analysis(cache, keys[i], summary)
+        first, *duplicates = groups[keys[i]]
+        if duplicates:
+            metrics.AI_ANALYSES.inc(("deduplicated",), len(duplicates))
+        for index in (first, *duplicates):
+            summaries[index] = for_file(summary, scan_results[index]["filename"])
+    return summaries
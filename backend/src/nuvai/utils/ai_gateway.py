@@ -0,0 +1,272 @@
+"""
+File: ai_gateway.py
+
+Description:
+Guard around the OpenAI client used by ai_analyzer.py, so a slow or failing API cannot tie
+up every server worker. AIGateway exposes the same `chat.completions.create(...)` call as
+the client it wraps and adds:
+
+- a concurrency limit: at most `max_concurrency` requests (streams included, until they are
+  consumed or closed) are in flight; callers wait for a slot only until their deadline;
+- a deadline per call (`timeout` seconds) covering waiting, all attempts and backoff; each
+  attempt is given the remaining time as its request timeout, and a stream is closed with
+  TimeoutError once it is read past the deadline;
+- retries of transient errors (timeouts, connection errors, rate limits, 5xx) with full
+  jitter exponential backoff;
+- a circuit breaker: after `failure_threshold` consecutive failed calls, calls are rejected
+  at once with CircuitOpenError for `reset_timeout` seconds; then one trial call is let
+  through, which closes the circuit on success or opens it again on failure.
+
+Rejections (open circuit, no free slot before the deadline) raise AIUnavailableError
+subclasses, which ai_analyzer turns into the "AI analysis not available" fallback. Only
+errors and timeouts of requests actually sent count against the circuit breaker; a
+deadline used up while waiting for a slot does not. Every
+call is recorded in the nuvai_ai_* metrics (metrics.py). The wrapped client should not
+retry on its own (OpenAI(max_retries=0)). FakeOpenAIClient (fake_openai.py) honours the
+request timeout and can fail its first calls, to exercise the gateway offline.
+"""
+
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+
+import openai
+
+from src.nuvai import metrics
+from src.nuvai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+TRANSIENT_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    TimeoutError,
+    ConnectionError,
+)
+
+
+class AIUnavailableError(Exception):
+    """The call was not made; the AI analysis should fall back instead of failing."""
+
+
+class CircuitOpenError(AIUnavailableError):
+    pass
+
+
+class GatewayBusyError(AIUnavailableError):
+    pass
+
+
+def failure_outcome(error: BaseException) -> str:
+    return "timeout" if isinstance(error, (openai.APITimeoutError, TimeoutError)) else "error"
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker; `clock` is injectable for tests."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._trial_running = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self._opened_at = self.clock()
+                self._transition(OPEN)
+
+    def release(self) -> None:
+        """End a call that neither succeeded nor failed (e.g. a rejected request)."""
+        with self._lock:
+            self._trial_running = False
+
+    def _transition(self, state: str) -> None:
+        logger.warning(f"AI circuit breaker {self.state} -> {state}")
+        self.state = state
+        metrics.AI_CIRCUIT_TRANSITIONS.inc((state,))
+
+
+class AIGateway:
+    def __init__(self, client, max_concurrency: int = 4, timeout: float = 30.0, max_retries: int = 2,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0, breaker: Optional[CircuitBreaker] = None):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.in_flight = 0
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs) -> Any:
+        """chat.completions.create() of the wrapped client, within the gateway's limits."""
+        started = time.monotonic()
+        deadline = started + kwargs.pop("timeout", self.timeout)
+        if not self.breaker.allow():
+            self._record("rejected", started)
+            raise CircuitOpenError("AI circuit breaker is open")
+        acquired = self._slots.acquire(timeout=max(0.0, deadline - time.monotonic()))
+        if acquired and time.monotonic() >= deadline:
+            # No time left for a request: local queueing, not an upstream failure.
+            self._slots.release()
+            acquired = False
+        if not acquired:
+            self.breaker.release()
+            self._record("busy", started)
+            raise GatewayBusyError(f"No free AI request slot within {self.timeout:g}s")
+        with self._lock:
+            self.in_flight += 1
+        try:
+            response = self._call_with_retries(kwargs, deadline, started)
+        except BaseException:
+            self._release_slot()
+            raise
+        if kwargs.get("stream"):
+            return GuardedStream(self, response, started, deadline)
+        self._release_slot()
+        self.breaker.record_success()
+        self._record("success", started)
+        return response
+
+    def _call_with_retries(self, kwargs, deadline: float, started: float) -> Any:
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and attempt == 0:
+                self.breaker.release()
+                self._record("busy", started)
+                raise GatewayBusyError(f"No time left for an AI request within {self.timeout:g}s")
+            try:
+                if remaining <= 0:
+                    raise TimeoutError("AI request deadline exceeded")
+                return self.client.chat.completions.create(timeout=remaining, **kwargs)
+            except TRANSIENT_ERRORS as e:
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    self.breaker.record_failure()
+                    self._record(failure_outcome(e), started)
+                    raise
+                attempt += 1
+                metrics.AI_RETRIES.inc()
+                logger.debug(f"Retrying AI request ({attempt}/{self.max_retries}) in {delay:.2f}s after: {e}")
+                time.sleep(delay)
+            except Exception:
+                # Not the API being unavailable (e.g. an invalid request): no retry, and
+                # the circuit stays as it is.
+                self.breaker.release()
+                self._record("error", started)
+                raise
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def _record(self, outcome: str, started: float) -> None:
+        metrics.AI_REQUESTS.inc((outcome,))
+        metrics.AI_REQUEST_DURATION.observe(time.monotonic() - started, (outcome,))
+
+
+class GuardedStream:
+    """
+    A streamed response holding a gateway slot until it is consumed, fails, runs past the
+    call's deadline, or is closed. Readers that may stop early must close it (close() or a
+    `with` block) to free the slot.
+    """
+
+    def __init__(self, gateway: AIGateway, chunks, started: float, deadline: float):
+        self.gateway = gateway
+        self.chunks = iter(chunks)
+        self.started = started
+        self.deadline = deadline
+        self.done = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.done:
+            raise StopIteration
+        if time.monotonic() >= self.deadline:
+            self._close_chunks()
+            self._finish("timeout", failed=True)
+            raise TimeoutError("AI stream deadline exceeded")
+        try:
+            return next(self.chunks)
+        except StopIteration:
+            self._finish("success")
+            raise
+        except TRANSIENT_ERRORS as e:
+            self._finish(failure_outcome(e), failed=True)
+            raise
+        except Exception:
+            self._finish("error")
+            raise
+
+    def close(self) -> None:
+        if not self.done:
+            try:
+                self._close_chunks()
+            finally:
+                self._finish("cancelled")
+
+    def _close_chunks(self) -> None:
+        close = getattr(self.chunks, "close", None)
+        if close is not None:
+            close()
+
+    def _finish(self, outcome: str, failed: bool = False) -> None:
+        if self.done:
+            return
+        self.done = True
+        self.gateway._release_slot()
+        breaker = self.gateway.breaker
+        if outcome == "success":
+            breaker.record_success()
+        elif failed:
+            breaker.record_failure()
+        else:
+            breaker.release()
+        self.gateway._record(outcome, self.started)
@@ -0,0 +1,59 @@
+"""
+File: fake_openai.py
+
+Description:
+Offline stand-in for the OpenAI client used by ai_analyzer.py. It exposes the same
+`client.chat.completions.create(...)` call and returns either a regular completion or, with
+stream=True, an iterator of chunks shaped like the real streaming API (content arrives in
+`choices[0].delta.content`, and the last chunk carries no content). `delay` simulates model
+latency: once per regular completion, or before every streamed chunk. `response` may also be
+a function of the request messages returning the reply text (e.g. to answer batched requests).
+A request `timeout` shorter than `delay` ends in TimeoutError after `timeout` seconds, as
+a timed out request of the real client would. With `fail_first`, only the first that many calls raise `error`, so
+retries and recovery can be exercised (ai_gateway.py). Used by tests and for local
+development without an API key.
+"""
+
+import time
+from types import SimpleNamespace
+
+DEFAULT_FAKE_ANALYSIS = (
+    "Summary: the scan reported issues that should be reviewed.\n"
+    "Risk: medium.\n"
+    "Recommendations: validate user input and remove hardcoded secrets."
+)
+
+
+class FakeOpenAIClient:
+    def __init__(self, response=DEFAULT_FAKE_ANALYSIS, chunk_size=16, delay=0.0, error=None, fail_first=None):
+        self.response = response
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.error = error
+        self.fail_first = fail_first
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, stream=False, **kwargs):
+        self.calls.append({"model": model, "messages": messages, "stream": stream, **kwargs})
+        if self.error is not None and (self.fail_first is None or len(self.calls) <= self.fail_first):
+            raise self.error
+        timeout = kwargs.get("timeout")
+        if timeout is not None and self.delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Request timed out after {timeout:g}s")
+        text = self.response(messages) if callable(self.response) else self.response
+        if stream:
+            return self._stream(text)
+        if self.delay:
+            time.sleep(self.delay)
+        message = SimpleNamespace(role="assistant", content=text)
+        return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")])
+
+    def _stream(self, text):
+        for start in range(0, len(text), self.chunk_size):
+            if self.delay:
+                time.sleep(self.delay)
+            delta = SimpleNamespace(content=text[start:start + self.chunk_size])
+            yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)])
+        yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=None), finish_reason="stop")])
@@ -0,0 +1,19 @@
+# File: upload_reader.py
+
+import io
+from typing import BinaryIO
+
+
+def read_upload_text(stream: BinaryIO) -> str:
+    """
+    Decode an uploaded file (werkzeug FileStorage.stream) as UTF-8 text.
+    - Decoded straight from the stream; werkzeug already spools large uploads to disk
+    - Same decoding as open(path, "r", encoding="utf-8"), including newline translation
+    - Raises UnicodeDecodeError for non UTF-8 content
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8")
+    try:
+        return text.read()
+    finally:
+        # The stream stays open; werkzeug closes it with the request.
+        text.detach()
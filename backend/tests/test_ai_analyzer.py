@@ -0,0 +1,91 @@
+# file: test_ai_analyzer.py
+
+import json
+import re
+
+from src.nuvai.utils.ai_analyzer import LocalAnalysisCache, RedisAnalysisCache, analyze_many, analyze_scan_results
+from src.nuvai.utils.fake_openai import FakeOpenAIClient
+
+SCAN_RESULT = {
+    "filename": "app.py",
+    "language": "python",
+    "vulnerabilities": [{"level": "HIGH", "type": "Test", "message": "msg", "recommendation": "rec"}]
+}
+
+
+def test_analyze_scan_results_with_fake_client():
+    fake = FakeOpenAIClient(response="All good.")
+    result = analyze_scan_results(SCAN_RESULT, ai_client=fake)
+    assert result["ai_analysis"] == "File: app.py\n\nAll good."
+    assert "app.py" not in fake.calls[0]["messages"][1]["content"]
+
+
+def test_streamed_analysis_yields_deltas_then_done():
+    fake = FakeOpenAIClient(response="abcdefghij", chunk_size=3)
+    events = list(analyze_scan_results(SCAN_RESULT, stream=True, ai_client=fake))
+    assert [e["text"] for e in events[:-1]] == ["File: app.py\n\nabc", "def", "ghi", "j"]
+    assert events[-1] == {"type": "done", "ai_analysis": "File: app.py\n\nabcdefghij", "model_used": fake.calls[0]["model"]}
+
+
+def test_streamed_analysis_reports_errors():
+    events = list(analyze_scan_results(SCAN_RESULT, stream=True, ai_client=FakeOpenAIClient(error=RuntimeError("boom"))))
+    assert events[-1]["type"] == "error"
+    assert "boom" in events[-1]["ai_analysis"]
+
+
+def with_vulnerability(filename, finding_type):
+    vulnerability = {"level": "HIGH", "type": finding_type, "message": "msg", "recommendation": "rec"}
+    return {"filename": filename, "language": "python", "vulnerabilities": [vulnerability]}
+
+
+def batch_answer(messages):
+    files = re.findall(r"### File (\d+)\n.*?Finding: (\S+)", messages[1]["content"], re.DOTALL)
+    return json.dumps({"files": [{"id": i, "analysis": f"Fix {finding}."} for i, finding in files]})
+
+
+def test_files_with_the_same_findings_share_one_analysis():
+    fake = FakeOpenAIClient(response="Fix the file first.")
+    cache = LocalAnalysisCache()
+    analyze_scan_results(SCAN_RESULT, ai_client=fake, cache=cache)
+    other = analyze_scan_results({**SCAN_RESULT, "filename": "data.py"}, ai_client=fake, cache=cache)
+    events = list(analyze_scan_results(SCAN_RESULT, stream=True, ai_client=fake, cache=cache))
+    assert len(fake.calls) == 1
+    assert other == {"ai_analysis": "File: data.py\n\nFix the file first.", "model_used": fake.calls[0]["model"]}
+    assert events[-1]["ai_analysis"] == "File: app.py\n\nFix the file first."
+    # Different findings are analyzed on their own.
+    analyze_scan_results(with_vulnerability("data.py", "Eval"), ai_client=fake, cache=cache)
+    assert len(fake.calls) == 2
+
+
+def test_analyze_many_deduplicates_and_batches():
+    fake = FakeOpenAIClient(response=batch_answer)
+    scans = [with_vulnerability("a.py", "Eval"), with_vulnerability("b.py", "Eval"), with_vulnerability("c.py", "Secret")]
+    summaries = analyze_many(scans, ai_client=fake, cache=LocalAnalysisCache())
+    assert len(fake.calls) == 1
+    assert fake.calls[0]["response_format"] == {"type": "json_object"}
+    assert fake.calls[0]["messages"][1]["content"].count("### File") == 2
+    assert [s["ai_analysis"] for s in summaries] == ["File: a.py\n\nFix Eval.", "File: b.py\n\nFix Eval.", "File: c.py\n\nFix Secret."]
+
+
+def test_analyze_many_falls_back_to_single_requests():
+    fake = FakeOpenAIClient(response=lambda messages: "not json" if "### File" in messages[1]["content"] else "Single.")
+    summaries = analyze_many([with_vulnerability("a.py", "Eval"), with_vulnerability("b.py", "Secret")], ai_client=fake)
+    assert len(fake.calls) == 3
+    assert [s["ai_analysis"] for s in summaries] == ["File: a.py\n\nSingle.", "File: b.py\n\nSingle."]
+
+
+class DictRedis(dict):
+    def set(self, key, value, ex=None):
+        self[key] = value
+
+
+def test_shared_redis_cache_stores_neither_code_nor_file_names():
+    redis = DictRedis()
+    fake = FakeOpenAIClient(response="Analysis.")
+    for filename in ("alice_app.py", "bob_app.py"):
+        scan = {**SCAN_RESULT, "filename": filename,
+                "vulnerabilities": [{**SCAN_RESULT["vulnerabilities"][0], "line": 3, "snippet": f"token = '{filename}'"}]}
+        analyze_scan_results(scan, ai_client=fake, cache=RedisAnalysisCache(redis))
+    assert len(fake.calls) == 1
+    assert "_app.py" not in fake.calls[0]["messages"][1]["content"]
+    assert len(redis) == 1 and "_app.py" not in next(iter(redis.values()))
@@ -0,0 +1,100 @@
+# file: test_ai_gateway.py
+
+import threading
+import time
+import pytest
+from src.nuvai import metrics
+from src.nuvai.utils.ai_analyzer import AI_UNAVAILABLE, analyze_scan_results
+from src.nuvai.utils.ai_gateway import AIGateway, CircuitBreaker, GatewayBusyError
+from src.nuvai.utils.fake_openai import FakeOpenAIClient
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+SCAN_RESULT = {
+    "filename": "app.py",
+    "language": "python",
+    "vulnerabilities": [{"level": "HIGH", "type": "Test", "message": "msg", "recommendation": "rec"}]
+}
+
+
+def test_transient_errors_are_retried():
+    fake = FakeOpenAIClient(response="Recovered.", error=ConnectionError("reset"), fail_first=2)
+    gateway = AIGateway(fake, max_retries=2, backoff_base=0.001)
+    retries = metrics.AI_RETRIES.value()
+    response = gateway.chat.completions.create(model="m", messages=MESSAGES)
+    assert response.choices[0].message.content == "Recovered."
+    assert len(fake.calls) == 3
+    assert metrics.AI_RETRIES.value() == retries + 2
+
+
+def test_call_deadline_covers_all_attempts():
+    gateway = AIGateway(FakeOpenAIClient(delay=5.0), timeout=0.2, max_retries=3, backoff_base=0.001)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        gateway.chat.completions.create(model="m", messages=MESSAGES)
+    assert time.monotonic() - start < 1.0
+
+
+def test_deadline_spent_waiting_for_a_slot_is_not_a_failure():
+    class LateSlots:
+        # A slot freed only once the caller's deadline has passed.
+        def acquire(self, timeout):
+            time.sleep(timeout + 0.01)
+            return True
+
+        def release(self):
+            pass
+
+    fake = FakeOpenAIClient()
+    gateway = AIGateway(fake, timeout=0.05, breaker=CircuitBreaker(failure_threshold=1))
+    gateway._slots = LateSlots()
+    with pytest.raises(GatewayBusyError):
+        gateway.chat.completions.create(model="m", messages=MESSAGES)
+    assert fake.calls == [] and gateway.in_flight == 0
+    assert gateway.breaker.failures == 0 and gateway.breaker.state == "closed"
+
+
+def test_open_circuit_serves_fallback_until_trial_succeeds():
+    now = [0.0]
+    fake = FakeOpenAIClient(response="Back.", error=ConnectionError("down"), fail_first=2)
+    gateway = AIGateway(fake, max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0]))
+    for _ in range(2):
+        assert analyze_scan_results(SCAN_RESULT, ai_client=gateway)["error"]
+    assert gateway.breaker.state == "open"
+
+    assert analyze_scan_results(SCAN_RESULT, ai_client=gateway) == AI_UNAVAILABLE
+    assert list(analyze_scan_results(SCAN_RESULT, stream=True, ai_client=gateway)) == [{"type": "done", **AI_UNAVAILABLE}]
+    assert len(fake.calls) == 2
+
+    now[0] = 11.0
+    assert analyze_scan_results(SCAN_RESULT, ai_client=gateway)["ai_analysis"] == "File: app.py\n\nBack."
+    assert gateway.breaker.state == "closed"
+
+
+def test_concurrency_limit_holds_slots_for_streams():
+    gateway = AIGateway(FakeOpenAIClient(delay=0.3), max_concurrency=1, timeout=0.1)
+    slow = threading.Thread(target=gateway.chat.completions.create, kwargs={"model": "m", "messages": MESSAGES, "timeout": 1.0})
+    slow.start()
+    time.sleep(0.05)
+    with pytest.raises(GatewayBusyError):
+        gateway.chat.completions.create(model="m", messages=MESSAGES)
+    slow.join()
+
+    stream = AIGateway(FakeOpenAIClient(response="abc", chunk_size=1), max_concurrency=1)
+    chunks = stream.chat.completions.create(model="m", messages=MESSAGES, stream=True)
+    assert stream.in_flight == 1
+    assert "".join(c.choices[0].delta.content or "" for c in chunks) == "abc"
+    assert stream.in_flight == 0
+
+
+def test_stream_is_closed_at_the_deadline():
+    gateway = AIGateway(FakeOpenAIClient(response="abcdef", chunk_size=1, delay=0.1), timeout=0.25)
+    chunks = gateway.chat.completions.create(model="m", messages=MESSAGES, stream=True)
+    with pytest.raises(TimeoutError):
+        for _ in chunks:
+            pass
+    assert gateway.in_flight == 0
+    assert gateway.breaker.failures == 1
+
+    with gateway.chat.completions.create(model="m", messages=MESSAGES, stream=True) as stream:
+        next(stream)
+    assert gateway.in_flight == 0
@@ -0,0 +1,40 @@
+# file: test_bench_corpus.py
+
+import ast
+
+from benchmarks.bench_suite import compare, percentile, run_suite
+from benchmarks.corpus import generate, parse_size
+from src.nuvai.scanner import scan_code
+
+
+def occurrences(code, language):
+    return sum(len(finding.get("occurrences", ())) for finding in scan_code(code, language))
+
+
+def test_generate_is_deterministic_and_sized():
+    first = generate("javascript", parse_size("8KB"), density=0.2, seed=1)
+    assert first == generate("javascript", 8192, density=0.2, seed=1)
+    assert first != generate("javascript", 8192, density=0.2, seed=2)
+    assert len(first) >= 8192
+
+
+def test_density_controls_findings():
+    clean = generate("php", 16384, density=0.0)
+    dense = generate("php", 16384, density=0.5)
+    assert occurrences(clean, "php") == 0
+    assert occurrences(dense, "php") > 0
+
+
+def test_python_corpus_parses():
+    ast.parse(generate("python", 32768, density=0.3))
+
+
+def test_suite_smoke_and_comparison():
+    results = run_suite(["cpp"], [1024], [0.1], min_runs=2, min_time=0.0)
+    assert set(results) == {"scanner/cpp/1KB/0.1", "scan_code/cpp/1KB/0.1"}
+    assert all(result["runs"] == 2 and result["mb_per_second"] > 0 for result in results.values())
+
+    slower = {key: dict(result, p50_ms=result["p50_ms"] * 2) for key, result in results.items()}
+    rows, regressions = compare(slower, results, threshold=0.25)
+    assert len(rows) == 2 and len(regressions) == 2
+    assert percentile([3, 1, 2, 4], 0.5) == 2 and percentile([3, 1, 2, 4], 0.99) == 4
@@ -0,0 +1,54 @@
+# file: test_columnar_report.py
+
+import json
+
+import pytest
+
+from src.nuvai.columnar_report import ColumnarReport, ColumnarReportError, columnar_to_json, json_to_columnar
+from src.nuvai.report_saver import open_report
+from src.nuvai.scanner import scan_code
+
+SOURCES = {
+    "app.py": ("import os\npassword = 'hunter22'\nos.system(cmd)\nos.system(other)\n# TODO: fix\n", "python"),
+    "page.js": ("eval(userInput);\nconsole.log(token);\n", "javascript"),
+    "clean.cpp": ("int add(int a, int b) { return a + b; }\n", "cpp"),
+}
+
+
+@pytest.fixture
+def scanned():
+    return {path: scan_code(code, language) for path, (code, language) in SOURCES.items()}
+
+
+def test_round_trip_through_json(tmp_path, scanned):
+    findings = [dict(fnd, file=path) for path, file_findings in scanned.items() for fnd in file_findings]
+    findings.append({"level": "ERROR", "type": "Odd", "message": "m", "recommendation": "r", "line": None,
+                     "occurrences": [{"line": 1}], "ai_summary": {"score": 3}})
+    (tmp_path / "report.json").write_text(json.dumps(findings), encoding="utf-8")
+
+    assert json_to_columnar(str(tmp_path / "report.json"), str(tmp_path / "report.nvr")) == len(findings)
+    columnar_to_json(str(tmp_path / "report.nvr"), str(tmp_path / "back.json"))
+    assert json.loads((tmp_path / "back.json").read_text(encoding="utf-8")) == findings
+
+
+def test_filters_read_columns(tmp_path, scanned):
+    with open_report("nvr", str(tmp_path / "report.nvr")) as writer:
+        for path, file_findings in scanned.items():
+            writer.write_all(file_findings, path)
+
+    with ColumnarReport(str(tmp_path / "report.nvr")) as report:
+        everything = list(report)
+        assert len(report) == len(everything) == sum(len(f) for f in scanned.values())
+        critical = list(report.select(min_level="CRITICAL"))
+        assert critical and all(fnd["level"] == "CRITICAL" for fnd in critical)
+        assert {fnd["file"] for fnd in critical} == {"app.py", "page.js"}
+        secrets = list(report.select(types=["Hardcoded Secrets"], files=["app.py"]))
+        assert [fnd["line"] for fnd in secrets] == [2]
+        assert list(report.indices(levels=["TIP"], files=["clean.cpp"])) == []
+        assert report.level_counts()["TIP"] == 2
+
+
+def test_rejects_other_files(tmp_path):
+    (tmp_path / "report.json").write_text("[]", encoding="utf-8")
+    with pytest.raises(ColumnarReportError):
+        ColumnarReport(str(tmp_path / "report.json"))
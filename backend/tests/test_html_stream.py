@@ -0,0 +1,87 @@
+# file: test_html_stream.py
+
+import time
+from src.nuvai import html_scanner
+from src.nuvai.html_scanner import HTML_RULES, HTMLRegexScanner, HTMLScanner
+from src.nuvai.html_stream_engine import HtmlStreamScanner, scan_html_chunks
+from src.nuvai.line_index import MAX_SNIPPET_LENGTH
+
+PAGE = """<html>
+<head><meta http-equiv="Content-Security-Policy" content="default-src 'self'"></head>
+<body>
+  <form action="/login" method="POST" enctype="multipart/form-data">
+    <input type="hidden" name="csrf_token" value="abc">
+    <input type="password" name="pw" autocomplete="off">
+  </form>
+  <form action="/search" method="get" enctype="text/plain">
+    <input type="password" name="pin">
+  </form>
+</body>
+</html>
+"""
+
+
+def located(findings):
+    return {(f["type"], f.get("line"), f.get("column")) for f in findings}
+
+
+def test_tag_rules_are_scoped_to_their_element():
+    findings = HTMLScanner(PAGE).run_all_checks()
+    assert located(findings) == {
+        ("Missing CSRF Token", 8, 3),
+        ("Password Autocomplete Enabled", 9, 5),
+    }
+    # The regex rules see "csrf" and autocomplete="off" elsewhere in the file and stay silent.
+    assert not any(f["type"] in ("Missing CSRF Token", "Password Autocomplete Enabled")
+                   for f in HTMLRegexScanner(PAGE).run_all_checks())
+
+
+def test_chunked_input_gives_the_same_findings():
+    whole = HTMLScanner(PAGE).run_all_checks()
+    for size in (1, 7, 64):
+        chunks = [PAGE[i:i + size] for i in range(0, len(PAGE), size)]
+        assert scan_html_chunks(chunks, HTML_RULES) == whole
+
+    # Text split across chunks is matched as one text node.
+    page = "<p>\n  contact admin@example.com</p>"
+    whole = HTMLScanner(page).run_all_checks()
+    for size in range(1, len(page)):
+        assert scan_html_chunks([page[i:i + size] for i in range(0, len(page), size)], HTML_RULES) == whole
+
+
+def test_scanner_feeds_large_documents_in_chunks(monkeypatch):
+    fed = []
+    feed = HtmlStreamScanner.feed
+    monkeypatch.setattr(HtmlStreamScanner, "feed", lambda self, data: fed.append(data) or feed(self, data))
+    whole = HTMLScanner(PAGE).run_all_checks()
+    assert fed == [PAGE]
+    monkeypatch.setattr(html_scanner, "HTML_CHUNK_SIZE", 50)
+    fed.clear()
+    assert HTMLScanner(PAGE).run_all_checks() == whole
+    assert len(fed) == -(-len(PAGE) // 50) and max(map(len, fed)) == 50
+
+
+def test_text_rules_and_snippets():
+    code = "<p>\n  contact admin@example.com</p><!-- TODO: remove -->"
+    findings = {f["type"]: f for f in HTMLScanner(code).run_all_checks()}
+    leak = findings["Sensitive Information Leak"]
+    assert (leak["line"], leak["column"], leak["snippet"]) == (2, 11, "contact admin@example.com")
+    assert findings["Suspicious HTML Comment"]["snippet"] == "<!-- TODO: remove -->"
+
+
+def test_attribute_value_matches_point_at_the_value():
+    code = '<p>hi</p>\n<a title="x"\n   href="mailto:admin@example.com">mail</a>'
+    findings = [f for f in HTMLScanner(code).run_all_checks() if f["type"] == "Sensitive Information Leak"]
+    assert {(o["line"], o["column"], o["snippet"]) for f in findings for o in f["occurrences"]} == {
+        (3, 17, "mailto:admin@example.com"),
+    }
+
+
+def test_long_text_nodes_are_scanned_in_linear_time():
+    code = "<p>" + "admin " * 50000 + "\n</p>"
+    start = time.monotonic()
+    leak = next(f for f in HTMLScanner(code).run_all_checks() if f["type"] == "Sensitive Information Leak")
+    assert time.monotonic() - start < 5.0
+    last = leak["occurrences"][-1]
+    assert last["line"] == 1 and last["snippet"].startswith("...") and "admin admin" in last["snippet"]
+    assert len(last["snippet"]) <= MAX_SNIPPET_LENGTH
@@ -0,0 +1,34 @@
+# file: test_incremental.py
+
+import os
+import subprocess
+from src.nuvai.incremental import changed_files, merge_baseline
+
+
+def git(folder, *args):
+    subprocess.run(["git", "-C", str(folder), "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                   check=True, capture_output=True)
+
+
+def test_changed_files_since_ref(tmp_path):
+    (tmp_path / "src").mkdir()
+    for name in ["src/a.py", "src/b.py", "src/c.js", "notes.txt"]:
+        (tmp_path / name).write_text("x = 1\n")
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "init")
+
+    (tmp_path / "src/a.py").write_text("eval(input())\n")
+    os.remove(tmp_path / "src/c.js")
+    (tmp_path / "src/new.ts").write_text("let x: any;\n")
+    (tmp_path / "notes.txt").write_text("changed\n")
+
+    changed = changed_files(str(tmp_path / "src"), "HEAD", [".py", ".js", ".ts"])
+    assert changed == ["a.py", "c.js", "new.ts"]
+
+
+def test_merge_baseline_replaces_and_drops_changed_files():
+    baseline = {"a.py": ["old a"], "b.py": ["b"], "sub/c.js": ["c"]}
+    merged = merge_baseline(baseline, ["a.py", "sub/c.js", "new.py"], {"a.py": ["new a"], "new.py": []})
+    assert merged == {"a.py": ["new a"], "b.py": ["b"], "new.py": []}
+    assert list(merged) == ["a.py", "b.py", "new.py"]
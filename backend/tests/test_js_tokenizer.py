@@ -0,0 +1,46 @@
+# file: test_js_tokenizer.py
+
+from src.nuvai.javascript_scanner import JavaScriptScanner
+from src.nuvai.js_tokenizer import JsTokens
+from src.nuvai.jsx_scanner import JSXScanner
+from src.nuvai.typescript_scanner import TypeScriptScanner
+
+
+def kinds(code, jsx=True):
+    return [(kind, code[start:end]) for start, end, kind in JsTokens(code, jsx).spans()]
+
+
+def types(findings):
+    return {f["type"] for f in findings}
+
+
+def test_tokens_separate_code_from_literals_and_comments():
+    code = "let a = 'x // y'; // eval(x)\nlet r = /a\\/[/]/g; x = a / b / c; t = `n ${`in`} s`;"
+    assert kinds(code) == [
+        ("string", "'x // y'"), ("comment", "// eval(x)"), ("regex", "/a\\/[/]/g"),
+        ("string", "`n "), ("string", "`in`"), ("string", " s`"),
+    ]
+
+
+def test_jsx_text_and_attribute_strings():
+    code = "return <p title=\"a\" onClick={() => go('b')}>Don't {user}</p>;\nif (a < b) c();"
+    assert kinds(code) == [("string", '"a"'), ("string", "'b'"), ("text", "Don't ")]
+
+
+def test_rules_ignore_comments_and_strings():
+    code = "// eval(payload) was removed\nconst help = 'call console.log to debug';\n"
+    assert JavaScriptScanner(code).run_all_checks() == []
+    found = JavaScriptScanner(code + "eval(payload);\n").run_all_checks()
+    assert types(found) == {"Dynamic Code Execution"}
+    assert found[0]["line"] == 3
+
+
+def test_jsx_text_does_not_unbalance_quotes():
+    code = "const A = () => <p>Don't do this</p>;\nconsole.log(A);\n"
+    assert types(JSXScanner(code).run_all_checks()) == {"Debug Code Present"}
+
+
+def test_comment_rules_only_match_comments():
+    code = "const label = '// TODO: password';\n// TODO remove debug password\n"
+    findings = TypeScriptScanner(code).run_all_checks()
+    assert [(f["type"], f["line"]) for f in findings] == [("Sensitive Comment", 2)]
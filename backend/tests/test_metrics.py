@@ -0,0 +1,70 @@
+# file: test_metrics.py
+
+import io
+
+import pytest
+
+from backend.server import app
+from src.nuvai.metrics import MetricsRegistry, instrument_redis
+
+
+@pytest.fixture
+def client():
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Requests.", ("route",))
+    latency = registry.histogram("demo_latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    requests.inc(('/a"b',))
+    requests.inc(('/a"b',), 2)
+    latency.observe(0.05, ("/x",))
+    latency.observe(0.5, ("/x",))
+
+    text = registry.render()
+    assert '# TYPE demo_requests_total counter\ndemo_requests_total{route="/a\\"b"} 3\n' in text
+    assert 'demo_latency_seconds_bucket{route="/x",le="0.1"} 1\n' in text
+    assert 'demo_latency_seconds_bucket{route="/x",le="+Inf"} 2\n' in text
+    assert 'demo_latency_seconds_sum{route="/x"} 0.55\ndemo_latency_seconds_count{route="/x"} 2\n' in text
+
+
+def test_redis_round_trips_are_counted():
+    class FakeRedis:
+        def execute_command(self, *args, **options):
+            if args[0] == "GET":
+                raise ConnectionError("down")
+            return True
+
+        def get(self, key):
+            return self.execute_command("GET", key)
+
+        def pipeline(self):
+            return type("Pipe", (), {"execute": lambda self: [True, True]})()
+
+    counter = MetricsRegistry().counter("round_trips", "Round trips.", ("command", "status"))
+    client = instrument_redis(FakeRedis(), counter)
+    client.execute_command("SET", "k", "v")
+    with pytest.raises(ConnectionError):
+        client.get("k")
+    client.pipeline().execute()
+    assert counter.value(("SET", "ok")) == 1
+    assert counter.value(("GET", "error")) == 1
+    assert counter.value(("PIPELINE", "ok")) == 1
+
+
+def test_metrics_endpoint_reports_requests_and_scans(client):
+    data = {"file": (io.BytesIO(b"eval(input())\n"), "metrics.py")}
+    assert client.post("/scan", content_type="multipart/form-data", data=data).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert 'nuvai_http_requests_total{method="POST",route="/scan",status="200"}' in text
+    assert 'nuvai_scan_phase_duration_seconds_count{phase="scan",language="python"}' in text
+    assert 'nuvai_scan_phase_duration_seconds_count{phase="ai",language="python"}' in text
+    assert 'nuvai_findings_total{severity="critical"}' in text
+    assert 'nuvai_scanned_bytes_total{language="python"}' in text
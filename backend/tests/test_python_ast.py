@@ -0,0 +1,28 @@
+# file: test_python_ast.py
+
+from src.nuvai.python_scanner import PythonRegexScanner, PythonScanner
+
+
+def types(findings):
+    return {f["type"] for f in findings}
+
+
+def test_ssrf_requires_input_to_reach_requests_get():
+    flows = "import requests\nurl = input()\nrequests.get(url)\n"
+    unrelated = "import requests\nname = input()\nrequests.get('https://example.com')\n"
+    assert "Potential SSRF" in types(PythonScanner(flows).run_all_checks())
+    assert "Potential SSRF" not in types(PythonScanner(unrelated).run_all_checks())
+    assert "Potential SSRF" in types(PythonRegexScanner(unrelated).run_all_checks())
+
+
+def test_ast_rules_ignore_comments_and_resolve_imports():
+    code = "# eval(x) is never called here\nfrom os import system as run\nrun('ls')  # TODO remove\n"
+    findings = PythonScanner(code).run_all_checks()
+    assert types(findings) == {"OS Command Injection", "Suspicious Comment"}
+    injection = next(f for f in findings if f["type"] == "OS Command Injection")
+    assert (injection["line"], injection["column"]) == (3, 1)
+
+
+def test_syntax_errors_fall_back_to_regex_rules():
+    code = "print 'python 2'\neval(x)\n"
+    assert PythonScanner(code).run_all_checks() == PythonRegexScanner(code).run_all_checks()
@@ -0,0 +1,50 @@
+# file: test_regex_audit.py
+
+import re
+
+from src.nuvai.html_scanner import HTML_RULES
+from src.nuvai.html_stream_engine import HtmlStreamScanner
+from src.nuvai.matcher import MatchBudget, bounded_finditer
+from src.nuvai.python_scanner import PYTHON_RULES
+from src.nuvai.regex_audit import EXPONENTIAL, POLYNOMIAL, audit_all, audit_pattern
+from src.nuvai.rules import PARTIAL_SCAN_TYPE
+from src.nuvai.scanner import scan_code
+
+
+def test_audit_classifies_patterns():
+    assert audit_pattern(r"(a+)+b").severity == EXPONENTIAL
+    assert audit_pattern(r"(x\w|\wx)*!").severity == EXPONENTIAL
+    assert audit_pattern(r"requests\.get\s*\(.*\)").severity == POLYNOMIAL
+    assert audit_pattern(r"pickle\.loads?\(") is None
+
+
+def test_no_exponential_pattern_ships():
+    assert not [issue.source for issue in audit_all() if issue.severity == EXPONENTIAL]
+
+
+def test_windowed_search_matches_finditer():
+    regex = re.compile(r"<input[^>]*type=\"password\"[^>]*>")
+    code = ('<input name="a" type="password">\n<p>' + "x" * 700 + "</p>\n") * 200
+    assert [m.span() for m in bounded_finditer(regex, code)] == [m.span() for m in regex.finditer(code)]
+
+
+def test_budget_exceeded_reports_partial_scan():
+    regex = re.compile(r"requests\.get\s*\(.*\)")
+    budget = MatchBudget(1e-9)
+    assert list(bounded_finditer(regex, "requests.get(" * 5000, 0, budget)) == []
+    assert budget.exceeded
+
+    findings = PYTHON_RULES.evaluate_hits(PYTHON_RULES.patterns.scan("x = requests.get(" * 5000, budget=1e-9))
+    partial = [f for f in findings if f["type"] == PARTIAL_SCAN_TYPE]
+    assert len(partial) == 1 and "python.ssrf_patterns" in partial[0]["message"]
+
+
+def test_large_inputs_finish():
+    findings = scan_code("x = requests.get(" * 20000, "python")
+    assert all(f["level"] != "ERROR" for f in findings)
+
+    scanner = HtmlStreamScanner(HTML_RULES)
+    scanner.feed("<!--TODO" * 50000)
+    types = {f["type"] for f in scanner.close()}
+    assert "Suspicious HTML Comment" not in types
+    assert PARTIAL_SCAN_TYPE not in types
@@ -0,0 +1,76 @@
+# file: test_report_saver.py
+
+import json
+import os
+
+import pytest
+
+from src.nuvai.incremental import BaselineWriter, load_baseline
+from src.nuvai.report_saver import open_report
+
+FINDINGS = [
+    {"level": "HIGH", "type": "Hardcoded Secrets", "message": "Secret \"é\"", "recommendation": "Use a vault.",
+     "line": 3, "column": 1, "snippet": "key = '<abc>'", "occurrences": [{"line": 3, "column": 1}]},
+    {"level": "TIP", "type": "Security Guidance", "message": "Tips", "recommendation": "- a\n- b"},
+]
+
+
+@pytest.mark.parametrize("findings", [[], FINDINGS])
+def test_streamed_json_matches_json_dump(tmp_path, findings):
+    with open_report("json", str(tmp_path / "report.json")) as report:
+        report.write_all(iter(findings))
+    assert (tmp_path / "report.json").read_text(encoding="utf-8") == json.dumps(findings, indent=4, ensure_ascii=False)
+
+
+def test_jsonl_txt_and_html_writers(tmp_path):
+    for extension in ("jsonl", "txt", "html"):
+        with open_report(extension, str(tmp_path / f"report.{extension}")) as report:
+            for finding in FINDINGS:
+                report.write(finding)
+        assert report.count == 2
+    lines = (tmp_path / "report.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == FINDINGS
+    assert "- Location: line 3, column 1" in (tmp_path / "report.txt").read_text(encoding="utf-8")
+    assert (tmp_path / "report.html").read_text(encoding="utf-8").endswith("</body></html>")
+    assert open_report("docx", str(tmp_path / "report.docx")) is None
+
+
+def test_baseline_writer_streams_and_keeps_old_baseline_on_failure(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    with BaselineWriter(path, str(tmp_path)) as writer:
+        writer.add("a.py", FINDINGS)
+        writer.add("sub/b.js", [])
+    assert load_baseline(path)["files"] == {"a.py": FINDINGS, "sub/b.js": []}
+
+    with pytest.raises(RuntimeError):
+        with BaselineWriter(path, str(tmp_path)) as writer:
+            writer.add("c.py", [])
+            raise RuntimeError("scan failed")
+    assert list(load_baseline(path)["files"]) == ["a.py", "sub/b.js"]
+    assert not (tmp_path / "baseline.json.tmp").exists()
+
+
+def test_sarif_stores_rule_metadata_once(tmp_path):
+    finding = dict(FINDINGS[0], occurrences=[{"line": 3, "column": 1, "snippet": "a"}, {"line": 9, "column": 5, "snippet": "b"}])
+    with open_report("sarif", str(tmp_path / "report.sarif")) as report:
+        for file_path in ("src/a.py", os.path.join("src", "b.py")):
+            report.write_all([finding, FINDINGS[1]], file_path)
+    log = json.loads((tmp_path / "report.sarif").read_text(encoding="utf-8"))
+    run = log["runs"][0]
+    rules = run["tool"]["driver"]["rules"]
+
+    assert log["version"] == "2.1.0"
+    assert [rule["id"] for rule in rules] == ["nuvai/hardcoded-secrets", "nuvai/security-guidance"]
+    assert rules[1]["help"]["text"] == "- a\n- b"
+    assert [location["location"]["uri"] for location in run["artifacts"]] == ["src/a.py", "src/b.py"]
+    assert len(run["results"]) == 4
+    assert all(rules[result["ruleIndex"]]["id"] == result["ruleId"] for result in run["results"])
+    assert rules[0]["messageStrings"] == {"default": {"text": FINDINGS[0]["message"]}}
+    assert [result["message"] for result in run["results"]] == [{"id": "default"}] * 4
+
+    first = run["results"][0]
+    assert first["level"] == "error" and "recommendation" not in json.dumps(first)
+    assert first["locations"][0]["physicalLocation"]["region"] == {"startLine": 3, "startColumn": 1, "snippet": {"text": "a"}}
+    assert first["relatedLocations"][0]["physicalLocation"] == {"artifactLocation": {"index": 0}, "region": {"startLine": 9, "startColumn": 5}}
+    assert run["results"][3]["kind"] == "informational"
+    assert run["results"][3]["locations"][0]["physicalLocation"] == {"artifactLocation": {"uri": "src/b.py", "index": 1}}
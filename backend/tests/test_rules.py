@@ -0,0 +1,99 @@
+# file: test_rules.py
+
+import os
+import re
+import time
+from src.nuvai import scan_code
+from src.nuvai.line_index import MAX_SNIPPET_LENGTH, LineIndex
+from src.nuvai.matcher import extract_literals
+from src.nuvai.rules import Rule, get_rules, registered_languages
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "examples")
+
+
+def test_every_scanner_language_is_registered():
+    for language in ["python", "javascript", "html", "jsx", "php", "cpp", "typescript"]:
+        ruleset = get_rules(language)
+        assert ruleset is not None, language
+        assert len(ruleset) > 0
+        assert all(rule.language == language for rule in ruleset)
+
+
+def test_rule_patterns_are_precompiled():
+    for language in registered_languages():
+        for rule in get_rules(language):
+            assert rule.regex is None or isinstance(rule.regex, re.Pattern)
+            assert all(isinstance(r, re.Pattern) for r in rule.requires + rule.excludes)
+
+
+def test_rule_conditions():
+    rule = Rule("test.cond", "HIGH", "Test", "msg", "rec", r"foo\(", requires=[r"bar"], excludes=[re.compile(r"safe", re.IGNORECASE)])
+    assert rule.matches("foo( bar")
+    assert not rule.matches("foo(")
+    assert not rule.matches("foo( bar SAFE")
+
+
+def test_python_example_findings():
+    with open(os.path.join(EXAMPLES_DIR, "vulnerable_app.py"), encoding="utf-8") as f:
+        findings = scan_code(f.read(), "python")
+    types = [f["type"] for f in findings]
+    assert "Dynamic Code Execution" in types
+    assert "OS Command Injection" in types
+    assert types[-1] == "Security Guidance"
+
+
+def test_shared_patterns_are_searched_once():
+    ruleset = get_rules("html")
+    form_rules = [rule for rule in ruleset if rule.pattern == r'<form[^>]*>']
+    assert len(form_rules) > 1
+    assert len(ruleset.patterns) < sum(1 + len(r.requires) + len(r.excludes) for r in ruleset)
+
+    hits = ruleset.patterns.scan('<form action="/x"></form>')
+    form_index = ruleset.patterns.add(form_rules[0].regex)
+    assert form_index in hits
+    assert hits.evaluated() == {form_index: True}
+
+
+def test_literal_extraction():
+    assert set(extract_literals(re.compile(r'\b(eval|exec)\s*\('))) == {"eval", "exec"}
+    assert extract_literals(re.compile(r'\$_FILES\[.+\]')) == ("$_FILES[",)
+    assert extract_literals(re.compile(r'(fetch|axios)\(\s*\"http:')) == ('"http:',)
+    assert extract_literals(re.compile(r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b')) is None
+
+
+def test_literal_prefilter_skips_absent_keywords():
+    ruleset = get_rules("python")
+    hits = ruleset.patterns.scan("def add(a, b):\n    return a + b\n")
+    assert ruleset.evaluate_hits(hits) == []
+    assert hits.regex_skips > hits.regex_runs
+
+    code = "import pickle\nPICKLE = pickle.loads(data)\n"
+    assert [f["type"] for f in ruleset.evaluate(code)] == ["Insecure Deserialization"]
+
+
+def test_line_index_positions():
+    index = LineIndex("ab\r\ncd\n\nefg", origin=(3, 5))
+    assert index.position(0) == (3, 5)
+    assert index.position(4) == (4, 1)
+    assert index.position(9) == (6, 2)
+    assert index.line_text(1) == "ab"
+    assert index.snippet(10) == "efg"
+
+
+def test_long_lines_are_located_in_bounded_time():
+    code = "console.log(x);" * 130000 + "\n// end"
+    start = time.monotonic()
+    finding = next(f for f in scan_code(code, "javascript") if f["type"] == "Debug Statement Detected")
+    assert time.monotonic() - start < 5.0
+    assert len(finding["occurrences"]) == 130000
+    last = finding["occurrences"][-1]
+    assert (last["line"], last["column"]) == (1, 15 * 129999 + 1)
+    assert last["snippet"].startswith("...") and len(last["snippet"]) <= MAX_SNIPPET_LENGTH
+
+
+def test_findings_report_every_occurrence_with_location():
+    code = "\n\n  x = eval(a)\ny = 1\nz = eval(b); eval(c)\n"
+    finding = next(f for f in scan_code(code, "python") if f["type"] == "Dynamic Code Execution")
+    assert [(o["line"], o["column"]) for o in finding["occurrences"]] == [(3, 7), (5, 5), (5, 14)]
+    assert (finding["line"], finding["column"], finding["snippet"]) == (3, 7, "x = eval(a)")
+    assert finding["occurrences"][1]["snippet"] == "z = eval(b); eval(c)"
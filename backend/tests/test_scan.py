@@ -1,13 +1,20 @@
 # file: test_scan.py
 
+import io
+import json
 import os
+import re
 import tempfile
+import threading
+import time
 import pytest
 from backend.server import app
 
 @pytest.fixture
 def client():
     app.config["TESTING"] = True
+    # Analyses come from the fake clients the tests install, never from a shared cache.
+    app.config["AI_CACHE"] = None
     with app.test_client() as client:
         yield client
 
@@ -41,3 +48,125 @@ def test_scan_valid_python_file(client):
 def test_example():
     print("🔥 Test started")
     assert 1 == 1
+
+def test_async_scan_job(client):
+    data = {"file": (io.BytesIO(b"eval(input())\n"), "job.py")}
+    response = client.post("/scan?async=1", content_type="multipart/form-data", data=data)
+    assert response.status_code == 202
+    status_url = response.json["status_url"]
+
+    deadline = time.time() + 30
+    while True:
+        job = client.get(status_url)
+        if job.status_code == 200 or time.time() > deadline:
+            break
+        assert job.status_code == 202
+        time.sleep(0.05)
+
+    assert job.json["status"] == "done"
+    assert job.json["result"]["filename"] == "job.py"
+    assert any(v["title"] == "Dynamic Code Execution" for v in job.json["result"]["vulnerabilities"])
+    assert client.get("/scan/" + "0" * 32).status_code == 404
+
+def test_async_scan_job_is_only_visible_to_its_owner(client):
+    from src.nuvai.utils.token_utils import generate_jwt
+    (alice, _), (bob, _) = generate_jwt(1, "alice@example.com"), generate_jwt(2, "bob@example.com")
+    client.set_cookie(app.config["JWT_ACCESS_COOKIE_NAME"], alice)
+    data = {"file": (io.BytesIO(b"eval(input())\n"), "job.py")}
+    status_url = client.post("/scan?async=1", content_type="multipart/form-data", data=data).json["status_url"]
+
+    assert client.get(status_url).status_code in (200, 202)
+    assert "owner" not in client.get(status_url).json
+    client.set_cookie(app.config["JWT_ACCESS_COOKIE_NAME"], bob)
+    assert client.get(status_url).status_code == 404
+    client.delete_cookie(app.config["JWT_ACCESS_COOKIE_NAME"])
+    assert client.get(status_url).status_code == 404
+
+def test_streamed_scan_returns_findings_before_analysis(client, monkeypatch):
+    from src.nuvai.utils import ai_analyzer
+    from src.nuvai.utils.fake_openai import FakeOpenAIClient
+    fake = FakeOpenAIClient(response="Streamed analysis text.", chunk_size=5)
+    monkeypatch.setattr(ai_analyzer, "client", fake)
+
+    data = {"file": (io.BytesIO(b"eval(input())\n"), "stream.py")}
+    response = client.post("/scan?stream=1", content_type="multipart/form-data", data=data)
+    assert response.mimetype == "application/x-ndjson"
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert events[0]["event"] == "findings"
+    assert any(v["title"] == "Dynamic Code Execution" for v in events[0]["vulnerabilities"])
+    deltas = [e["text"] for e in events if e["event"] == "ai_delta"]
+    assert len(deltas) > 1
+    assert "".join(deltas) == "File: stream.py\n\nStreamed analysis text."
+    assert events[-1]["event"] == "ai_done"
+    assert events[-1]["ai_analysis"] == "File: stream.py\n\nStreamed analysis text."
+    assert fake.calls[0]["stream"] is True
+
+def test_multi_file_scan_runs_concurrently_and_keeps_order(client, monkeypatch):
+    from backend import server
+    from src.nuvai.utils import ai_analyzer
+    from src.nuvai.utils.fake_openai import FakeOpenAIClient
+
+    class CountingClient(FakeOpenAIClient):
+        # Records how many analyses run at the same time.
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.lock = threading.Lock()
+            self.active = self.max_active = 0
+
+        def _create(self, *args, **kwargs):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            try:
+                return super()._create(*args, **kwargs)
+            finally:
+                with self.lock:
+                    self.active -= 1
+
+    # One AI request per file, so the files' analyses can only overlap by running in parallel.
+    fake = CountingClient(delay=0.3, response=lambda messages: "Fix " + re.search(r"Finding: (.+)", messages[1]["content"]).group(1).strip())
+    monkeypatch.setattr(ai_analyzer, "client", fake)
+    monkeypatch.setattr(server, "AI_BATCH_MAX_FILES", 1)
+
+    # Findings on different lines, so no two files share an analysis.
+    sources = ["\n" * i + "x = eval(input())\n" for i in range(4)]
+    names = [f"file{i}.py" for i in range(len(sources))]
+    data = {f"file{i}": (io.BytesIO(source.encode()), name) for i, (source, name) in enumerate(zip(sources, names))}
+    data["bad"] = (io.BytesIO(b"MZ"), "bad.exe")
+    response = client.post("/scan", content_type="multipart/form-data", data=data)
+
+    assert response.status_code == 200
+    assert [r["filename"] for r in response.json] == names + ["bad.exe"]
+    assert [r["ai_analysis"].split("\n")[0] for r in response.json[:-1]] == [f"File: {name}" for name in names]
+    assert len({r["ai_analysis"] for r in response.json[:-1]}) == len(names)
+    assert response.json[-1]["error"] == "Unsupported file type"
+    assert len(fake.calls) == len(names)
+    assert fake.max_active > 1
+
+
+def test_scan_cache_hit_does_not_replay_another_files_analysis(client, monkeypatch):
+    from src.nuvai import metrics
+    from src.nuvai.utils import ai_analyzer
+    from src.nuvai.utils.fake_openai import FakeOpenAIClient
+
+    class DictCache:
+        def __init__(self):
+            self.entries = {}
+
+        def get(self, key):
+            return self.entries.get(key)
+
+        def put(self, key, value):
+            self.entries[key] = value
+
+    fake = FakeOpenAIClient(response="Fix the file.")
+    monkeypatch.setattr(ai_analyzer, "client", fake)
+    monkeypatch.setitem(app.config, "SCAN_CACHE", DictCache())
+    hits = metrics.SCAN_CACHE_LOOKUPS.value(("hit",))
+    results = [client.post("/scan", content_type="multipart/form-data",
+                           data={"file": (io.BytesIO(b"x = eval(input())\n"), name)}).json for name in ("a.py", "b.py")]
+
+    assert metrics.SCAN_CACHE_LOOKUPS.value(("hit",)) == hits + 1
+    assert [r["ai_analysis"] for r in results] == ["File: a.py\n\nFix the file.", "File: b.py\n\nFix the file."]
+    assert results[0]["vulnerabilities"] == results[1]["vulnerabilities"]
@@ -0,0 +1,43 @@
+# file: test_scan_cache.py
+
+import os
+from src.nuvai import scan_code
+from src.nuvai.rules import Rule, RuleSet
+from src.nuvai.scan_cache import FileScanCache, cached_scan_code, scan_cache_key
+
+CODE = "import os\nos.system(input())\n"
+
+
+def test_cache_hit_skips_scan(tmp_path, monkeypatch):
+    cache = FileScanCache(str(tmp_path))
+    first = cached_scan_code(CODE, "python", cache)
+    assert first == scan_code(CODE, "python")
+
+    def fail(code, language):
+        raise AssertionError("scan_code should not run on a cache hit")
+
+    monkeypatch.setattr("src.nuvai.scan_cache.scan_code", fail)
+    assert cached_scan_code(CODE, "python", cache) == first
+
+
+def test_key_changes_with_content_language_and_rules():
+    key = scan_cache_key(CODE, "python")
+    assert key == scan_cache_key(CODE, "python")
+    assert key != scan_cache_key(CODE + "\n", "python")
+    assert key != scan_cache_key(CODE, "javascript")
+
+    rule = Rule("test.rule", "HIGH", "Test", "msg", "rec", r"foo")
+    edited = Rule("test.rule", "HIGH", "Test", "msg", "rec", r"foo\(")
+    assert RuleSet("test", [rule]).version != RuleSet("test", [edited]).version
+
+
+def test_file_cache_evicts_least_recently_used(tmp_path):
+    cache = FileScanCache(str(tmp_path), max_entries=3)
+    for i in range(3):
+        cache.put(f"k{i}", [i])
+        os.utime(cache._path(f"k{i}"), (i, i))
+    assert cache.get("k0") == [0]  # refreshes k0, so k1 is now the oldest
+    cache.put("k3", [3])
+    assert cache.get("k1") is None
+    assert cache.get("k0") == [0]
+    assert cache.get("k3") == [3]
@@ -0,0 +1,44 @@
+# file: test_scan_profiler.py
+
+from src.nuvai.scan_profiler import ENGINE_ENTRY, ScanProfiler, disable_profiling, enable_profiling
+from src.nuvai.scanner import scan_code
+
+
+def rules_by_id(report, language):
+    return {entry["rule"]: entry for entry in report["rules"] if entry["language"] == language}
+
+
+def test_profiling_records_rules_and_languages():
+    profiler = enable_profiling(ScanProfiler())
+    try:
+        scan_code("import os\nos.system(cmd)\nos.system(other)\n# TODO: fix\n", "python")
+        scan_code("eval(x); // TODO\n", "javascript")
+        scan_code("<form action='/x'><input type='password'></form>", "html")
+    finally:
+        disable_profiling()
+    scan_code("eval(y)\n", "javascript")  # not recorded
+
+    report = profiler.report()
+    assert report["languages"]["javascript"]["files"] == 1
+    assert report["languages"]["python"]["by_size"] == {"<1KB": {"files": 1, "seconds": report["languages"]["python"]["seconds"]}}
+
+    python = rules_by_id(report, "python")
+    assert python["python.command_injection"]["matches"] == 2
+    assert python["python.command_injection"]["hit_rate"] == 1.0
+    assert python["python.pickle_usage"]["hits"] == 0 and python["python.pickle_usage"]["files"] == 1
+    assert python[ENGINE_ENTRY]["seconds"] > 0
+    assert rules_by_id(report, "javascript")["javascript.dangerous_eval"]["seconds"] > 0
+    assert rules_by_id(report, "html")["html.password_autocomplete"]["matches"] == 1
+
+
+def test_snapshots_merge_across_profilers():
+    worker, parent = ScanProfiler(), ScanProfiler()
+    worker.record_file("php", 2048, 0.5)
+    worker.record_rule("php", "php.eval_usage", 2048, 0.25, matches=3)
+    parent.record_rule("php", "php.eval_usage", 100, 0.25)
+    parent.merge(worker.snapshot(reset=True))
+
+    assert worker.report()["rules"] == []
+    entry = parent.report()["rules"][0]
+    assert (entry["files"], entry["hits"], entry["matches"], entry["seconds"]) == (2, 1, 3, 0.5)
+    assert entry["by_size"] == {"<1KB": {"files": 1, "seconds": 0.25}, "1KB-10KB": {"files": 1, "seconds": 0.25}}
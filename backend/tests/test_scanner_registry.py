@@ -0,0 +1,52 @@
+# file: test_scanner_registry.py
+
+import importlib.metadata
+from concurrent.futures import ThreadPoolExecutor
+
+from src.nuvai.python_scanner import PythonScanner
+from src.nuvai.scanner import ScannerRegistry, get_scanner, scan_code
+
+CODE = "import os\nos.system(cmd)\n"
+
+
+class UpperCaseScanner:
+    def check(self, code, origin=(1, 1)):
+        if code.isupper():
+            return [{"level": "INFO", "type": "Shouting", "message": "All caps.", "recommendation": "Calm down."}]
+        return []
+
+
+def test_scanners_are_shared_and_reentrant():
+    scanner = get_scanner("python")
+    assert isinstance(scanner, PythonScanner) and get_scanner("python") is scanner
+    assert get_scanner("cobol") is None
+
+    expected = PythonScanner(CODE).run_all_checks()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: scanner.check(CODE), range(20)))
+    assert all(result == expected for result in results)
+    assert scanner.findings == []
+
+
+def test_registry_resolves_factories_lazily():
+    registry = ScannerRegistry(entry_point_group=None)
+    registry.register("python", ".python_scanner:PythonScanner")
+    registry.register("shout", UpperCaseScanner)
+    assert isinstance(registry.get("python"), PythonScanner)
+    assert registry.get("shout").check("HEY") and not registry.get("shout").check("hey")
+
+
+def test_entry_point_plugins(monkeypatch):
+    plugin = importlib.metadata.EntryPoint("shout", f"{__name__}:UpperCaseScanner", "nuvai.scanners")
+    builtin = importlib.metadata.EntryPoint("python", f"{__name__}:UpperCaseScanner", "nuvai.scanners")
+    monkeypatch.setattr(importlib.metadata, "entry_points", lambda group: [plugin, builtin] if group == "nuvai.scanners" else [])
+
+    registry = ScannerRegistry()
+    registry.register("python", ".python_scanner:PythonScanner")
+    assert isinstance(registry.get("shout"), UpperCaseScanner)
+    assert isinstance(registry.get("python"), PythonScanner)
+    assert sorted(registry.languages()) == ["python", "shout"]
+
+
+def test_scan_code_unsupported_language():
+    assert scan_code("print(1)", "cobol")[0]["type"] == "Unsupported Language"
@@ -0,0 +1,25 @@
+# file: test_upload_reader.py
+
+import io
+import tempfile
+import pytest
+from src.nuvai.utils.upload_reader import read_upload_text
+
+
+def test_upload_is_decoded_like_a_text_file():
+    data = "x = 'héllo'\r\nprint(x)\r".encode("utf-8")
+    assert read_upload_text(io.BytesIO(data)) == "x = 'héllo'\nprint(x)\n"
+
+
+def test_spooled_upload_is_decoded_and_left_open():
+    data = ("a = 1\r\n" * 1000 + "é").encode("utf-8")
+    with tempfile.SpooledTemporaryFile(max_size=100) as stream:
+        stream.write(data)
+        stream.seek(0)
+        assert read_upload_text(stream) == data.decode("utf-8").replace("\r\n", "\n")
+        assert not stream.closed
+
+
+def test_invalid_utf8_raises():
+    with pytest.raises(UnicodeDecodeError):
+        read_upload_text(io.BytesIO(b"\xff\xfe\x00"))
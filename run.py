@@ -10,20 +10,34 @@ Features:
 - Auto-detects code language by file extension or content
 - Runs static analysis using language-specific modules
 - Outputs clear terminal results and saves report to file
-- Supports export formats: json, txt, html, pdf (auto fallback if PDF not available)
-- Prompts user for export format and filename
+- Reports the line, column and code snippet of every match
+- Supports export formats: json, jsonl, txt, html, pdf (auto fallback if PDF not available), sarif (SARIF 2.1.0 for code scanning tools), nvr (compact columnar binary for report archives)
+- Prompts for the export format (or takes --format) before scanning and writes each file's findings to the report as soon as it is scanned, so memory stays flat on large folders
 - Provides contextual security improvement suggestions based on findings
 - Handles unexpected input or format errors gracefully
+- Scans large folders in parallel across CPU cores with --jobs N (deterministic report order)
+- Incremental CI scans with --since <git-ref>: rescans only files changed since the ref and merges them into the baseline of the last full scan
+- Caches results by file content and rule-set version, so unchanged files are not rescanned (--no-cache to disable)
+- Profiles the scan with --profile [PATH]: time, hit rate and matches per rule and language, saved as a JSON report
 
 Suitable for technical and non-technical users.
 """
 
 import argparse
 import os
-from src.nuvai import get_language, scan_code
-from src.nuvai.report_saver import save_report
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from src.nuvai import get_language
+from src.nuvai.scan_cache import cached_scan_code, get_file_cache
+from src.nuvai.scan_profiler import active_profiler, enable_profiling
+from src.nuvai.incremental import (BaselineWriter, changed_files, default_baseline_path,
+                                   load_baseline, merge_baseline, save_baseline)
+from src.nuvai.report_saver import REPORT_WRITERS, describe_location, ensure_report_directory, open_report
 
 SUPPORTED_EXTENSIONS = [".py", ".js", ".html", ".jsx", ".php", ".cpp", ".ts"]
+MAX_CHUNK_SIZE = 64
+PROFILE_TOP_RULES = 10
 
 def load_code(file_path):
     try:
@@ -43,6 +57,10 @@ def print_results(file_path, findings):
     for f in findings:
         print(f"\n[{f['level']}] {f['type']}")
         print(f"- Description: {f['message']}")
+        location = describe_location(f)
+        if location:
+            print(f"- Location: {location}")
+            print(f"- Code: {f['snippet']}")
         print(f"- Recommendation: {f['recommendation']}")
 
     # Derive dynamic improvement tips based on findings
@@ -63,13 +81,14 @@ def print_results(file_path, findings):
             print(f"- {tip}")
 
 def prompt_export_settings():
+    choices = " / ".join(REPORT_WRITERS)
     print("\n💾 Export Report")
-    format_choice = input("Select export format (json / txt / html / pdf): ").strip().lower()
-    while format_choice not in ["json", "txt", "html", "pdf"]:
-        format_choice = input("❗ Invalid format. Please choose from (json / txt / html / pdf): ").strip().lower()
+    format_choice = input(f"Select export format ({choices}): ").strip().lower()
+    while format_choice not in REPORT_WRITERS:
+        format_choice = input(f"❗ Invalid format. Please choose from ({choices}): ").strip().lower()
     return format_choice
 
-def process_file(file_path):
+def process_file(file_path, cache=None):
     code = load_code(file_path)
     if not code:
         return []
@@ -77,36 +96,181 @@ def process_file(file_path):
     if not language:
         print(f"❌ Skipping unsupported file: {file_path}")
         return []
-    findings = scan_code(code, language)
+    findings = cached_scan_code(code, language, cache)
     print_results(file_path, findings)
     return findings
 
+def collect_files(folder):
+    targets = []
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for fname in sorted(files):
+            if os.path.splitext(fname)[1].lower() in SUPPORTED_EXTENSIONS:
+                targets.append(os.path.join(root, fname))
+    return targets
+
+def scan_file_task(task):
+    # Runs in a worker process: only loading and scanning happen here, so output
+    # stays in the parent and keeps the walk order. With profiling on, the worker's
+    # aggregates for this task are returned for the parent to merge.
+    file_path, language, cache_dir, profile = task
+    profiler = enable_profiling() if profile else None
+    findings, error = [], None
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            code = f.read()
+    except Exception as e:
+        findings, error = None, f"Failed to load file: {e}"
+    else:
+        if code:
+            cache = get_file_cache(cache_dir) if cache_dir else None
+            findings = cached_scan_code(code, language, cache)
+    return file_path, findings, error, profiler.snapshot(reset=True) if profiler else None
+
+def print_progress(done, total):
+    print(f"\r⏳ Scanned {done}/{total} files", end="", file=sys.stderr, flush=True)
+    if done == total:
+        print(file=sys.stderr)
+
+def scan_folder_parallel(files, jobs, cache=None):
+    tasks = []
+    for file_path in files:
+        language = get_language(file_path)
+        if not language:
+            print(f"❌ Skipping unsupported file: {file_path}")
+            continue
+        tasks.append((file_path, language, cache.directory if cache else None, active_profiler() is not None))
+
+    if not tasks:
+        return
+    chunksize = max(1, min(MAX_CHUNK_SIZE, len(tasks) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(scan_file_task, tasks, chunksize=chunksize)
+        for done, (file_path, findings, error, profile) in enumerate(results, start=1):
+            if profile:
+                active_profiler().merge(profile)
+            # A file that fails to load is reported with no findings, as in the serial path,
+            # so the report and baseline do not depend on --jobs.
+            if error:
+                print(f"\n❌ {error}")
+                findings = []
+            elif findings:
+                print_results(file_path, findings)
+            yield file_path, findings
+            print_progress(done, len(tasks))
+
+def scan_files(files, jobs, cache=None):
+    # Yields (file_path, findings) in the order of `files`, as soon as each file is scanned.
+    if jobs > 1:
+        yield from scan_folder_parallel(files, jobs, cache)
+        return
+    for file_path in files:
+        yield file_path, process_file(file_path, cache)
+
+def relative_to(folder, scanned):
+    return {os.path.relpath(file_path, folder): findings for file_path, findings in scanned}
+
+def scan_full(folder, baseline_path, jobs, cache, emit):
+    # Findings go to `emit` and the baseline file by file; nothing is kept for the whole folder.
+    with BaselineWriter(baseline_path, folder) as baseline:
+        for file_path, findings in scan_files(collect_files(folder), jobs, cache):
+            rel_path = os.path.relpath(file_path, folder)
+            baseline.add(rel_path, findings)
+            emit(findings, rel_path)
+
+def scan_since(folder, ref, baseline_path, jobs, cache, emit):
+    baseline = load_baseline(baseline_path)
+    if baseline is None:
+        print(f"⚠️ No baseline report at {baseline_path} – running a full scan to create one.")
+        return scan_full(folder, baseline_path, jobs, cache, emit)
+
+    changed = changed_files(folder, ref, SUPPORTED_EXTENSIONS)
+    existing = [os.path.join(folder, p) for p in changed if os.path.isfile(os.path.join(folder, p))]
+    print(f"🔁 {len(changed)} file(s) changed since {ref} – rescanning {len(existing)}, "
+          f"reusing baseline results for the rest")
+    scanned = relative_to(folder, scan_files(existing, jobs, cache))
+    files = merge_baseline(baseline["files"], changed, scanned)
+    save_baseline(baseline_path, folder, files)
+    for rel_path, findings in files.items():
+        emit(findings, rel_path)
+
+def print_profile(profiler, path):
+    report = profiler.report()
+    print("\n⏱️ Scan Profile")
+    for language, stats in report["languages"].items():
+        print(f"- {language}: {stats['files']} file(s), {stats['bytes']} bytes, {stats['seconds'] * 1000:.1f} ms")
+    print(f"\nSlowest rules (of {len(report['rules'])}):")
+    for entry in report["rules"][:PROFILE_TOP_RULES]:
+        print(f"- {entry['rule']} [{entry['language']}]: {entry['seconds'] * 1000:.2f} ms, "
+              f"hit rate {entry['hit_rate']:.0%}, {entry['matches']} match(es)")
+    if path is None:
+        date_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        path = os.path.join(ensure_report_directory(), f"scan_profile_{date_str}.json")
+    print(f"\n📁 Profile saved to: {profiler.save(path)}")
+
 def main():
     parser = argparse.ArgumentParser(description="Nuvai AI Code Security Scanner")
     parser.add_argument("target", help="Path to the code file or folder to scan")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of worker processes for folder scans (0 = all CPU cores)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Rescan every file instead of reusing cached results")
+    parser.add_argument("--since", metavar="GIT_REF",
+                        help="Only scan files changed since this git ref and merge them into the baseline report")
+    parser.add_argument("--baseline", metavar="PATH",
+                        help="Baseline report written by full folder scans and updated by --since "
+                             "(default: ~/security_reports/baseline_<folder-id>.json)")
+    parser.add_argument("--profile", nargs="?", const=True, metavar="PATH",
+                        help="Record time, hit rate and matches per rule and write them as JSON "
+                             "(default: ~/security_reports/scan_profile_<date>.json); disables the cache")
+    parser.add_argument("--format", choices=list(REPORT_WRITERS),
+                        help="Report format (prompted for before the scan if omitted)")
+    parser.add_argument("-o", "--output", metavar="PATH",
+                        help="Report file (default: ~/security_reports/scanner_<date>.<format>)")
     args = parser.parse_args()
 
-    all_findings = []
-
-    if os.path.isfile(args.target):
-        findings = process_file(args.target)
-        all_findings.extend(findings)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    # Cached files are not scanned, so profiling always scans everything.
+    cache = None if args.no_cache or args.profile else get_file_cache()
+    profiler = enable_profiling() if args.profile else None
 
-    elif os.path.isdir(args.target):
-        for root, _, files in os.walk(args.target):
-            for fname in files:
-                if os.path.splitext(fname)[1].lower() in SUPPORTED_EXTENSIONS:
-                    full_path = os.path.join(root, fname)
-                    findings = process_file(full_path)
-                    all_findings.extend(findings)
-    else:
+    if not os.path.exists(args.target):
         print("❌ Invalid path. Please provide a valid file or folder.")
         return
+    if os.path.isfile(args.target) and args.since:
+        print("❌ --since requires a folder target.")
+        return
+
+    # The report is opened before scanning and receives each file's findings as they come.
+    format_choice = args.format or prompt_export_settings()
+    report = open_report(format_choice, args.output)
+    emit = report.write_all if report else (lambda findings, file_path=None: None)
+
+    try:
+        if os.path.isfile(args.target):
+            emit(process_file(args.target, cache), args.target)
+        elif os.path.isdir(args.target):
+            baseline_path = args.baseline or default_baseline_path(args.target)
+            try:
+                if args.since:
+                    scan_since(args.target, args.since, baseline_path, jobs, cache, emit)
+                else:
+                    scan_full(args.target, baseline_path, jobs, cache, emit)
+            except (ValueError, RuntimeError, OSError) as e:
+                print(f"❌ Scan failed: {e}")
+                return
+        else:
+            print("❌ Invalid path. Please provide a valid file or folder.")
+            return
+    finally:
+        if report:
+            report.close()
+
+    if profiler is not None:
+        print_profile(profiler, None if args.profile is True else args.profile)
 
-    format_choice = prompt_export_settings()
-    saved = save_report(all_findings, format_choice)
-    if saved:
-        print(f"\n📁 Report saved to: {saved}")
+    if report:
+        print(f"\n📁 Report saved to: {report.path} ({report.count} finding(s))")
 
 if __name__ == "__main__":
     main()